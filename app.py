@@ -1,35 +1,99 @@
-from flask import Flask, render_template, request, jsonify, redirect, url_for
+from flask import Flask, Response, render_template, request, jsonify, redirect, url_for
 import os
 import threading
 import logging
 import json
 import time
+import hashlib
 from datetime import datetime, timedelta
+import log_setup
 import trading_bot
+import quote_store
+import order_book
+import risk
+import position_sizer
+import finnhub_stream
+import history_store
+import llm_executor
+import circuit_breaker
+import screener
+import symbol_registry
+import static_assets
+import trading_daemon
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
+# Configure logging (queue-based, written by a background thread)
+log_setup.configure_logging()
 logger = logging.getLogger(__name__)
 
 # Initialize Flask app
 app = Flask(__name__)
 app.secret_key = os.environ.get("SESSION_SECRET", "nexus-gate-fund-secret")
+# Templates reference static files by content-hashed URL: {{ asset_url('js/dashboard.js') }}
+app.jinja_env.globals["asset_url"] = static_assets.url
 
 # Initialize threading event to control the bot
 stop_event = threading.Event()
 bot_thread = None
 
+# BOT_MODE=daemon: cycles run in trading_daemon.py and this app serves its published snapshot
+DAEMON_MODE = os.environ.get("BOT_MODE", "thread") == "daemon"
+DAEMON_ONLY_ERROR = "Trading runs in the trading daemon (BOT_MODE=daemon); start or stop that process instead"
+_daemon_sync = {"published_at": None}
+
+def daemon_snapshot():
+    """Return the trading daemon's latest snapshot in daemon mode, otherwise None"""
+    return trading_daemon.read_snapshot() if DAEMON_MODE else None
+
+@app.before_request
+def sync_daemon_state():
+    """In daemon mode, mirror the daemon's snapshot into the trading_bot state the routes read"""
+    snapshot = daemon_snapshot()
+    if snapshot is None or snapshot["published_at"] == _daemon_sync["published_at"]:
+        return
+    trading_bot.latest_signals = snapshot["signals"]
+    trading_bot.latest_news = snapshot["news"]
+    trading_bot.latest_decision = snapshot["decision"]
+    trading_bot.trading_history = snapshot["history"]
+    trading_bot.bot_status = snapshot["status"]
+    trading_bot.portfolio = snapshot["portfolio"]
+    trading_bot.latest_growth_projection = snapshot.get("growth_projection")
+    _daemon_sync["published_at"] = snapshot["published_at"]
+
+def compressed_response(variants, mimetype, etag, cache_control):
+    """Serve a precompressed body in the best encoding the client accepts, honouring If-None-Match"""
+    headers = {"ETag": f'"{etag}"', "Cache-Control": cache_control, "Vary": "Accept-Encoding"}
+    if request.if_none_match.contains(etag):
+        return Response(status=304, headers=headers)
+
+    encoding, body = static_assets.choose(variants, request.headers.get("Accept-Encoding"))
+    if encoding != "identity":
+        headers["Content-Encoding"] = encoding
+    return Response(body, mimetype=mimetype, headers=headers)
+
+# The dashboard shell holds no trading data, so it is rendered once per asset version
+shell_cache = {"version": None, "variants": None, "etag": None}
+
 @app.route('/')
 def index():
-    """Render the main dashboard page"""
-    return render_template('index.html', 
-                          signals=trading_bot.latest_signals,
-                          decision=trading_bot.latest_decision,
-                          history=trading_bot.trading_history,
-                          status=trading_bot.bot_status)
+    """Serve the dashboard shell; its data comes from /api/bootstrap"""
+    version = static_assets.version()
+    if shell_cache["version"] != version:
+        body = render_template('index.html').encode("utf-8")
+        shell_cache.update({
+            "version": version,
+            "variants": static_assets.encode(body),
+            "etag": hashlib.sha256(body).hexdigest()[:16]
+        })
+    # Revalidated on every load, answered with a 304 until a deploy changes it
+    return compressed_response(shell_cache["variants"], "text/html", shell_cache["etag"], "no-cache")
+
+@app.route('/assets/<path:filename>')
+def hashed_asset(filename):
+    """Serve a content-hashed, precompressed static asset with a long-lived cache header"""
+    asset = static_assets.get(filename)
+    if asset is None:
+        return jsonify({"error": "Not found"}), 404
+    return compressed_response(asset["variants"], asset["mimetype"], asset["etag"], static_assets.IMMUTABLE_CACHE_CONTROL)
 
 # Cache market data in memory with timestamp  
 market_data_cache = {
@@ -38,6 +102,34 @@ market_data_cache = {
     "request_count": 0
 }
 
+def get_cached_signals():
+    """Return market signals, fetching from the source API at most once per second
+
+    Returns a ``(signals, cached, cache_age)`` tuple. Every fresh fetch is also
+    merged into the versioned quote store used by the delta endpoint.
+    """
+    current_time = time.time()
+    cache_age = current_time - market_data_cache["timestamp"]
+    market_data_cache["request_count"] += 1
+
+    # Check if we have cached data that's less than 1 second old
+    if cache_age < 1:
+        return market_data_cache["data"], True, cache_age
+
+    # The running bot (or the daemon) owns the Finnhub budget: serve its latest cycle's quotes,
+    # and only poll from the request path while no cycle is producing them
+    if DAEMON_MODE or (trading_bot.bot_status.get("running") and trading_bot.latest_signals):
+        fresh_signals = trading_bot.latest_signals
+    else:
+        fresh_signals = trading_bot.get_market_signals()
+
+    # Update cache
+    market_data_cache["timestamp"] = current_time
+    market_data_cache["data"] = fresh_signals
+    quote_store.update(fresh_signals)
+
+    return fresh_signals, False, 0.0
+
 @app.route('/api/market-data')
 def market_data():
     """API endpoint to get the latest market data with caching for 1-second updates
@@ -46,32 +138,53 @@ def market_data():
     1. Using in-memory caching
     2. Only fetching fresh data from the source API when needed
     3. Tracking request frequency for monitoring
+
+    The body is always the per-ticker quote dict; cache details go in headers.
     """
     try:
-        current_time = time.time()
-        
-        # Check if we have cached data that's less than 1 second old
-        if (current_time - market_data_cache["timestamp"]) < 1:
-            market_data_cache["request_count"] += 1
-            return jsonify({
-                "data": market_data_cache["data"],
-                "cached": True,
-                "cache_age": current_time - market_data_cache["timestamp"],
-                "request_count": market_data_cache["request_count"]
-            })
-        
-        # Fetch fresh data from trading bot module
-        fresh_signals = trading_bot.get_market_signals()
-        
-        # Update cache
-        market_data_cache["timestamp"] = current_time
-        market_data_cache["data"] = fresh_signals
-        market_data_cache["request_count"] += 1
-        
-        return jsonify(fresh_signals)
+        signals, cached, cache_age = get_cached_signals()
+
+        response = jsonify(signals)
+        response.headers["X-Cache"] = "HIT" if cached else "MISS"
+        response.headers["X-Cache-Age"] = f"{cache_age:.3f}"
+        response.headers["X-Request-Count"] = str(market_data_cache["request_count"])
+        stale = sum(1 for quote in signals.values() if quote.get("stale"))
+        if stale:
+            # Some quotes are last-known-good values served while Finnhub is failing
+            response.headers["X-Degraded"] = f"finnhub; stale={stale}"
+        return response
         
     except Exception as e:
-        logger.error(f"Error in market_data endpoint: {str(e)}")
+        logger.error("Error in market_data endpoint: %s", e)
+        return jsonify({"error": str(e)}), 500
+
+@app.route('/api/v1/market-data')
+def market_data_delta():
+    """Versioned, compact market data for high-frequency dashboard clients
+
+    Query parameters:
+    - ``since``: version the client already has; only symbols changed after it are returned
+    - ``fields``: comma-separated quote fields to include (default ``c,d,dp``)
+
+    The response is columnar: a ``symbols`` list plus one parallel array per field.
+    """
+    try:
+        since = quote_store.parse_version(request.args.get("since"))
+        fields = quote_store.parse_fields(request.args.get("fields"))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    try:
+        get_cached_signals()
+        payload = quote_store.changes_since(since, fields)
+
+        body = json.dumps(payload, separators=(",", ":"))
+        response = Response(body, mimetype="application/json")
+        response.headers["Cache-Control"] = "no-store"
+        return response
+
+    except Exception as e:
+        logger.error("Error in market_data_delta endpoint: %s", e)
         return jsonify({"error": str(e)}), 500
 
 @app.route('/api/decision')
@@ -79,21 +192,77 @@ def decision():
     """API endpoint to get the latest trading decision"""
     return jsonify(trading_bot.latest_decision)
 
+HISTORY_QUERY_PARAMS = ("since", "ticker", "kind", "limit", "cursor")
+
+def parse_since(value):
+    """Accept ``since`` as epoch seconds or an ISO 8601 timestamp"""
+    try:
+        return float(value)
+    except ValueError:
+        return datetime.fromisoformat(value).timestamp()
+
 @app.route('/api/history')
 def history():
-    """API endpoint to get trading history"""
-    return jsonify(trading_bot.trading_history)
+    """API endpoint to get trading history
+
+    Without query parameters this returns the recent in-memory history.
+    With any of ``since``, ``ticker``, ``kind``, ``limit`` or ``cursor`` it
+    pages through the persistent history store, newest first; pass the
+    returned ``next_cursor`` back as ``cursor`` for the next page.
+    """
+    if not any(param in request.args for param in HISTORY_QUERY_PARAMS):
+        return jsonify(trading_bot.trading_history)
+
+    try:
+        since = request.args.get("since")
+        page = history_store.query(
+            since=parse_since(since) if since else None,
+            ticker=request.args.get("ticker"),
+            kind=request.args.get("kind"),
+            limit=request.args.get("limit", 100, type=int),
+            cursor=request.args.get("cursor")
+        )
+        return jsonify(page)
+    except ValueError as e:
+        return jsonify({"error": f"Invalid query parameter: {str(e)}"}), 400
+    except Exception as e:
+        logger.error("Error querying history: %s", e)
+        return jsonify({"error": str(e)}), 500
 
 @app.route('/api/status')
 def status():
-    """API endpoint to get the bot's status"""
-    return jsonify(trading_bot.bot_status)
+    """API endpoint to get the bot's status, including the upcoming cycle schedule"""
+    status_data = dict(trading_bot.bot_status)
+    schedule = status_data.get("schedule")
+    if schedule and schedule.get("next_run"):
+        # Refresh the countdown, the snapshot was taken when the last cycle finished
+        schedule = dict(schedule)
+        next_run = datetime.strptime(schedule["next_run"], "%Y-%m-%d %H:%M:%S")
+        schedule["seconds_until_next_run"] = max(0.0, (next_run - datetime.now()).total_seconds())
+        status_data["schedule"] = schedule
+    if DAEMON_MODE:
+        snapshot = daemon_snapshot() or {}
+        for key in ("quote_stream", "llm", "breakers", "degraded", "screen"):
+            status_data[key] = snapshot.get(key)
+        status_data["daemon"] = {
+            "alive": snapshot.get("daemon_alive", False),
+            "pid": snapshot.get("pid"),
+            "started_at": snapshot.get("started_at"),
+            "snapshot_age_seconds": snapshot.get("snapshot_age")
+        }
+        return jsonify(status_data)
+    status_data["quote_stream"] = dict(finnhub_stream.stream_status)
+    status_data["llm"] = dict(llm_executor.executor_stats, hedge_delay_seconds=llm_executor.hedge_delay())
+    status_data["breakers"] = circuit_breaker.status()
+    status_data["degraded"] = circuit_breaker.degraded()
+    status_data["screen"] = screener.snapshot()
+    return jsonify(status_data)
 
 @app.route('/api/portfolio')
 def get_portfolio():
     """API endpoint to get the current portfolio status"""
     try:
-        signals = trading_bot.get_market_signals()
+        signals, _, _ = get_cached_signals()
         portfolio_value = trading_bot.calculate_portfolio_value(signals)
         
         # Count active positions
@@ -106,22 +275,138 @@ def get_portfolio():
             "positions": {k: v for k, v in trading_bot.portfolio["positions"].items() if v["shares"] > 0}
         })
     except Exception as e:
-        logger.error(f"Error getting portfolio: {str(e)}")
+        logger.error("Error getting portfolio: %s", e)
         return jsonify({"error": str(e)}), 500
 
+# Serialized /api/bootstrap payload, shared by every page load within BOOTSTRAP_TTL seconds
+BOOTSTRAP_TTL = 1.0
+bootstrap_cache = {"timestamp": 0, "variants": None, "etag": None}
+# Sectors the dashboard renders, keyed to their grid ids in templates/index.html, and the quote fields it reads
+DASHBOARD_SECTORS = {
+    "index_volatility": "core-volatility",
+    "big_tech": "big-tech",
+    "financials": "financials",
+    "energy_commodities": "energy",
+}
+DASHBOARD_QUOTE_FIELDS = ("c", "d", "dp")
+
+def dashboard_categories():
+    """The dashboard's ticker grids from the symbol registry: {grid id: {"tickers", "descriptions"}}"""
+    categories = {grid: {"tickers": [], "descriptions": {}} for grid in DASHBOARD_SECTORS.values()}
+    for ticker in symbol_registry.symbols():
+        grid = DASHBOARD_SECTORS.get(symbol_registry.sector_of(ticker))
+        if grid:
+            categories[grid]["tickers"].append(ticker)
+            categories[grid]["descriptions"][ticker] = symbol_registry.name_of(ticker)
+    return categories
+
+def dashboard_tickers():
+    return [ticker for category in dashboard_categories().values() for ticker in category["tickers"]]
+
+def invalidate_bootstrap():
+    """Drop the cached bootstrap payload, e.g. after the bot is started or stopped"""
+    bootstrap_cache["timestamp"] = 0
+
+@app.route('/api/bootstrap')
+def bootstrap():
+    """Initial dashboard data in one pre-serialized response: status, portfolio, ticker grids and market data
+
+    Only what the page renders is included; the full data stays behind the
+    per-resource endpoints.
+    """
+    try:
+        if time.time() - bootstrap_cache["timestamp"] >= BOOTSTRAP_TTL:
+            signals, _, _ = get_cached_signals()
+            categories = dashboard_categories()
+            payload = {
+                "status": {
+                    "running": trading_bot.bot_status.get("running", False),
+                    "last_run": trading_bot.bot_status.get("last_run")
+                },
+                "portfolio": {
+                    "cash": trading_bot.portfolio["cash"],
+                    "total_value": trading_bot.calculate_portfolio_value(signals),
+                    "active_positions": sum(1 for p in trading_bot.portfolio["positions"].values() if p["shares"] > 0)
+                },
+                "categories": categories,
+                "market_data": {
+                    ticker: {field: signals[ticker].get(field) for field in DASHBOARD_QUOTE_FIELDS}
+                    for category in categories.values() for ticker in category["tickers"] if ticker in signals
+                },
+                "generated_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            }
+            body = json.dumps(payload, default=str, separators=(",", ":")).encode("utf-8")
+            bootstrap_cache.update({
+                "timestamp": time.time(),
+                "variants": static_assets.encode(body),
+                "etag": hashlib.sha256(body).hexdigest()[:16]
+            })
+        return compressed_response(bootstrap_cache["variants"], "application/json", bootstrap_cache["etag"], "no-cache")
+    except Exception as e:
+        logger.error("Error building bootstrap data: %s", e)
+        return jsonify({"error": str(e)}), 500
+
+@app.route('/api/portfolio-growth')
+def get_portfolio_growth():
+    """API endpoint to get progress toward the $100k target and its Monte Carlo projection
+
+    Serves the projection computed after the latest cycle (None until the
+    first one is ready); nothing is fetched or simulated per request.
+    """
+    try:
+        metrics = trading_bot.portfolio["performance_metrics"]
+        return jsonify({
+            "growth_projection": trading_bot.latest_growth_projection,
+            "performance_metrics": {k: v for k, v in metrics.items() if k != "daily_returns"},
+            "current_portfolio": {"value": trading_bot.portfolio["portfolio_value"], "cash": trading_bot.portfolio["cash"]}
+        })
+    except Exception as e:
+        logger.error("Error getting portfolio growth: %s", e)
+        return jsonify({"error": str(e)}), 500
+
+@app.route('/api/risk')
+def get_risk():
+    """API endpoint to get the live exposure snapshot, risk limits and sizing targets"""
+    snapshot = daemon_snapshot()
+    if snapshot:
+        return jsonify({**snapshot["risk"], "sizing": snapshot["sizing"]})
+    return jsonify({**risk.snapshot(), "sizing": position_sizer.snapshot()})
+
+@app.route('/api/orders')
+def get_orders():
+    """API endpoint to get open orders and the most recent fills"""
+    snapshot = daemon_snapshot()
+    if snapshot:
+        return jsonify(snapshot["orders"])
+    return jsonify({
+        "open_orders": order_book.open_orders(),
+        "recent_fills": list(order_book.recent_fills)
+    })
+
 @app.route('/api/run-now', methods=['POST'])
 def run_now():
     """API endpoint to trigger an immediate trading cycle"""
+    if DAEMON_MODE:
+        # The daemon runs the cycle; its next snapshot carries the result
+        if trading_daemon.request_cycle(daemon_snapshot()):
+            invalidate_bootstrap()
+            return jsonify({"success": True, "message": "Cycle requested from the trading daemon"}), 202
+        return jsonify({"success": False, "error": "Trading daemon is not running"}), 503
+    
     try:
         result = trading_bot.run_trading_cycle_api()
+        invalidate_bootstrap()
         
+        if result.get("busy"):
+            return jsonify({"success": False, "error": result["error"]}), 409
+
         if "error" in result:
             return jsonify({"success": False, "error": result["error"]}), 500
         
         return jsonify({"success": True, "result": result})
         
     except Exception as e:
-        logger.error(f"Error in run_now: {str(e)}")
+        logger.error("Error in run_now: %s", e)
         return jsonify({"success": False, "error": str(e)}), 500
 
 @app.route('/api/start-bot', methods=['POST'])
@@ -129,6 +414,9 @@ def start_bot():
     """API endpoint to start the trading bot"""
     global bot_thread, stop_event
     
+    if DAEMON_MODE:
+        return jsonify({"success": False, "error": DAEMON_ONLY_ERROR}), 409
+    
     try:
         if bot_thread and bot_thread.is_alive():
             return jsonify({"success": False, "error": "Bot is already running"})
@@ -141,11 +429,14 @@ def start_bot():
         )
         bot_thread.daemon = True
         bot_thread.start()
+        # Shown as running straight away, even before the thread has set the flag itself
+        trading_bot.bot_status["running"] = True
+        invalidate_bootstrap()
         
         return jsonify({"success": True, "message": "Bot started successfully"})
         
     except Exception as e:
-        logger.error(f"Error starting bot: {str(e)}")
+        logger.error("Error starting bot: %s", e)
         return jsonify({"success": False, "error": str(e)}), 500
 
 @app.route('/api/stop-bot', methods=['POST'])
@@ -153,6 +444,9 @@ def stop_bot():
     """API endpoint to stop the trading bot"""
     global bot_thread, stop_event
     
+    if DAEMON_MODE:
+        return jsonify({"success": False, "error": DAEMON_ONLY_ERROR}), 409
+    
     try:
         if not bot_thread or not bot_thread.is_alive():
             return jsonify({"success": False, "error": "Bot is not running"})
@@ -162,26 +456,41 @@ def stop_bot():
         
         # Wait for thread to finish (with timeout)
         bot_thread.join(timeout=5)
+        invalidate_bootstrap()
         
         return jsonify({"success": True, "message": "Bot stopped successfully"})
         
     except Exception as e:
-        logger.error(f"Error stopping bot: {str(e)}")
+        logger.error("Error stopping bot: %s", e)
         return jsonify({"success": False, "error": str(e)}), 500
 
 @app.route('/api/news')
 def news():
     """API endpoint to get the latest market news"""
     try:
-        news_headlines = trading_bot.get_news_headlines()
+        news_headlines = trading_bot.latest_news if DAEMON_MODE else trading_bot.get_news_headlines()
         return jsonify(news_headlines)
     except Exception as e:
-        logger.error(f"Error getting news: {str(e)}")
+        logger.error("Error getting news: %s", e)
         return jsonify({"error": str(e)}), 500
 
 def update_status(signals=None, decision=None, action=None, rationale=None):
     """Callback function to update the bot's status and trading data"""
     trading_bot.update_status(signals, decision, action, rationale)
 
+def create_app():
+    """App factory: load trading state and return the configured Flask app
+
+    Importing this module only defines routes; persisted state is loaded here
+    so worker boot does not pay for it at import time. In daemon mode the
+    state belongs to the trading daemon and is read from its snapshot.
+    """
+    static_assets.build()
+    if DAEMON_MODE:
+        logger.info("Serving trading state from the daemon snapshot at %s", trading_daemon.SNAPSHOT_FILE)
+    else:
+        trading_bot.init_bot()
+    return app
+
 if __name__ == '__main__':
-    app.run(host='0.0.0.0', port=5000, debug=True)
\ No newline at end of file
+    create_app().run(host='0.0.0.0', port=5000, debug=True)
\ No newline at end of file
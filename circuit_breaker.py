@@ -0,0 +1,168 @@
+import os
+import time
+import threading
+import logging
+from collections import deque
+
+logger = logging.getLogger(__name__)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+# Defaults for every upstream; failure rate is measured over a sliding window of calls
+WINDOW_SECONDS = float(os.environ.get("BREAKER_WINDOW_SECONDS", 60))
+MIN_CALLS = int(os.environ.get("BREAKER_MIN_CALLS", 5))
+FAILURE_RATE = float(os.environ.get("BREAKER_FAILURE_RATE", 0.5))
+OPEN_SECONDS = float(os.environ.get("BREAKER_OPEN_SECONDS", 30))
+# Upper bound for the open period, which doubles each time a half-open probe fails
+MAX_OPEN_SECONDS = 600
+
+
+class CircuitOpenError(Exception):
+    """The upstream's breaker is open; the call was not attempted"""
+
+
+class CircuitBreaker:
+    """Failure-rate circuit breaker for one upstream
+
+    Closed: calls go through and their outcomes are recorded. When at least
+    ``min_calls`` calls in the last ``window_seconds`` fail at
+    ``failure_rate`` or worse, the breaker opens and calls fail fast. After
+    the open period one probe call is let through (half-open); its outcome
+    closes the breaker or reopens it for twice as long.
+    """
+
+    def __init__(self, name, window_seconds=WINDOW_SECONDS, min_calls=MIN_CALLS,
+                 failure_rate=FAILURE_RATE, open_seconds=OPEN_SECONDS):
+        self.name = name
+        self.window_seconds = window_seconds
+        self.min_calls = min_calls
+        self.failure_rate = failure_rate
+        self.open_seconds = open_seconds
+        self.state = CLOSED
+        self._calls = deque()          # (timestamp, succeeded)
+        self._opened_at = None
+        self._current_open_seconds = open_seconds
+        self._probe_started = None
+        self._lock = threading.Lock()
+        self.stats = {"calls": 0, "failures": 0, "rejected": 0, "opened": 0, "last_error": None, "last_failure": None}
+
+    def _trim(self, now):
+        while self._calls and now - self._calls[0][0] > self.window_seconds:
+            self._calls.popleft()
+
+    def allow(self):
+        """Return True if a call may be attempted now"""
+        with self._lock:
+            now = time.time()
+            if self.state == OPEN and now - self._opened_at >= self._current_open_seconds:
+                self.state = HALF_OPEN
+                self._probe_started = None
+                logger.info("Circuit %s half-open, probing upstream", self.name)
+            if self.state == CLOSED:
+                return True
+            # One probe at a time; a probe whose outcome never got recorded is replaced after a window
+            if self.state == HALF_OPEN and (self._probe_started is None or now - self._probe_started > self.window_seconds):
+                self._probe_started = now
+                return True
+            self.stats["rejected"] += 1
+            return False
+
+    def is_open(self):
+        """True while calls are being rejected outright (open and not yet due a probe)"""
+        with self._lock:
+            return self.state == OPEN and time.time() - self._opened_at < self._current_open_seconds
+
+    def record_success(self):
+        with self._lock:
+            now = time.time()
+            self.stats["calls"] += 1
+            if self.state == HALF_OPEN:
+                self.state = CLOSED
+                self._calls.clear()
+                self._current_open_seconds = self.open_seconds
+                logger.info("Circuit %s closed, upstream recovered", self.name)
+            self._calls.append((now, True))
+            self._trim(now)
+
+    def record_failure(self, error=None):
+        with self._lock:
+            now = time.time()
+            self.stats["calls"] += 1
+            self.stats["failures"] += 1
+            self.stats["last_error"] = str(error) if error is not None else None
+            self.stats["last_failure"] = now
+
+            if self.state == HALF_OPEN:
+                self._current_open_seconds = min(MAX_OPEN_SECONDS, self._current_open_seconds * 2)
+                self._open(now)
+                return
+
+            self._calls.append((now, False))
+            self._trim(now)
+            failures = sum(1 for _, succeeded in self._calls if not succeeded)
+            if self.state == CLOSED and len(self._calls) >= self.min_calls and failures / len(self._calls) >= self.failure_rate:
+                self._open(now)
+
+    def _open(self, now):
+        self.state = OPEN
+        self._opened_at = now
+        self._probe_started = None
+        self.stats["opened"] += 1
+        logger.warning(
+            "Circuit %s open for %.0fs (last error: %s)",
+            self.name, self._current_open_seconds, self.stats["last_error"]
+        )
+
+    def call(self, fn, *args, **kwargs):
+        """Run ``fn`` through the breaker; raises CircuitOpenError when open
+
+        Any exception from ``fn`` counts as a failure and is re-raised.
+        """
+        if not self.allow():
+            raise CircuitOpenError(f"{self.name} circuit is open")
+        try:
+            result = fn(*args, **kwargs)
+        except Exception as e:
+            self.record_failure(e)
+            raise
+        self.record_success()
+        return result
+
+    def snapshot(self):
+        with self._lock:
+            self._trim(time.time())
+            failures = sum(1 for _, succeeded in self._calls if not succeeded)
+            retry_in = None
+            if self.state == OPEN:
+                retry_in = max(0.0, self._opened_at + self._current_open_seconds - time.time())
+            return dict(
+                self.stats,
+                state=self.state,
+                window_calls=len(self._calls),
+                window_failure_rate=failures / len(self._calls) if self._calls else 0.0,
+                retry_in_seconds=retry_in,
+            )
+
+
+breakers = {
+    "finnhub": CircuitBreaker("finnhub", min_calls=3),
+    "openai": CircuitBreaker("openai", min_calls=3),
+    # Sheets logging is optional, so back off from it for longer
+    "sheets": CircuitBreaker("sheets", min_calls=2, open_seconds=300),
+}
+
+
+def get(name):
+    return breakers[name]
+
+
+def degraded():
+    """Names of upstreams whose breaker is not closed"""
+    return [name for name, breaker in breakers.items() if breaker.state != CLOSED]
+
+
+def status():
+    """Breaker state for every upstream, for /api/status"""
+    return {name: breaker.snapshot() for name, breaker in breakers.items()}
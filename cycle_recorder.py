@@ -0,0 +1,221 @@
+import os
+import copy
+import gzip
+import json
+import time
+import threading
+import logging
+from datetime import datetime
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+# Set CYCLE_RECORDING=0 to stop recording live cycles
+RECORDING_ENABLED = os.environ.get("CYCLE_RECORDING", "1") == "1"
+RECORD_DIR = os.environ.get("CYCLE_RECORD_DIR", "recordings")
+RECORD_VERSION = 1
+
+_lock = threading.Lock()
+# The record of the cycle in progress (cycles never overlap, see trading_bot.cycle_lock)
+_current = None
+
+
+def begin(cycle_id, portfolio, open_orders):
+    """Start capturing a cycle's inputs, with the state it starts from"""
+    global _current
+    with _lock:
+        _current = {
+            "version": RECORD_VERSION,
+            "cycle_id": cycle_id,
+            "started": time.time(),
+            "portfolio": copy.deepcopy(portfolio),
+            "open_orders": open_orders,
+            "responses": [],
+        }
+    return _current
+
+
+def note(key, value):
+    """Capture one input of the cycle in progress (no-op outside a cycle)"""
+    with _lock:
+        if _current is not None:
+            _current[key] = copy.deepcopy(value)
+
+
+def note_response(text, error=None):
+    """Capture a raw model response, in the order the decision stage saw it"""
+    with _lock:
+        if _current is not None:
+            _current["responses"].append({"text": text, "error": error})
+
+
+def finish(outcome, write=True):
+    """Close the cycle record and append it to today's recording file
+
+    Files are gzip-compressed JSON lines, one per cycle. Each append adds a
+    new gzip member, so the files stay append-only and readable as a whole.
+    """
+    global _current
+    with _lock:
+        record, _current = _current, None
+    if record is None:
+        return None
+
+    record["duration_seconds"] = time.time() - record["started"]
+    record["outcome"] = outcome
+    if write and RECORDING_ENABLED:
+        path = os.path.join(RECORD_DIR, f"cycles-{datetime.now().strftime('%Y-%m-%d')}.jsonl.gz")
+        try:
+            os.makedirs(RECORD_DIR, exist_ok=True)
+            with gzip.open(path, "at", encoding="utf-8") as f:
+                f.write(json.dumps(record, separators=(",", ":"), default=str) + "\n")
+        except OSError as e:
+            logger.error("Error recording cycle: %s", e)
+    return record
+
+
+def load(path):
+    """Yield the cycle records of a recording file"""
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+def outcome_of(decision, portfolio, open_orders):
+    """The parts of a cycle's result a replay must reproduce exactly"""
+    return {
+        "action": decision.get("action"),
+        "ticker": decision.get("ticker", ""),
+        "orders": decision.get("orders", []),
+        "source": decision.get("source"),
+        "cash": round(portfolio["cash"], 6),
+        "positions": {t: p["shares"] for t, p in portfolio["positions"].items() if p["shares"]},
+        "open_orders": [[o["ticker"], o["side"], o["type"], o["shares"] - o["filled"]] for o in open_orders],
+    }
+
+
+@contextmanager
+def offline(record):
+    """Replace every external input and side effect of a cycle with the recording
+
+    Quotes, news, market hours, the model, the clock and sizing targets come
+    from ``record``; portfolio saves, Google Sheets, the history store, the
+    price history file and the Monte Carlo growth projection are disabled.
+    """
+    import trading_bot
+    import order_book
+    import history_store
+    import llm_executor
+    import position_sizer
+
+    started = datetime.fromtimestamp(record["started"])
+
+    class RecordedDatetime(datetime):
+        @classmethod
+        def now(cls, tz=None):
+            return started.astimezone(tz) if tz else started
+
+    def decide(request_fns, validate, deadline=None):
+        decisions = []
+        for response in record["responses"]:
+            try:
+                decisions.append(validate(response["text"]))
+            except ValueError:
+                continue
+            if len(request_fns) == 1:
+                break
+        if not decisions:
+            raise llm_executor.DecisionTimeout("No valid response in the recording")
+        if len(request_fns) > 1:
+            return llm_executor.vote(decisions)
+        decisions[0]["source"] = record["outcome"].get("source")
+        return decisions[0]
+
+    patches = [
+        (trading_bot, "get_market_signals", lambda: copy.deepcopy(record.get("signals", {}))),
+        (trading_bot, "get_news_headlines", lambda *args, **kwargs: copy.deepcopy(record.get("news", []))),
+        (trading_bot, "isMarketOpen", lambda: record.get("market_open", False)),
+        # A cycle without a prompt ran without an API key configured
+        (trading_bot, "get_openai_client", lambda: object() if record.get("prompt") is not None else None),
+        (trading_bot, "init_sheet", lambda: None),
+        (trading_bot, "save_portfolio", lambda: None),
+        (trading_bot, "datetime", RecordedDatetime),
+        # The projection reads price_history.npz and is not part of a cycle's outcome
+        (trading_bot, "refresh_growth_projection", lambda: trading_bot.latest_growth_projection),
+        (order_book, "datetime", RecordedDatetime),
+        (order_book, "expire_orders", lambda now=None, expire=order_book.expire_orders: expire(record["started"])),
+        (history_store, "record", lambda *args, **kwargs: None),
+        (llm_executor, "decide", decide),
+        (position_sizer, "on_quote", lambda signals: None),
+        (position_sizer, "target_weights", lambda: record.get("sizing_targets", {})),
+    ]
+    originals = [(module, name, getattr(module, name)) for module, name, _ in patches]
+    for module, name, replacement in patches:
+        setattr(module, name, replacement)
+    try:
+        yield
+    finally:
+        for module, name, original in originals:
+            setattr(module, name, original)
+
+
+def replay_cycle(record):
+    """Re-run one recorded cycle offline; returns (replayed record, mismatches)"""
+    import trading_bot
+    import order_book
+    import risk
+
+    order_book.reset()
+    order_book.restore(copy.deepcopy(record["open_orders"]))
+    trading_bot.portfolio = copy.deepcopy(record["portfolio"])
+    risk.sync(trading_bot.portfolio)
+
+    with offline(record):
+        trading_bot._run_trading_cycle(replay=True)
+    replayed = trading_bot.last_cycle_record
+
+    mismatches = [
+        key for key in ("prompt", "market_open")
+        if replayed.get(key) != record.get(key)
+    ]
+    expected = json.loads(json.dumps(record["outcome"]))
+    actual = json.loads(json.dumps(replayed["outcome"]))
+    mismatches += [key for key in expected if expected[key] != actual.get(key)]
+    return replayed, mismatches
+
+
+if __name__ == "__main__":
+    import argparse
+    import cProfile
+    import pstats
+
+    parser = argparse.ArgumentParser(description="Replay recorded trading cycles offline")
+    parser.add_argument("files", nargs="+", help="recording files (cycles-YYYY-MM-DD.jsonl.gz)")
+    parser.add_argument("--repeat", type=int, default=1, help="replay the whole set this many times")
+    parser.add_argument("--profile", action="store_true", help="print the top functions by cumulative time")
+    args = parser.parse_args()
+
+    import trading_bot
+    logging.getLogger().setLevel(logging.WARNING)
+
+    records = [record for path in args.files for record in load(path)]
+    profiler = cProfile.Profile() if args.profile else None
+    diverged = 0
+    started = time.perf_counter()
+    for _ in range(args.repeat):
+        for record in records:
+            if profiler:
+                profiler.enable()
+            _, mismatches = replay_cycle(record)
+            if profiler:
+                profiler.disable()
+            if mismatches:
+                diverged += 1
+                print(f"cycle {record['cycle_id']}: differs in {', '.join(mismatches)}")
+    elapsed = time.perf_counter() - started
+
+    total = len(records) * args.repeat
+    print(f"replayed {total} cycles in {elapsed:.2f}s ({total / elapsed if elapsed else 0:.1f} cycles/s), {diverged} diverged")
+    if profiler:
+        pstats.Stats(profiler).sort_stats("cumulative").print_stats(25)
@@ -0,0 +1,129 @@
+import os
+import math
+import time
+import logging
+from datetime import datetime
+import market_calendar
+
+logger = logging.getLogger(__name__)
+
+# Cadence configuration (seconds)
+BASE_INTERVAL = int(os.environ.get("BOT_CYCLE_INTERVAL", 300))
+FAST_INTERVAL = int(os.environ.get("BOT_FAST_INTERVAL", 60))
+ERROR_RETRY_INTERVAL = int(os.environ.get("BOT_ERROR_RETRY_INTERVAL", 60))
+MAX_BACKOFF = int(os.environ.get("BOT_MAX_BACKOFF", 1800))
+
+# Absolute percent move on any of these tickers that switches to the fast cadence
+VOLATILITY_THRESHOLD = float(os.environ.get("BOT_VOLATILITY_THRESHOLD", 2.0))
+VOLATILITY_TICKERS = ["spy", "qqq", "iwm", "vixy", "uvxy"]
+
+# Fraction of tickers rate limited (HTTP 429) before the upstream counts as throttled
+THROTTLE_FRACTION = 0.2
+
+# Number of upcoming runs projected for /api/status
+PREVIEW_RUNS = 3
+
+
+def _format(epoch):
+    return datetime.fromtimestamp(epoch).strftime("%Y-%m-%d %H:%M:%S")
+
+
+def is_volatile(signals):
+    """Check if any volatility-sensitive ticker moved more than the threshold"""
+    for ticker in VOLATILITY_TICKERS:
+        percent_change = (signals or {}).get(ticker, {}).get("dp")
+        if isinstance(percent_change, (int, float)) and abs(percent_change) >= VOLATILITY_THRESHOLD:
+            return True
+    return False
+
+
+def is_throttled(signals):
+    """Check if a meaningful share of quotes came back rate limited"""
+    if not signals:
+        return False
+    throttled = sum(1 for quote in signals.values() if isinstance(quote, dict) and quote.get("error") == 429)
+    return throttled >= max(1, len(signals) * THROTTLE_FRACTION)
+
+
+def next_boundary(now, interval):
+    """Return the first wall-clock multiple of ``interval`` strictly after ``now``"""
+    return (math.floor(now / interval) + 1) * interval
+
+
+class CycleScheduler:
+    """Plans trading cycle start times for run_bot_thread
+
+    Runs are aligned to wall-clock multiples of the active interval, so a
+    cycle's own runtime never pushes later cycles back. If a cycle overruns
+    a boundary, that slot is skipped rather than run back to back. The
+    cadence backs off while the market is closed or upstream is throttled,
+    and speeds up during volatility spikes.
+    """
+
+    def __init__(self):
+        self.mode = "starting"
+        self.interval = BASE_INTERVAL
+        self.next_run = None
+        self.last_started = None
+        self.last_duration = None
+        self.consecutive_failures = 0
+
+    def plan_next(self, started, finished, signals=None, error=False, fetched=None):
+        """Record a finished cycle and return the epoch time of the next one
+
+        ``fetched`` holds the quotes actually requested upstream this cycle
+        (default: ``signals``); the rate-limit check is made against those.
+        """
+        self.last_started = started
+        self.last_duration = finished - started
+
+        if error or is_throttled(signals if fetched is None else fetched):
+            self.consecutive_failures += 1
+            base = ERROR_RETRY_INTERVAL if error else BASE_INTERVAL
+            self.mode = "error_backoff" if error else "throttled"
+            self.interval = min(base * 2 ** (self.consecutive_failures - 1), MAX_BACKOFF)
+            # Backoff is relative to now: aligning would let a retry fire immediately
+            self.next_run = finished + self.interval
+        else:
+            self.consecutive_failures = 0
+            wait_for_open = market_calendar.seconds_until_open(finished)
+            if wait_for_open > 0:
+                self.mode = "market_closed"
+                self.interval = BASE_INTERVAL
+                self.next_run = finished + wait_for_open
+            else:
+                volatile = is_volatile(signals)
+                self.mode = "fast" if volatile else "normal"
+                self.interval = FAST_INTERVAL if volatile else BASE_INTERVAL
+                self.next_run = next_boundary(finished, self.interval)
+
+        logger.info("Next cycle at %s (%s, last cycle took %.1fs)", _format(self.next_run), self.mode, self.last_duration)
+        return self.next_run
+
+    def upcoming(self, count=PREVIEW_RUNS):
+        """Project the next few run times assuming current conditions persist"""
+        if self.next_run is None:
+            return []
+        runs = [self.next_run]
+        while len(runs) < count:
+            if self.mode in ("normal", "fast", "market_closed"):
+                candidate = next_boundary(runs[-1], self.interval)
+                if not market_calendar.is_open(candidate):
+                    upcoming_open = market_calendar.next_open(candidate)
+                    candidate = upcoming_open.timestamp() if upcoming_open else candidate
+            else:
+                candidate = runs[-1] + self.interval
+            runs.append(candidate)
+        return [_format(run) for run in runs]
+
+    def snapshot(self):
+        """Return the schedule state for /api/status"""
+        return {
+            "mode": self.mode,
+            "interval_seconds": self.interval,
+            "next_run": _format(self.next_run) if self.next_run else None,
+            "seconds_until_next_run": max(0.0, self.next_run - time.time()) if self.next_run else None,
+            "last_cycle_seconds": self.last_duration,
+            "consecutive_failures": self.consecutive_failures,
+            "upcoming_runs": self.upcoming(),
+        }
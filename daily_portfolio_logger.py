@@ -1,5 +1,3 @@
-import gspread
-from oauth2client.service_account import ServiceAccountCredentials
 import os
 from datetime import datetime
 import logging
@@ -9,6 +7,9 @@ logger = logging.getLogger(__name__)
 def init_daily_logging_sheet():
     """Initialize daily portfolio logging sheet"""
     try:
+        import gspread
+        from oauth2client.service_account import ServiceAccountCredentials
+
         CREDENTIALS_FILE = "nexusGateFund.json"
         if not os.path.exists(CREDENTIALS_FILE):
             # Try alternative credentials files
@@ -41,7 +42,7 @@ def init_daily_logging_sheet():
         
         return worksheet
     except Exception as e:
-        logger.error(f"Failed to initialize daily logging sheet: {str(e)}")
+        logger.error("Failed to initialize daily logging sheet: %s", e)
         return None
 
 def log_daily_portfolio_value(portfolio_value, portfolio_data):
@@ -75,9 +76,9 @@ def log_daily_portfolio_value(portfolio_value, portfolio_data):
         ]
         
         sheet.append_row(row_data)
-        logger.info(f"Successfully logged daily portfolio value: ${portfolio_value:.2f}")
+        logger.info("Successfully logged daily portfolio value: $%.2f", portfolio_value)
         return True
         
     except Exception as e:
-        logger.error(f"Failed to log daily portfolio value: {str(e)}")
+        logger.error("Failed to log daily portfolio value: %s", e)
         return False
\ No newline at end of file
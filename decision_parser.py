@@ -0,0 +1,245 @@
+import json
+import logging
+
+logger = logging.getLogger(__name__)
+
+ACTIONS = ("BUY", "SELL", "HOLD")
+ORDER_TYPES = ("market", "limit", "stop")
+MAX_ORDERS = 5
+
+
+class DecisionSchemaError(ValueError):
+    """The model's decision does not match the decision schema"""
+
+
+class StreamingDecisionParser:
+    """Incremental JSON scanner for streamed decision payloads
+
+    Feed completion chunks as they arrive. Scalar fields of the top-level
+    object, and of each object in its ``orders`` array, become available as
+    soon as their value is complete, before the rest of the payload has
+    been generated. ``complete`` turns true when the top-level object closes,
+    so trailing text from the model does not need to be waited for.
+    """
+
+    def __init__(self):
+        self.text = []
+        self.fields = {}
+        self.orders = []
+        self.complete = False
+        self._started = False
+        self._stack = []          # container chars: "{" or "["
+        self._keys = []           # current key per open object
+        self._expect_key = False
+        self._in_string = False
+        self._escape = False
+        self._token = []
+        self._scalar = []
+
+    def feed(self, chunk):
+        for char in chunk:
+            if self.complete:
+                return
+            if not self._started:
+                if char != "{":
+                    continue
+                self._started = True
+            self.text.append(char)
+            self._consume(char)
+
+    def _path(self):
+        """Return where a value being completed belongs: top-level, an order, or elsewhere"""
+        if len(self._stack) == 1:
+            return "top"
+        if len(self._stack) == 3 and self._stack[1] == "[" and self._keys[0] == "orders":
+            return "order"
+        return None
+
+    def _store(self, value):
+        path = self._path()
+        key = self._keys[-1] if self._keys else None
+        if path == "top":
+            self.fields[key] = value
+        elif path == "order":
+            self.orders[-1][key] = value
+
+    def _finish_scalar(self):
+        if not self._scalar:
+            return
+        raw = "".join(self._scalar).strip()
+        self._scalar = []
+        if raw:
+            try:
+                self._store(json.loads(raw))
+            except ValueError:
+                self._store(raw)
+
+    def _consume(self, char):
+        if self._in_string:
+            if self._escape:
+                self._escape = False
+                self._token.append(char)
+            elif char == "\\":
+                self._escape = True
+                self._token.append(char)
+            elif char == '"':
+                self._in_string = False
+                value = json.loads('"' + "".join(self._token) + '"')
+                self._token = []
+                if self._stack[-1] == "{" and self._expect_key:
+                    self._keys[-1] = value
+                    self._expect_key = False
+                else:
+                    self._store(value)
+            else:
+                self._token.append(char)
+            return
+
+        if char == '"':
+            self._in_string = True
+        elif char == "{":
+            if len(self._stack) == 2 and self._stack[1] == "[" and self._keys[0] == "orders":
+                self.orders.append({})
+            self._stack.append("{")
+            self._keys.append(None)
+            self._expect_key = True
+        elif char == "[":
+            self._stack.append("[")
+        elif char in "}]":
+            self._finish_scalar()
+            self._stack.pop()
+            if char == "}":
+                self._keys.pop()
+            self._expect_key = False
+            if not self._stack:
+                self.complete = True
+        elif char == ",":
+            self._finish_scalar()
+            self._expect_key = self._stack[-1] == "{"
+        elif char == ":":
+            self._expect_key = False
+        elif not char.isspace() or self._scalar:
+            self._scalar.append(char)
+
+    def payload(self):
+        """Return the complete top-level JSON object text"""
+        return "".join(self.text)
+
+
+def check_early(parser, tickers):
+    """Validate fields as soon as they arrive; raises DecisionSchemaError to abort the stream"""
+    action = parser.fields.get("action")
+    if action is not None and str(action).upper() not in ACTIONS:
+        raise DecisionSchemaError(f"Invalid action: {action}")
+    ticker = parser.fields.get("ticker")
+    if ticker and str(ticker).lower() not in tickers:
+        raise DecisionSchemaError(f"Unknown ticker: {ticker}")
+    seen = set()
+    for order in parser.orders:
+        order_ticker = order.get("ticker")
+        if order_ticker and str(order_ticker).lower() not in tickers:
+            raise DecisionSchemaError(f"Unknown ticker: {order_ticker}")
+        # Only orders whose action is known and is not HOLD count as trades
+        if order_ticker and order.get("action") is not None and str(order["action"]).upper() != "HOLD":
+            if str(order_ticker).lower() in seen:
+                raise DecisionSchemaError(f"More than one order for {order_ticker}")
+            seen.add(str(order_ticker).lower())
+
+
+def early_decision(parser):
+    """A single-order decision from a stream still in progress, or None until it is actionable
+
+    Needs action, ticker and order_type, plus the limit or stop price for
+    those order types; the rationale is not awaited.
+    """
+    fields = parser.fields
+    if parser.orders or not all(key in fields for key in ("action", "ticker", "order_type")):
+        return None
+    decision = {"action": fields["action"], "ticker": fields["ticker"], "order_type": fields["order_type"]}
+    price_field = {"limit": "limit_price", "stop": "stop_price"}.get(str(fields["order_type"]).lower())
+    if price_field:
+        if price_field not in fields:
+            return None
+        decision[price_field] = fields[price_field]
+    decision["rationale"] = fields.get("rationale") or "Decided from streamed action/ticker (rationale not awaited)"
+    return decision
+
+
+def _validate_order(order, tickers):
+    if not isinstance(order, dict):
+        raise DecisionSchemaError("Each order must be an object")
+
+    action = str(order.get("action", "")).upper()
+    if action not in ACTIONS:
+        raise DecisionSchemaError(f"Invalid action: {order.get('action')}")
+
+    ticker = order.get("ticker") or ""
+    if not isinstance(ticker, str):
+        raise DecisionSchemaError("ticker must be a string")
+    ticker = ticker.lower()
+    if action != "HOLD" and ticker not in tickers:
+        raise DecisionSchemaError(f"Unknown ticker: {order.get('ticker')}")
+
+    if ticker not in tickers:
+        ticker = ""
+    validated = {"action": action, "ticker": ticker}
+
+    order_type = str(order.get("order_type", "market")).lower()
+    if order_type not in ORDER_TYPES:
+        raise DecisionSchemaError(f"Invalid order_type: {order.get('order_type')}")
+    if order_type != "market":
+        price_field = "limit_price" if order_type == "limit" else "stop_price"
+        price = order.get(price_field)
+        if not isinstance(price, (int, float)) or price <= 0:
+            raise DecisionSchemaError(f"{order_type} orders need a positive {price_field}")
+        validated[price_field] = float(price)
+    validated["order_type"] = order_type
+    return validated
+
+
+def validate_decision(payload, tickers, max_orders=MAX_ORDERS):
+    """Validate a decision payload and return it in normalized form
+
+    Accepts the single-order shape ``{"action", "ticker", "rationale"}`` or
+    a multi-order shape ``{"orders": [...], "rationale"}``. The result always
+    has ``action``/``ticker`` (the first order) plus an ``orders`` list.
+    Raises DecisionSchemaError if anything does not match.
+    """
+    if not isinstance(payload, dict):
+        raise DecisionSchemaError("Decision must be a JSON object")
+
+    rationale = payload.get("rationale")
+    if not isinstance(rationale, str) or not rationale.strip():
+        raise DecisionSchemaError("rationale must be a non-empty string")
+
+    raw_orders = payload["orders"] if "orders" in payload else [payload]
+    if not isinstance(raw_orders, list) or not raw_orders:
+        raise DecisionSchemaError("orders must be a non-empty list")
+    if len(raw_orders) > max_orders:
+        raise DecisionSchemaError(f"At most {max_orders} orders per decision")
+
+    orders = [_validate_order(order, tickers) for order in raw_orders]
+    # HOLD entries carry no order
+    trades = [order for order in orders if order["action"] != "HOLD"]
+    tickers_traded = [order["ticker"] for order in trades]
+    if len(set(tickers_traded)) < len(tickers_traded):
+        raise DecisionSchemaError("Each order must be on a different ticker")
+
+    first = trades[0] if trades else {"action": "HOLD", "ticker": ""}
+    decision = dict(first)
+    decision["rationale"] = rationale.strip()
+    decision["orders"] = trades
+    return decision
+
+
+def parse_decision_text(text, tickers, max_orders=MAX_ORDERS):
+    """Parse a complete (non-streamed) response and validate it"""
+    parser = StreamingDecisionParser()
+    parser.feed(text)
+    if not parser.complete:
+        raise DecisionSchemaError("Response does not contain a complete JSON object")
+    try:
+        payload = json.loads(parser.payload())
+    except ValueError as e:
+        raise DecisionSchemaError(f"Malformed JSON: {e}")
+    return validate_decision(payload, tickers, max_orders)
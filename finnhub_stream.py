@@ -0,0 +1,204 @@
+import os
+import json
+import time
+import random
+import threading
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Point FINNHUB_WS_URL at a local stand-in to replay recorded ticks
+FINNHUB_WS_URL = os.environ.get("FINNHUB_WS_URL", "wss://ws.finnhub.io")
+# The stream counts as down if nothing (trades or pings) arrived for this long
+STALE_AFTER = float(os.environ.get("FINNHUB_STREAM_STALE_SECONDS", 60))
+MAX_BACKOFF = 60
+
+# Session day boundary: 05:00 UTC falls between the post-market close and the pre-market open
+_SESSION_DAY_OFFSET = 5 * 3600
+
+# symbol -> quote in Finnhub /quote shape (c, d, dp, h, l, o, pc, t), updated in place
+# by the stream thread under _lock; readers take a copy with snapshot().
+quotes = {}
+_lock = threading.Lock()
+
+stream_status = {
+    "enabled": False,
+    "seeded": False,
+    "connected": False,
+    "last_message": None,
+    "messages": 0,
+    "trades": 0,
+    "reconnects": 0,
+    "last_error": None,
+}
+
+_stop = threading.Event()
+_thread = None
+_socket = None
+
+
+def _session_day(epoch_seconds):
+    return (epoch_seconds - _SESSION_DAY_OFFSET) // 86400
+
+
+def seed(signals):
+    """Refresh the baseline (open, previous close, ...) from a REST snapshot"""
+    with _lock:
+        for ticker, quote in signals.items():
+            live = quotes.get(ticker)
+            if live is not None and isinstance(quote.get("c"), (int, float)):
+                live.update(quote)
+                stream_status["seeded"] = True
+
+
+def apply_trade(trade):
+    """Fold one trade tick ({"s", "p", "t" ms, "v"}) into the quote table; caller holds _lock"""
+    quote = quotes.get(trade.get("s", "").lower())
+    price = trade.get("p")
+    if quote is None or not isinstance(price, (int, float)):
+        return
+
+    ts = int(trade.get("t", time.time() * 1000)) // 1000
+    last = quote.get("c")
+    if not isinstance(last, (int, float)):
+        quote.update({"c": price, "o": price, "h": price, "l": price, "pc": price, "d": 0.0, "dp": 0.0, "t": ts})
+        return
+
+    # First trade of a new session: yesterday's last price becomes the previous close
+    if _session_day(ts) > _session_day(quote.get("t") or ts):
+        quote.update({"pc": last, "o": price, "h": price, "l": price})
+
+    quote["c"] = price
+    quote["t"] = ts
+    if price > quote.get("h", price):
+        quote["h"] = price
+    if price < quote.get("l", price):
+        quote["l"] = price
+    previous_close = quote.get("pc")
+    if previous_close:
+        quote["d"] = price - previous_close
+        quote["dp"] = (price - previous_close) / previous_close * 100
+
+
+def handle_message(message):
+    """Process one raw WebSocket message from Finnhub"""
+    stream_status["last_message"] = time.time()
+    stream_status["messages"] += 1
+    try:
+        payload = json.loads(message)
+    except ValueError:
+        logger.warning("Ignoring malformed stream message")
+        return
+
+    if payload.get("type") == "trade":
+        with _lock:
+            for trade in payload.get("data") or []:
+                apply_trade(trade)
+        stream_status["trades"] += len(payload.get("data") or [])
+    elif payload.get("type") == "error":
+        logger.warning("Finnhub stream error: %s", payload.get('msg'))
+
+
+def is_healthy():
+    last_message = stream_status["last_message"]
+    return (
+        stream_status["connected"]
+        and stream_status["seeded"]
+        and last_message is not None
+        and time.time() - last_message < STALE_AFTER
+    )
+
+
+def snapshot():
+    """Return a copy of the quote table, or None if the stream is down or not yet seeded
+
+    The copy is taken under the stream lock, so callers can iterate and
+    record it while trades keep arriving.
+    """
+    if not is_healthy():
+        return None
+    with _lock:
+        return {symbol: dict(quote) for symbol, quote in quotes.items()}
+
+
+def _run(symbols, token):
+    global _socket
+    # Imported here so the web app doesn't pay for it unless streaming is enabled
+    import websocket
+
+    attempt = 0
+
+    def on_open(ws):
+        nonlocal attempt
+        attempt = 0
+        stream_status["connected"] = True
+        stream_status["last_message"] = time.time()
+        for symbol in symbols:
+            ws.send(json.dumps({"type": "subscribe", "symbol": symbol.upper()}))
+        logger.info("Finnhub stream connected, subscribed to %s symbols", len(symbols))
+
+    def on_message(ws, message):
+        handle_message(message)
+
+    def on_error(ws, error):
+        stream_status["last_error"] = str(error)
+        logger.warning("Finnhub stream error: %s", error)
+
+    def on_close(ws, status_code, reason):
+        stream_status["connected"] = False
+
+    while not _stop.is_set():
+        _socket = websocket.WebSocketApp(
+            f"{FINNHUB_WS_URL}?token={token}",
+            on_open=on_open,
+            on_message=on_message,
+            on_error=on_error,
+            on_close=on_close,
+        )
+        _socket.run_forever(ping_interval=20, ping_timeout=10)
+        stream_status["connected"] = False
+        if _stop.is_set():
+            break
+
+        # Exponential backoff with jitter before reconnecting
+        attempt += 1
+        stream_status["reconnects"] += 1
+        delay = min(MAX_BACKOFF, 2 ** attempt) * random.uniform(0.5, 1.0)
+        logger.info("Finnhub stream disconnected, reconnecting in %.1fs", delay)
+        _stop.wait(delay)
+
+    logger.info("Finnhub stream stopped")
+
+
+def start(symbols, token):
+    """Start the background stream for ``symbols`` (idempotent)"""
+    global _thread
+
+    if _thread and _thread.is_alive():
+        return
+    with _lock:
+        for symbol in symbols:
+            quotes.setdefault(symbol.lower(), {"c": "N/A"})
+
+    _stop.clear()
+    stream_status["enabled"] = True
+    _thread = threading.Thread(target=_run, args=(list(symbols), token), name="finnhub-stream", daemon=True)
+    _thread.start()
+
+
+def stop():
+    """Stop the background stream"""
+    _stop.set()
+    stream_status["enabled"] = False
+    socket_app = _socket
+    if socket_app is not None:
+        # WebSocketApp.close() waits for the server's close reply, which the reader thread
+        # may consume first; send the close frame and wake the reader directly instead
+        socket_app.keep_running = False
+        connection = socket_app.sock
+        if connection is not None:
+            try:
+                connection.send_close()
+            except Exception as e:
+                logger.debug("Could not send close frame: %s", e)
+            connection.abort()
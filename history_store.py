@@ -0,0 +1,174 @@
+import os
+import json
+import time
+import queue
+import sqlite3
+import threading
+import logging
+
+logger = logging.getLogger(__name__)
+
+HISTORY_DB = os.environ.get("HISTORY_DB", "history.db")
+# Events written per transaction, and the longest an event waits in the queue
+BATCH_SIZE = 500
+FLUSH_INTERVAL = 1.0
+MAX_PAGE_SIZE = 1000
+
+EVENT_KINDS = ("cycle", "decision", "fill", "valuation")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS events (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    ts REAL NOT NULL,
+    kind TEXT NOT NULL,
+    ticker TEXT,
+    payload TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_events_ts ON events(ts);  -- (ts, rowid), so it also serves the (ts, id) order
+DROP INDEX IF EXISTS idx_events_ticker;
+DROP INDEX IF EXISTS idx_events_kind;
+CREATE INDEX IF NOT EXISTS idx_events_ticker_ts ON events(ticker, ts, id);
+CREATE INDEX IF NOT EXISTS idx_events_kind_ts ON events(kind, ts, id);
+"""
+
+_queue = queue.Queue()
+_writer = None
+_start_lock = threading.Lock()
+_readers = threading.local()
+
+
+def _connect():
+    connection = sqlite3.connect(HISTORY_DB, timeout=10)
+    # WAL lets API reads proceed while the writer thread commits
+    connection.execute("PRAGMA journal_mode=WAL")
+    connection.execute("PRAGMA synchronous=NORMAL")
+    return connection
+
+
+def _write_loop():
+    connection = _connect()
+    connection.executescript(SCHEMA)
+
+    while True:
+        batch = [_queue.get()]
+        deadline = time.time() + FLUSH_INTERVAL
+        while len(batch) < BATCH_SIZE:
+            remaining = deadline - time.time()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(_queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+
+        rows = [item for item in batch if not isinstance(item, threading.Event)]
+        try:
+            with connection:
+                connection.executemany(
+                    "INSERT INTO events (ts, kind, ticker, payload) VALUES (?, ?, ?, ?)", rows
+                )
+        except sqlite3.Error as e:
+            logger.error("Failed to write %s history events: %s", len(rows), e)
+
+        # Flush markers are released once everything queued before them is committed
+        for item in batch:
+            if isinstance(item, threading.Event):
+                item.set()
+
+
+def start():
+    """Create the schema and start the background writer (idempotent)"""
+    global _writer
+
+    with _start_lock:
+        if _writer and _writer.is_alive():
+            return
+        _writer = threading.Thread(target=_write_loop, name="history-writer", daemon=True)
+        _writer.start()
+        logger.info("History store writing to %s", HISTORY_DB)
+
+
+def record(kind, payload, ticker=None, ts=None):
+    """Queue an event for writing; never blocks the caller on disk I/O"""
+    if _writer is None:
+        start()
+    _queue.put((
+        ts if ts is not None else time.time(),
+        kind,
+        ticker.lower() if ticker else None,
+        json.dumps(payload, default=str),
+    ))
+
+
+def flush(timeout=5):
+    """Wait until every event queued so far has been committed"""
+    if _writer is None:
+        return True
+    marker = threading.Event()
+    _queue.put(marker)
+    return marker.wait(timeout)
+
+
+def _reader():
+    connection = getattr(_readers, "connection", None)
+    if connection is None:
+        connection = _connect()
+        connection.executescript(SCHEMA)
+        _readers.connection = connection
+    return connection
+
+
+def parse_cursor(cursor):
+    """Split a ``next_cursor`` ("<ts>:<id>") into (ts, id); raises ValueError if malformed"""
+    ts, separator, event_id = str(cursor).partition(":")
+    if not separator:
+        raise ValueError(f"malformed cursor {cursor!r}")
+    try:
+        return float(ts), int(event_id)
+    except ValueError:
+        raise ValueError(f"malformed cursor {cursor!r}") from None
+
+
+def query(since=None, ticker=None, kind=None, limit=100, cursor=None):
+    """Return one page of events, newest first, with keyset pagination
+
+    Pages are ordered by ``(ts, id)``: ids only order events written by one
+    process, while the web app and the trading daemon may both write.
+    ``cursor`` is the ``next_cursor`` of the previous page; a malformed one
+    raises ValueError.
+    """
+    limit = max(1, min(int(limit), MAX_PAGE_SIZE))
+    connection = _reader()
+
+    clauses, params = [], []
+    if since is not None:
+        clauses.append("ts >= ?")
+        params.append(since)
+    if ticker:
+        clauses.append("ticker = ?")
+        params.append(ticker.lower())
+    if kind:
+        clauses.append("kind = ?")
+        params.append(kind)
+    if cursor is not None:
+        clauses.append("(ts, id) < (?, ?)")
+        params.extend(parse_cursor(cursor))
+
+    where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+    rows = connection.execute(
+        f"SELECT id, ts, kind, ticker, payload FROM events {where} ORDER BY ts DESC, id DESC LIMIT ?",
+        params + [limit + 1],
+    ).fetchall()
+
+    items = [
+        {
+            "id": row[0],
+            "timestamp": row[1],
+            "kind": row[2],
+            "ticker": row[3].upper() if row[3] else None,
+            "data": json.loads(row[4]),
+        }
+        for row in rows[:limit]
+    ]
+    next_cursor = f"{items[-1]['timestamp']!r}:{items[-1]['id']}" if len(rows) > limit else None
+    return {"items": items, "next_cursor": next_cursor}
@@ -0,0 +1,177 @@
+import os
+import time
+import threading
+import logging
+from collections import Counter, deque
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+logger = logging.getLogger(__name__)
+
+PRIMARY_MODEL = os.environ.get("OPENAI_MODEL", "gpt-4o")
+# Model for the hedged duplicate request; set equal to PRIMARY_MODEL for a plain duplicate
+HEDGE_MODEL = os.environ.get("OPENAI_HEDGE_MODEL", "gpt-4o-mini")
+# Hard limit for the whole decision stage, in seconds
+DECISION_DEADLINE = float(os.environ.get("OPENAI_DECISION_DEADLINE", 30))
+# Fire the hedge once the primary is slower than this percentile of recent latencies
+HEDGE_PERCENTILE = float(os.environ.get("OPENAI_HEDGE_PERCENTILE", 0.9))
+HEDGE_DEFAULT_DELAY = 8.0
+HEDGE_MIN_DELAY = 1.0
+# Prompt variants run in parallel and combined by majority vote (1 disables voting)
+VOTE_VARIANTS = int(os.environ.get("OPENAI_VOTE_VARIANTS", 1))
+
+_latencies = deque(maxlen=200)
+_latency_lock = threading.Lock()
+_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="llm")
+
+executor_stats = {"requests": 0, "hedges_fired": 0, "hedge_wins": 0, "timeouts": 0, "invalid": 0, "cancelled": 0}
+
+
+class DecisionTimeout(Exception):
+    """No valid response arrived before the decision deadline"""
+
+
+class RequestCancelled(Exception):
+    """A request was abandoned because another one already won, or the deadline passed"""
+
+
+def record_latency(seconds):
+    with _latency_lock:
+        _latencies.append(seconds)
+
+
+def hedge_delay():
+    """Seconds to wait for the primary before firing the hedge"""
+    with _latency_lock:
+        samples = sorted(_latencies)
+    if len(samples) < 10:
+        return HEDGE_DEFAULT_DELAY
+    index = min(len(samples) - 1, int(len(samples) * HEDGE_PERCENTILE))
+    return max(HEDGE_MIN_DELAY, samples[index])
+
+
+def _timed(request_fn, model, timeout, cancelled):
+    started = time.monotonic()
+    text = request_fn(model, timeout, cancelled)
+    return text, time.monotonic() - started
+
+
+def _cancel(pending, cancelled):
+    """Abandon requests still in flight: queued ones never start, running ones stop at their next chunk"""
+    cancelled.set()
+    for future in pending:
+        future.cancel()
+    if pending:
+        executor_stats["cancelled"] += len(pending)
+        logger.info("Cancelled %s outstanding request(s)", len(pending))
+
+
+def run_hedged(request_fn, validate, deadline=DECISION_DEADLINE, hedge_model=HEDGE_MODEL):
+    """Return the first valid decision from a primary request and an optional hedge
+
+    ``request_fn(model, timeout, cancelled)`` returns the raw completion
+    text, giving up with RequestCancelled once the ``cancelled`` event is
+    set; ``validate(text)`` turns it into a decision or raises ValueError.
+    The hedge fires when the primary is slower than the recent latency
+    percentile or fails early, and whichever request loses is cancelled.
+    Raises DecisionTimeout if nothing valid arrives before ``deadline``
+    seconds.
+    """
+    started = time.monotonic()
+    hedge_at = hedge_delay()
+    executor_stats["requests"] += 1
+
+    cancelled = threading.Event()
+    pending = {_executor.submit(_timed, request_fn, PRIMARY_MODEL, deadline, cancelled): "primary"}
+    hedged = not hedge_model
+    last_error = None
+
+    try:
+        while True:
+            elapsed = time.monotonic() - started
+            remaining = deadline - elapsed
+            if remaining <= 0:
+                executor_stats["timeouts"] += 1
+                raise DecisionTimeout(f"No valid decision within {deadline:.0f}s" + (f" (last error: {last_error})" if last_error else ""))
+
+            if not hedged and (elapsed >= hedge_at or not pending):
+                logger.info("Firing hedged request to %s after %.1fs", hedge_model, elapsed)
+                pending[_executor.submit(_timed, request_fn, hedge_model, remaining, cancelled)] = "hedge"
+                executor_stats["hedges_fired"] += 1
+                hedged = True
+
+            if not pending:
+                executor_stats["invalid"] += 1
+                raise ValueError(f"All requests failed: {last_error}")
+
+            timeout = remaining if hedged else min(remaining, max(0.0, hedge_at - elapsed))
+            done, _ = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+
+            for future in done:
+                source = pending.pop(future)
+                try:
+                    text, latency = future.result()
+                    decision = validate(text)
+                except Exception as e:
+                    last_error = f"{source}: {e}"
+                    logger.warning("Discarding %s response: %s", source, e)
+                    continue
+
+                if source == "primary":
+                    record_latency(latency)
+                else:
+                    executor_stats["hedge_wins"] += 1
+                decision["source"] = source
+                return decision
+    finally:
+        _cancel(pending, cancelled)
+
+
+def vote(decisions):
+    """Combine decisions by majority on (action, ticker); ties resolve to HOLD"""
+    counts = Counter((d["action"], d.get("ticker", "")) for d in decisions)
+    ranked = counts.most_common()
+    if len(ranked) > 1 and ranked[0][1] == ranked[1][1]:
+        return {
+            "action": "HOLD",
+            "ticker": "",
+            "rationale": f"No majority among {len(decisions)} prompt variants",
+            "votes": {f"{action} {ticker}".strip(): count for (action, ticker), count in ranked},
+        }
+
+    (action, ticker), count = ranked[0]
+    winner = next(d for d in decisions if d["action"] == action and d.get("ticker", "") == ticker)
+    winner["votes"] = {f"{a} {t}".strip(): c for (a, t), c in ranked}
+    return winner
+
+
+def run_voted(request_fns, validate, deadline=DECISION_DEADLINE):
+    """Run prompt variants in parallel and vote over those valid before the deadline
+
+    Each entry of ``request_fns`` is a variant in the ``run_hedged`` format.
+    """
+    started = time.monotonic()
+    cancelled = threading.Event()
+    futures = [_executor.submit(_timed, fn, PRIMARY_MODEL, deadline, cancelled) for fn in request_fns]
+    done, not_done = wait(futures, timeout=deadline)
+    _cancel(not_done, cancelled)
+
+    decisions = []
+    for future in done:
+        try:
+            text, latency = future.result()
+            decisions.append(validate(text))
+            record_latency(latency)
+        except Exception as e:
+            logger.warning("Discarding prompt variant response: %s", e)
+
+    if not decisions:
+        executor_stats["timeouts" if not_done else "invalid"] += 1
+        raise DecisionTimeout(f"No valid variant response within {time.monotonic() - started:.1f}s")
+    return vote(decisions)
+
+
+def decide(request_fns, validate, deadline=DECISION_DEADLINE):
+    """Entry point: hedged single request, or a vote when several variants are given"""
+    if len(request_fns) > 1:
+        return run_voted(request_fns, validate, deadline)
+    return run_hedged(request_fns[0], validate, deadline)
@@ -0,0 +1,157 @@
+import os
+import sys
+import time
+import random
+import logging
+import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from werkzeug.serving import make_server
+
+import app as dashboard
+import static_assets
+
+logger = logging.getLogger(__name__)
+
+# Accept-Encoding sent by the simulated browsers
+ACCEPT_ENCODING = "gzip, deflate, br"
+
+
+class CpuMeter:
+    """WSGI middleware summing the server thread CPU time spent per request"""
+
+    def __init__(self, wsgi_app):
+        self.wsgi_app = wsgi_app
+        self.lock = threading.Lock()
+        self.cpu_seconds = 0.0
+        self.requests = 0
+
+    def __call__(self, environ, start_response):
+        started = time.thread_time()
+        try:
+            # Materialize the body so its rendering is counted too
+            return list(self.wsgi_app(environ, start_response))
+        finally:
+            with self.lock:
+                self.cpu_seconds += time.thread_time() - started
+                self.requests += 1
+
+    def take(self):
+        with self.lock:
+            taken = (self.cpu_seconds, self.requests)
+            self.cpu_seconds, self.requests = 0.0, 0
+        return taken
+
+
+def synthetic_signals(seed=0):
+    """Quotes for every dashboard ticker, so no market data API is needed"""
+    rng = random.Random(seed)
+    signals = {}
+    for ticker in dashboard.dashboard_tickers():
+        previous_close = rng.uniform(20, 500)
+        price = previous_close * (1 + rng.gauss(0, 0.02))
+        signals[ticker] = {
+            "c": price, "d": price - previous_close, "dp": (price / previous_close - 1) * 100,
+            "h": max(price, previous_close) * 1.01, "l": min(price, previous_close) * 0.99,
+            "o": previous_close, "pc": previous_close, "t": int(time.time()),
+        }
+    return signals
+
+
+def fetch(session, url, headers=None):
+    """GET ``url``; returns (status, bytes on the wire, ETag, seconds)"""
+    started = time.perf_counter()
+    response = session.get(url, headers=headers, stream=True)
+    wire = len(response.raw.read(decode_content=False))
+    elapsed = time.perf_counter() - started
+    response.close()
+    return response.status_code, wire, response.headers.get("ETag"), elapsed
+
+
+def asset_urls(base):
+    return [base + static_assets.url(name) for name in ("css/dashboard.css", "js/dashboard.js")]
+
+
+def first_visit(base):
+    """A browser with an empty cache: shell, hashed assets, then the bootstrap call"""
+    with requests.Session() as session:
+        session.headers["Accept-Encoding"] = ACCEPT_ENCODING
+        started = time.perf_counter()
+        wire = 0
+        for url in [base + "/"] + asset_urls(base) + [base + "/api/bootstrap"]:
+            status, size, _, _ = fetch(session, url)
+            assert status == 200, (url, status)
+            wire += size
+        return wire, time.perf_counter() - started
+
+
+def repeat_visit(base, shell_etag):
+    """A returning browser: immutable assets come from its cache, the shell revalidates"""
+    with requests.Session() as session:
+        session.headers["Accept-Encoding"] = ACCEPT_ENCODING
+        started = time.perf_counter()
+        status, wire, _, _ = fetch(session, base + "/", {"If-None-Match": shell_etag})
+        assert status == 304, status
+        status, size, _, _ = fetch(session, base + "/api/bootstrap")
+        assert status == 200, status
+        return wire + size, time.perf_counter() - started
+
+
+def percentile(values, p):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p / 100))]
+
+
+def run(label, visit, clients, views, meter):
+    meter.take()
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=clients) as pool:
+        results = list(pool.map(lambda _: visit(), range(views)))
+    wall = time.perf_counter() - started
+    cpu_seconds, served = meter.take()
+
+    wire = [size for size, _ in results]
+    latency = [seconds * 1000 for _, seconds in results]
+    print(
+        f"{label:<14} {views / wall:8.1f} views/s  {sum(wire) / len(wire) / 1024:6.1f} KB/view  "
+        f"p50 {percentile(latency, 50):6.1f}ms  p95 {percentile(latency, 95):6.1f}ms  p99 {percentile(latency, 99):6.1f}ms  "
+        f"server CPU {cpu_seconds / views * 1000:5.2f}ms/view ({served} requests)"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Concurrent-client load test of the dashboard page load")
+    parser.add_argument("--clients", type=int, default=int(os.environ.get("LOAD_TEST_CLIENTS", 16)))
+    parser.add_argument("--views", type=int, default=int(os.environ.get("LOAD_TEST_VIEWS", 400)))
+    args = parser.parse_args()
+
+    logging.getLogger().setLevel(logging.WARNING)
+    logging.getLogger("werkzeug").setLevel(logging.ERROR)
+
+    # Serve from synthetic quotes that never expire instead of the market data API
+    static_assets.build()
+    dashboard.market_data_cache.update({"timestamp": float("inf"), "data": synthetic_signals()})
+
+    meter = CpuMeter(dashboard.app.wsgi_app)
+    dashboard.app.wsgi_app = meter
+    server = make_server("127.0.0.1", 0, dashboard.app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_port}"
+
+    try:
+        with requests.Session() as session:
+            status, _, shell_etag, _ = fetch(session, base + "/", {"Accept-Encoding": ACCEPT_ENCODING})
+            assert status == 200 and shell_etag, status
+
+        print(f"{args.views} page views from {args.clients} concurrent clients (Accept-Encoding: {ACCEPT_ENCODING})")
+        run("first visit", lambda: first_visit(base), args.clients, args.views, meter)
+        run("repeat visit", lambda: repeat_visit(base, shell_etag), args.clients, args.views, meter)
+    finally:
+        server.shutdown()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
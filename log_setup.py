@@ -0,0 +1,198 @@
+import os
+import sys
+import json
+import time
+import uuid
+import queue
+import atexit
+import random
+import logging
+import threading
+import contextvars
+from contextlib import contextmanager
+from logging.handlers import QueueHandler, QueueListener
+
+LOG_LEVEL = os.environ.get("LOG_LEVEL", "INFO").upper()
+# "json" for structured records, "text" for the classic one-line format
+LOG_FORMAT = os.environ.get("LOG_FORMAT", "json")
+# Records per second allowed per call site (source file + line) before dropping
+LOG_RATE_LIMIT = float(os.environ.get("LOG_RATE_LIMIT", 20))
+# Per-module sampling of DEBUG/INFO records, e.g. "finnhub_stream=0.01,trading_bot=0.5"
+LOG_SAMPLE = os.environ.get("LOG_SAMPLE", "")
+
+TEXT_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+
+# Attributes every LogRecord has; anything else was passed through ``extra``
+_STANDARD_ATTRS = set(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {"message", "asctime"}
+
+_cycle = contextvars.ContextVar("log_cycle", default=None)
+_listener = None
+_configure_lock = threading.Lock()
+
+
+@contextmanager
+def cycle_context(cycle_id=None):
+    """Tag every record logged inside the block with a cycle id"""
+    context = {"id": cycle_id or uuid.uuid4().hex[:12], "stages": {}}
+    token = _cycle.set(context)
+    try:
+        yield context
+    finally:
+        _cycle.reset(token)
+
+
+@contextmanager
+def stage(name):
+    """Time a stage of the current cycle in milliseconds"""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        context = _cycle.get()
+        if context is not None:
+            context["stages"][name] = round((time.perf_counter() - started) * 1000, 2)
+
+
+def stage_timings():
+    """Return the stage timings recorded so far in the current cycle"""
+    context = _cycle.get()
+    return dict(context["stages"]) if context else {}
+
+
+class JsonFormatter(logging.Formatter):
+    """Render records as one JSON object per line"""
+
+    def format(self, record):
+        entry = {
+            "ts": self.formatTime(record),
+            "level": record.levelname,
+            "logger": record.name,
+            "thread": record.threadName,
+            "message": record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _STANDARD_ATTRS:
+                entry[key] = value
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+class RateLimitFilter(logging.Filter):
+    """Token bucket per call site, plus per-module sampling of DEBUG/INFO
+
+    Warnings and errors are never sampled, only rate limited. When records
+    are dropped, a count of them is attached to the next record that gets
+    through from the same call site.
+    """
+
+    def __init__(self, rate=LOG_RATE_LIMIT, sample=LOG_SAMPLE):
+        super().__init__()
+        self.rate = rate
+        self.sample_rates = {}
+        for item in filter(None, (part.strip() for part in sample.split(","))):
+            module, _, fraction = item.partition("=")
+            self.sample_rates[module.strip()] = float(fraction)
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record):
+        if record.levelno < logging.WARNING:
+            fraction = self.sample_rates.get(record.name)
+            if fraction is not None and random.random() >= fraction:
+                return False
+
+        if self.rate <= 0:
+            return True
+
+        # One bucket per logging call site, so the table stays as small as the code base
+        key = (record.pathname, record.lineno)
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated, dropped = self._buckets.get(key, (self.rate, now, 0))
+            tokens = min(self.rate, tokens + (now - updated) * self.rate)
+            if tokens < 1:
+                self._buckets[key] = (tokens, now, dropped + 1)
+                return False
+            self._buckets[key] = (tokens - 1, now, 0)
+        if dropped:
+            record.suppressed = dropped
+        return True
+
+
+class ContextQueueHandler(QueueHandler):
+    """Queue handler that defers JSON rendering to the listener thread
+
+    The message is merged with its arguments in the calling thread, so
+    mutable arguments are logged as they were at the call; the JSON
+    encoding of the record and its ``extra`` fields happens on the
+    listener thread. The cycle id is attached here too.
+    """
+
+    def prepare(self, record):
+        record.msg = record.getMessage()
+        record.args = None
+        context = _cycle.get()
+        if context is not None:
+            record.cycle_id = context["id"]
+        return record
+
+
+def configure_logging():
+    """Route all logging through a queue to a background writer (idempotent)"""
+    global _listener
+
+    with _configure_lock:
+        if _listener is not None:
+            return
+
+        stream_handler = logging.StreamHandler(sys.stderr)
+        stream_handler.setFormatter(JsonFormatter() if LOG_FORMAT == "json" else logging.Formatter(TEXT_FORMAT))
+
+        log_queue = queue.SimpleQueue()
+        queue_handler = ContextQueueHandler(log_queue)
+        queue_handler.addFilter(RateLimitFilter())
+
+        root = logging.getLogger()
+        for handler in list(root.handlers):
+            root.removeHandler(handler)
+        root.addHandler(queue_handler)
+        root.setLevel(LOG_LEVEL)
+
+        _listener = QueueListener(log_queue, stream_handler, respect_handler_level=True)
+        _listener.start()
+        atexit.register(_listener.stop)
+
+
+if __name__ == "__main__":
+    # Micro-benchmark: per-call latency of a log call on the hot path
+    import io
+
+    def measure(logger, count=20000):
+        started = time.perf_counter()
+        for i in range(count):
+            logger.info("Fetched %s tickers in cycle %s", 30, i)
+        return (time.perf_counter() - started) / count * 1e6
+
+    direct = logging.getLogger("bench.direct")
+    direct.propagate = False
+    direct_handler = logging.StreamHandler(io.StringIO())
+    direct_handler.setFormatter(JsonFormatter())
+    direct.addHandler(direct_handler)
+    direct.setLevel(logging.INFO)
+
+    configure_logging()
+    logging.getLogger().handlers[0].filters.clear()
+    _listener.handlers = (logging.StreamHandler(io.StringIO()),)
+    queued = logging.getLogger("bench.queued")
+
+    debug_off = logging.getLogger("bench.debug")
+    debug_off.setLevel(logging.INFO)
+    started = time.perf_counter()
+    for i in range(20000):
+        debug_off.debug("Quote %s: %s", "SPY", i)
+    disabled = (time.perf_counter() - started) / 20000 * 1e6
+
+    print(f"synchronous JSON handler: {measure(direct):.2f} us/call")
+    print(f"queued handler (caller side): {measure(queued):.2f} us/call")
+    print(f"disabled debug call: {disabled:.3f} us/call")
@@ -0,0 +1,251 @@
+import bisect
+import threading
+import logging
+from datetime import date, datetime, time, timedelta
+import pytz
+
+logger = logging.getLogger(__name__)
+
+EASTERN = pytz.timezone('US/Eastern')
+
+# Session times in US Eastern time
+PREMARKET_OPEN = time(4, 0)
+REGULAR_OPEN = time(9, 30)
+REGULAR_CLOSE = time(16, 0)
+EARLY_CLOSE = time(13, 0)
+POSTMARKET_CLOSE = time(20, 0)
+EARLY_POSTMARKET_CLOSE = time(17, 0)
+
+# Years before/after the current year kept in the precomputed session table
+YEARS_BEHIND = 1
+YEARS_AHEAD = 2
+
+# One-off closures that don't follow the regular holiday rules
+SPECIAL_CLOSURES = {
+    date(2018, 12, 5): "National Day of Mourning (George H.W. Bush)",
+    date(2025, 1, 9): "National Day of Mourning (Jimmy Carter)",
+}
+
+_lock = threading.Lock()
+
+# date -> (premarket_open, open, close, postmarket_close) as epoch seconds
+_sessions = {}
+# Sorted epoch seconds of every regular open and close, for next_open/next_close
+_opens = []
+_closes = []
+_years = (0, -1)
+
+
+def _nth_weekday(year, month, weekday, n):
+    """Return the n-th given weekday (0=Monday) of a month"""
+    first = date(year, month, 1)
+    offset = (weekday - first.weekday()) % 7
+    return first + timedelta(days=offset + 7 * (n - 1))
+
+
+def _last_weekday(year, month, weekday):
+    """Return the last given weekday (0=Monday) of a month"""
+    if month == 12:
+        last = date(year, 12, 31)
+    else:
+        last = date(year, month + 1, 1) - timedelta(days=1)
+    return last - timedelta(days=(last.weekday() - weekday) % 7)
+
+
+def _easter(year):
+    """Western Easter Sunday (anonymous Gregorian algorithm)"""
+    a = year % 19
+    b, c = divmod(year, 100)
+    d, e = divmod(b, 4)
+    f = (b + 8) // 25
+    g = (b - f + 1) // 3
+    h = (19 * a + b - d - g + 15) % 30
+    i, k = divmod(c, 4)
+    l = (32 + 2 * e + 2 * i - h - k) % 7
+    m = (a + 11 * h + 22 * l) // 451
+    month, day = divmod(h + l - 7 * m + 114, 31)
+    return date(year, month, day + 1)
+
+
+def _observed(holiday):
+    """Shift a fixed-date holiday falling on a weekend to the nearest weekday"""
+    if holiday.weekday() == 5:
+        return holiday - timedelta(days=1)
+    if holiday.weekday() == 6:
+        return holiday + timedelta(days=1)
+    return holiday
+
+
+def nyse_holidays(year):
+    """Return a dict of NYSE full-day closures for a year, keyed by date"""
+    holidays = {}
+
+    # New Year's Day is not moved back into the previous year when it falls on a Saturday
+    new_year = date(year, 1, 1)
+    if new_year.weekday() == 6:
+        holidays[new_year + timedelta(days=1)] = "New Year's Day"
+    elif new_year.weekday() < 5:
+        holidays[new_year] = "New Year's Day"
+
+    holidays[_nth_weekday(year, 1, 0, 3)] = "Martin Luther King Jr. Day"
+    holidays[_nth_weekday(year, 2, 0, 3)] = "Washington's Birthday"
+    holidays[_easter(year) - timedelta(days=2)] = "Good Friday"
+    holidays[_last_weekday(year, 5, 0)] = "Memorial Day"
+    if year >= 2022:
+        holidays[_observed(date(year, 6, 19))] = "Juneteenth"
+    holidays[_observed(date(year, 7, 4))] = "Independence Day"
+    holidays[_nth_weekday(year, 9, 0, 1)] = "Labor Day"
+    holidays[_nth_weekday(year, 11, 3, 4)] = "Thanksgiving Day"
+    holidays[_observed(date(year, 12, 25))] = "Christmas Day"
+
+    for closure, name in SPECIAL_CLOSURES.items():
+        if closure.year == year:
+            holidays[closure] = name
+
+    return holidays
+
+
+def nyse_early_closes(year, holidays=None):
+    """Return the set of 1:00 PM early-close dates for a year"""
+    holidays = holidays if holidays is not None else nyse_holidays(year)
+    candidates = [
+        date(year, 7, 3),
+        _nth_weekday(year, 11, 3, 4) + timedelta(days=1),
+        date(year, 12, 24),
+    ]
+    return {d for d in candidates if d.weekday() < 5 and d not in holidays}
+
+
+def _epoch(day, at):
+    return EASTERN.localize(datetime.combine(day, at)).timestamp()
+
+
+def _build(first_year, last_year):
+    """Precompute the session table for an inclusive range of years"""
+    sessions = {}
+    for year in range(first_year, last_year + 1):
+        holidays = nyse_holidays(year)
+        early = nyse_early_closes(year, holidays)
+        day = date(year, 1, 1)
+        while day.year == year:
+            if day.weekday() < 5 and day not in holidays:
+                half_day = day in early
+                sessions[day] = (
+                    _epoch(day, PREMARKET_OPEN),
+                    _epoch(day, REGULAR_OPEN),
+                    _epoch(day, EARLY_CLOSE if half_day else REGULAR_CLOSE),
+                    _epoch(day, EARLY_POSTMARKET_CLOSE if half_day else POSTMARKET_CLOSE),
+                )
+            day += timedelta(days=1)
+    return sessions
+
+
+def _ensure_years(year):
+    """Make sure the session table covers ``year``, rebuilding it if needed"""
+    global _sessions, _opens, _closes, _years
+
+    if _years[0] <= year <= _years[1]:
+        return
+
+    with _lock:
+        if _years[0] <= year <= _years[1]:
+            return
+        current_year = datetime.now(EASTERN).year
+        first_year = min(year, current_year) - YEARS_BEHIND
+        last_year = max(year, current_year) + YEARS_AHEAD
+        sessions = _build(first_year, last_year)
+        ordered = sorted(sessions.values(), key=lambda bounds: bounds[1])
+        _sessions = sessions
+        _opens = [bounds[1] for bounds in ordered]
+        _closes = [bounds[2] for bounds in ordered]
+        _years = (first_year, last_year)
+        logger.info("Built NYSE session table for %s-%s (%s sessions)", first_year, last_year, len(sessions))
+
+
+def _to_epoch(ts):
+    if ts is None:
+        return datetime.now(pytz.utc).timestamp()
+    if isinstance(ts, datetime):
+        if ts.tzinfo is None:
+            ts = EASTERN.localize(ts)
+        return ts.timestamp()
+    return float(ts)
+
+
+def _session_for(epoch):
+    day = datetime.fromtimestamp(epoch, EASTERN).date()
+    _ensure_years(day.year)
+    return _sessions.get(day)
+
+
+def is_trading_day(day):
+    """Check if the NYSE holds a session on a given date"""
+    _ensure_years(day.year)
+    return day in _sessions
+
+
+def is_open(ts=None, extended=False):
+    """Check if the market is open at ``ts`` (epoch seconds or datetime, default now)
+
+    With ``extended=True`` pre-market and post-market hours count as open.
+    """
+    epoch = _to_epoch(ts)
+    bounds = _session_for(epoch)
+    if bounds is None:
+        return False
+    if extended:
+        return bounds[0] <= epoch < bounds[3]
+    return bounds[1] <= epoch < bounds[2]
+
+
+def session_bounds(day):
+    """Return the session times for a date, or None if the market is closed that day"""
+    if isinstance(day, datetime):
+        day = day.astimezone(EASTERN).date() if day.tzinfo else day.date()
+    _ensure_years(day.year)
+    bounds = _sessions.get(day)
+    if bounds is None:
+        return None
+
+    premarket_open, market_open, market_close, postmarket_close = (
+        datetime.fromtimestamp(epoch, EASTERN) for epoch in bounds
+    )
+    return {
+        "date": day.isoformat(),
+        "premarket_open": premarket_open,
+        "open": market_open,
+        "close": market_close,
+        "postmarket_close": postmarket_close,
+        "early_close": market_close.time() == EARLY_CLOSE,
+    }
+
+
+def _next_boundary(epoch, closes=False):
+    # Cover the following year too so lookups near December 31 still find a session
+    _ensure_years(datetime.fromtimestamp(epoch, EASTERN).year + 1)
+    boundaries = _closes if closes else _opens
+    index = bisect.bisect_right(boundaries, epoch)
+    if index >= len(boundaries):
+        return None
+    return datetime.fromtimestamp(boundaries[index], EASTERN)
+
+
+def next_open(ts=None):
+    """Return the next regular-session open strictly after ``ts``"""
+    return _next_boundary(_to_epoch(ts))
+
+
+def next_close(ts=None):
+    """Return the next regular-session close strictly after ``ts``"""
+    return _next_boundary(_to_epoch(ts), closes=True)
+
+
+def seconds_until_open(ts=None):
+    """Seconds until the regular session is open, 0 if it is open now"""
+    epoch = _to_epoch(ts)
+    if is_open(epoch):
+        return 0.0
+    upcoming = next_open(epoch)
+    if upcoming is None:
+        return 0.0
+    return max(0.0, upcoming.timestamp() - epoch)
@@ -0,0 +1,318 @@
+import os
+import time
+import heapq
+import itertools
+import threading
+import logging
+from collections import deque
+from datetime import datetime
+
+import market_calendar
+
+logger = logging.getLogger(__name__)
+
+# Execution model configuration
+SLIPPAGE_BPS = float(os.environ.get("ORDER_SLIPPAGE_BPS", 5))
+COMMISSION_PER_SHARE = float(os.environ.get("ORDER_COMMISSION_PER_SHARE", 0.005))
+COMMISSION_MIN = float(os.environ.get("ORDER_COMMISSION_MIN", 1.0))
+# Notional that can fill per symbol per quote snapshot; larger orders fill partially over several snapshots
+MAX_FILL_NOTIONAL = float(os.environ.get("ORDER_MAX_FILL_NOTIONAL", 5000))
+# Time in force: unfilled orders expire at the close of this many regular sessions (1 = day orders)
+EXPIRY_SESSIONS = int(os.environ.get("ORDER_EXPIRY_SESSIONS", 1))
+
+ORDER_TYPES = ("market", "limit", "stop")
+ACTIVE_STATUSES = ("pending", "partial", "queued")
+
+_lock = threading.RLock()
+_ids = itertools.count(1)
+_seq = itertools.count()
+
+# order id -> order dict, for every order that is still active
+orders = {}
+
+# Orders submitted while the market was closed, executed at the next open
+after_hours_queue = []
+
+# Most recent fills, newest last
+recent_fills = deque(maxlen=100)
+
+# symbol -> price-sorted books. Heaps hold (sort key, sequence, order id):
+# buy limits/sell stops are keyed on -price so the highest price comes first,
+# sell limits/buy stops on +price so the lowest price comes first.
+_books = {}
+
+
+def _new_book():
+    return {"market": deque(), "buy_limit": [], "sell_limit": [], "buy_stop": [], "sell_stop": []}
+
+
+def slippage_price(side, price):
+    """Apply the slippage model: buys fill above the quote, sells below"""
+    adjustment = price * SLIPPAGE_BPS / 10000
+    return price + adjustment if side == "BUY" else price - adjustment
+
+
+def commission(shares):
+    """Apply the commission model: per-share fee with a per-fill minimum"""
+    return max(COMMISSION_MIN, shares * COMMISSION_PER_SHARE) if shares > 0 else 0.0
+
+
+def expiry_for(ts=None):
+    """Epoch time an order placed at ``ts`` expires: the close of its EXPIRY_SESSIONS-th session"""
+    close = None
+    for _ in range(max(1, EXPIRY_SESSIONS)):
+        close = market_calendar.next_close(ts if close is None else close)
+        if close is None:
+            return None
+    return close.timestamp()
+
+
+def _index(order):
+    """Place an active order into its symbol's book"""
+    book = _books.setdefault(order["ticker"], _new_book())
+    seq = next(_seq)
+    if order["type"] == "market":
+        book["market"].append(order["id"])
+    elif order["type"] == "limit":
+        if order["side"] == "BUY":
+            heapq.heappush(book["buy_limit"], (-order["limit_price"], seq, order["id"]))
+        else:
+            heapq.heappush(book["sell_limit"], (order["limit_price"], seq, order["id"]))
+    elif order["side"] == "BUY":
+        heapq.heappush(book["buy_stop"], (order["stop_price"], seq, order["id"]))
+    else:
+        heapq.heappush(book["sell_stop"], (-order["stop_price"], seq, order["id"]))
+
+
+def submit_order(ticker, side, shares, order_type="market", limit_price=None, stop_price=None, market_open=True):
+    """Create an order, queueing it for the next open if the market is closed
+
+    Raises ValueError for malformed orders.
+    """
+    side = side.upper()
+    order_type = (order_type or "market").lower()
+    if side not in ("BUY", "SELL"):
+        raise ValueError(f"Invalid order side: {side}")
+    if order_type not in ORDER_TYPES:
+        raise ValueError(f"Invalid order type: {order_type}")
+    if shares <= 0:
+        raise ValueError(f"Invalid order size: {shares}")
+    if order_type == "limit" and not limit_price:
+        raise ValueError("Limit orders need a limit_price")
+    if order_type == "stop" and not stop_price:
+        raise ValueError("Stop orders need a stop_price")
+
+    order = {
+        "id": next(_ids),
+        "ticker": ticker.lower(),
+        "side": side,
+        "type": order_type,
+        "shares": int(shares),
+        "filled": 0,
+        "limit_price": float(limit_price) if limit_price else None,
+        "stop_price": float(stop_price) if stop_price else None,
+        "status": "pending" if market_open else "queued",
+        "created": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        "expires_at": expiry_for(),
+        "fills": [],
+    }
+
+    with _lock:
+        orders[order["id"]] = order
+        if market_open:
+            _index(order)
+        else:
+            after_hours_queue.append(order["id"])
+
+    logger.info("Order %s %s: %s %s %s (%s)", order['id'], order['status'], side, order['shares'], ticker.upper(), order_type)
+    return order
+
+
+def cancel_order(order_id, reason="cancelled"):
+    """Cancel an active order; its book entries are dropped lazily"""
+    with _lock:
+        order = orders.pop(order_id, None)
+        if order is None:
+            return None
+        order["status"] = "cancelled"
+        order["cancel_reason"] = reason
+        logger.info("Order %s cancelled: %s", order_id, reason)
+        return order
+
+
+def expire_orders(now=None):
+    """Cancel active orders past their ``expires_at``; returns how many expired"""
+    now = time.time() if now is None else now
+    with _lock:
+        expired = [
+            order_id for order_id, order in orders.items()
+            if order.get("expires_at") is not None and order["expires_at"] <= now
+        ]
+        for order_id in expired:
+            cancel_order(order_id, "expired")
+        after_hours_queue[:] = [order_id for order_id in after_hours_queue if order_id in orders]
+    return len(expired)
+
+
+def release_after_hours_orders():
+    """Move orders queued while the market was closed into the live books"""
+    with _lock:
+        released = 0
+        for order_id in after_hours_queue:
+            order = orders.get(order_id)
+            if order is not None:
+                order["status"] = "pending"
+                _index(order)
+                released += 1
+        after_hours_queue.clear()
+    if released:
+        logger.info("Released %s after-hours orders at market open", released)
+    return released
+
+
+def _fill(order, quote_price, budget, apply_fill, fills):
+    """Fill as much of ``order`` as the liquidity budget allows
+
+    ``apply_fill(order, shares, price, fee)`` books the fill against the
+    portfolio and returns the shares it actually accepted. If it accepts
+    fewer than offered (no cash or no shares left), the rest of the order
+    is cancelled. Returns the notional consumed.
+    """
+    remaining = order["shares"] - order["filled"]
+    shares = min(remaining, int(budget // quote_price))
+    if shares <= 0:
+        return 0.0
+
+    price = slippage_price(order["side"], quote_price)
+    if order["type"] == "limit":
+        # Never fill through the limit
+        price = min(price, order["limit_price"]) if order["side"] == "BUY" else max(price, order["limit_price"])
+
+    accepted = apply_fill(order, shares, price, commission(shares))
+    if accepted > 0:
+        fill = {
+            "order_id": order["id"],
+            "ticker": order["ticker"],
+            "side": order["side"],
+            "shares": accepted,
+            "price": price,
+            "commission": commission(accepted),
+            "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        }
+        order["filled"] += accepted
+        order["fills"].append(fill)
+        recent_fills.append(fill)
+        fills.append(fill)
+
+    if order["filled"] >= order["shares"]:
+        order["status"] = "filled"
+        orders.pop(order["id"], None)
+    elif accepted < shares:
+        cancel_order(order["id"], "insufficient cash" if order["side"] == "BUY" else "insufficient shares")
+    else:
+        order["status"] = "partial"
+
+    return accepted * quote_price
+
+
+def _active(order_id):
+    order = orders.get(order_id)
+    return order if order is not None and order["status"] in ("pending", "partial") else None
+
+
+def _match_symbol(book, price, apply_fill, fills):
+    # At least one share trades per snapshot, or symbols priced above the budget could never fill
+    budget = max(MAX_FILL_NOTIONAL, price)
+
+    # Triggered stops become market orders
+    while book["buy_stop"] and book["buy_stop"][0][0] <= price:
+        _, _, order_id = heapq.heappop(book["buy_stop"])
+        if _active(order_id):
+            book["market"].append(order_id)
+    while book["sell_stop"] and -book["sell_stop"][0][0] >= price:
+        _, _, order_id = heapq.heappop(book["sell_stop"])
+        if _active(order_id):
+            book["market"].append(order_id)
+
+    while book["market"] and budget >= price:
+        order = _active(book["market"][0])
+        if order is None:
+            book["market"].popleft()
+            continue
+        budget -= _fill(order, price, budget, apply_fill, fills)
+        if _active(order["id"]):
+            # Liquidity budget used up, the rest fills on a later snapshot
+            break
+        book["market"].popleft()
+
+    for side in ("buy_limit", "sell_limit"):
+        heap = book[side]
+        while heap and budget >= price:
+            order = _active(heap[0][2])
+            if order is None:
+                heapq.heappop(heap)
+                continue
+            limit = order["limit_price"]
+            marketable = price <= limit if side == "buy_limit" else price >= limit
+            if not marketable:
+                break
+            budget -= _fill(order, price, budget, apply_fill, fills)
+            if _active(order["id"]):
+                break
+            heapq.heappop(heap)
+
+
+def match(signals, apply_fill):
+    """Match every live order against a fresh quote snapshot
+
+    Only symbols with live orders are visited, and within a symbol the
+    price-sorted books stop at the first order that is not marketable.
+    Returns the fills made during this call.
+    """
+    fills = []
+    with _lock:
+        for ticker in list(_books):
+            book = _books[ticker]
+            price = signals.get(ticker, {}).get("c")
+            if isinstance(price, (int, float)) and price > 0:
+                _match_symbol(book, price, apply_fill, fills)
+            if not any(book.values()):
+                del _books[ticker]
+    return fills
+
+
+def open_orders():
+    """Return all active orders, oldest first"""
+    with _lock:
+        return sorted((dict(order) for order in orders.values()), key=lambda order: order["id"])
+
+
+def reset():
+    """Drop all orders and fills (used when replaying recorded cycles)"""
+    global _ids
+    with _lock:
+        orders.clear()
+        after_hours_queue.clear()
+        recent_fills.clear()
+        _books.clear()
+        _ids = itertools.count(1)
+
+
+def restore(saved_orders):
+    """Reload active orders saved in portfolio.json"""
+    global _ids
+    with _lock:
+        for order in saved_orders or []:
+            if order.get("status") not in ACTIVE_STATUSES:
+                continue
+            # Orders saved before expiry existed get the default time in force from now
+            order.setdefault("expires_at", expiry_for())
+            orders[order["id"]] = order
+            if order["status"] == "queued":
+                after_hours_queue.append(order["id"])
+            else:
+                _index(order)
+        if orders:
+            _ids = itertools.count(max(orders) + 1)
+    if orders:
+        logger.info("Restored %s open orders", len(orders))
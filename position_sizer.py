@@ -0,0 +1,337 @@
+import os
+import io
+import time
+import threading
+import logging
+from datetime import datetime
+import numpy as np
+
+from market_calendar import EASTERN
+from risk import MAX_POSITION_PCT
+
+logger = logging.getLogger(__name__)
+
+# "fixed" (10% per trade), "vol_target", "kelly" or "risk_parity"
+SIZING_MODE = os.environ.get("SIZING_MODE", "vol_target")
+# Annualized volatility the whole target portfolio is scaled to
+TARGET_VOL = float(os.environ.get("SIZING_TARGET_VOL", 0.15))
+# Fraction of the full Kelly (mean-variance optimal) weights
+KELLY_FRACTION = float(os.environ.get("SIZING_KELLY_FRACTION", 0.25))
+# Fraction of equity kept invested at most; the rest stays in cash
+MAX_INVESTED = float(os.environ.get("SIZING_MAX_INVESTED", 0.95))
+FIXED_FRACTION = 0.1
+# Daily returns needed before a symbol gets a model weight
+MIN_OBSERVATIONS = int(os.environ.get("SIZING_MIN_OBSERVATIONS", 20))
+# Most recent days the covariance is estimated from
+LOOKBACK_DAYS = 120
+MAX_DAYS = 252
+TRADING_DAYS = 252
+
+PRICE_HISTORY_FILE = os.environ.get("PRICE_HISTORY_FILE", "price_history.npz")
+
+_lock = threading.Lock()
+
+# Daily closes, one row per session date and one column per symbol (NaN = no quote)
+_history = {
+    "symbols": [],
+    "dates": [],
+    "closes": np.zeros((0, 0)),
+    "version": 0,
+}
+
+# Target weights are cached per (history version, mode)
+_cache = {"key": None, "targets": {}, "solve_ms": 0.0, "universe": 0}
+
+
+def _session_date(epoch):
+    return datetime.fromtimestamp(epoch, EASTERN).strftime("%Y-%m-%d")
+
+
+def load(symbols):
+    """Load stored closes and align the columns to ``symbols``"""
+    symbols = list(symbols)
+    dates, closes = [], np.full((0, len(symbols)), np.nan)
+    try:
+        with np.load(PRICE_HISTORY_FILE, allow_pickle=False) as stored:
+            stored_symbols = list(stored["symbols"])
+            dates = list(stored["dates"])
+            closes = np.full((len(dates), len(symbols)), np.nan)
+            for j, symbol in enumerate(symbols):
+                if symbol in stored_symbols:
+                    closes[:, j] = stored["closes"][:, stored_symbols.index(symbol)]
+        logger.info("Loaded %s days of price history", len(dates))
+    except FileNotFoundError:
+        pass
+    except Exception as e:
+        logger.error("Error loading price history: %s", e)
+
+    with _lock:
+        _history["symbols"] = symbols
+        _history["dates"] = dates
+        _history["closes"] = closes
+        _history["version"] += 1
+
+
+def _save():
+    buffer = io.BytesIO()
+    np.savez(
+        buffer,
+        symbols=np.array(_history["symbols"]),
+        dates=np.array(_history["dates"]),
+        closes=_history["closes"],
+    )
+    temp_file = PRICE_HISTORY_FILE + ".tmp"
+    with open(temp_file, "wb") as f:
+        f.write(buffer.getvalue())
+    os.replace(temp_file, PRICE_HISTORY_FILE)
+
+
+def on_quote(signals):
+    """Fold a quote snapshot into today's row of closes
+
+    The latest price of a session overwrites that session's close in
+    memory. Only a new session date appends a row, bumps the version (so
+    target weights are re-solved) and persists the history. On the first
+    snapshot ever, the previous close (``pc``) seeds a row for the prior
+    session so a return is available straight away.
+    """
+    with _lock:
+        symbols = _history["symbols"]
+        if not symbols:
+            return
+        index = {symbol: j for j, symbol in enumerate(symbols)}
+        row = np.full(len(symbols), np.nan)
+        previous = np.full(len(symbols), np.nan)
+        latest_ts = 0
+        for symbol, quote in signals.items():
+            j = index.get(symbol)
+            price = quote.get("c") if isinstance(quote, dict) else None
+            if j is None or not isinstance(price, (int, float)) or price <= 0:
+                continue
+            row[j] = price
+            if isinstance(quote.get("pc"), (int, float)) and quote["pc"] > 0:
+                previous[j] = quote["pc"]
+            latest_ts = max(latest_ts, quote.get("t") or 0)
+        if np.isnan(row).all():
+            return
+
+        date = _session_date(latest_ts or time.time())
+        dates, closes = _history["dates"], _history["closes"]
+        if not dates and not np.isnan(previous).all():
+            dates.append("previous")
+            closes = previous[None, :]
+
+        if dates and dates[-1] == date:
+            # Same session: update the close in place; weights stay cached until the next session
+            closes[-1] = np.where(np.isnan(row), closes[-1], row)
+            return
+
+        dates.append(date)
+        closes = np.vstack([closes, row[None, :]])
+        if len(dates) > MAX_DAYS:
+            del dates[:-MAX_DAYS]
+            closes = closes[-MAX_DAYS:]
+
+        _history["closes"] = closes
+        _history["version"] += 1
+        try:
+            _save()
+        except OSError as e:
+            logger.error("Error saving price history: %s", e)
+
+
+def _returns(closes):
+    """Daily simple returns with NaN where either close is missing"""
+    if len(closes) < 2:
+        return np.zeros((0, closes.shape[1]))
+    return closes[1:] / closes[:-1] - 1
+
+
+def _window(closes):
+    """Return (columns, returns) for the symbols with enough history
+
+    A symbol qualifies with an unbroken run of at least MIN_OBSERVATIONS
+    returns ending today; qualifying symbols share the shortest such run
+    (capped at LOOKBACK_DAYS) so the returns matrix has no gaps.
+    """
+    returns = _returns(closes)[-LOOKBACK_DAYS:]
+    if len(returns) < MIN_OBSERVATIONS:
+        return np.zeros(0, dtype=int), returns[:, :0]
+    missing = np.isnan(returns[::-1])
+    trailing = np.where(missing.any(axis=0), missing.argmax(axis=0), len(returns))
+    qualified = trailing >= MIN_OBSERVATIONS
+    if not qualified.any():
+        return np.zeros(0, dtype=int), returns[:, :0]
+    window = returns[-trailing[qualified].min():]
+    columns = np.nonzero(qualified & (np.nan_to_num(window).std(axis=0) > 0))[0]
+    return columns, window[:, columns]
+
+
+def _covariance(returns):
+    """Sample covariance of the columns, shrunk toward its diagonal
+
+    Shrinkage keeps the matrix well conditioned when the universe is large
+    relative to the number of observed days.
+    """
+    observations, count = returns.shape
+    centered = returns - returns.mean(axis=0)
+    sample = centered.T @ centered / max(observations - 1, 1)
+    shrinkage = min(1.0, count / observations) * 0.5
+    return (1 - shrinkage) * sample + shrinkage * np.diag(np.diag(sample))
+
+
+def _risk_parity(cov, iterations=200, tolerance=1e-8):
+    """Long-only equal risk contribution weights (multiplicative updates)"""
+    vols = np.sqrt(np.diag(cov))
+    weights = 1 / vols
+    weights /= weights.sum()
+    target = 1.0 / len(weights)
+    for _ in range(iterations):
+        marginal = cov @ weights
+        contributions = weights * marginal
+        contributions /= contributions.sum()
+        if np.abs(contributions - target).max() < tolerance:
+            break
+        weights *= np.sqrt(target / contributions)
+        weights /= weights.sum()
+    return weights
+
+
+def solve(returns, mode=SIZING_MODE):
+    """Target weights (fractions of equity) for the columns of a daily return matrix
+
+    All modes are long-only, capped per position at the risk limit and in
+    total at MAX_INVESTED.
+    """
+    cov = _covariance(returns)
+    count = cov.shape[0]
+
+    if mode == "kelly":
+        # Mean-variance optimum Sigma^-1 mu, scaled by the Kelly fraction
+        mean = returns.mean(axis=0)
+        weights = KELLY_FRACTION * np.linalg.solve(cov + np.eye(count) * 1e-10, mean)
+        weights = np.clip(weights, 0, None)
+    else:
+        if mode == "risk_parity":
+            weights = _risk_parity(cov)
+        else:
+            # Inverse-volatility weights
+            weights = 1 / np.sqrt(np.diag(cov))
+            weights /= weights.sum()
+        portfolio_vol = np.sqrt(weights @ cov @ weights * TRADING_DAYS)
+        if portfolio_vol > 0:
+            weights *= TARGET_VOL / portfolio_vol
+
+    weights = np.minimum(weights, MAX_POSITION_PCT)
+    invested = weights.sum()
+    if invested > MAX_INVESTED:
+        weights *= MAX_INVESTED / invested
+    return weights
+
+
+def target_weights():
+    """Return {symbol: target weight} for symbols with enough history
+
+    Symbols without MIN_OBSERVATIONS complete daily returns are left out;
+    callers fall back to fixed sizing for them. Cached until new closes
+    arrive.
+    """
+    with _lock:
+        key = (_history["version"], SIZING_MODE)
+        if _cache["key"] == key:
+            return _cache["targets"]
+        symbols = list(_history["symbols"])
+        closes = _history["closes"].copy()
+
+    if SIZING_MODE == "fixed":
+        targets, solve_ms, universe = {}, 0.0, 0
+    else:
+        columns, window = _window(closes)
+        started = time.perf_counter()
+        if len(columns):
+            weights = solve(window, SIZING_MODE)
+            targets = {symbols[j]: float(w) for j, w in zip(columns, weights)}
+        else:
+            targets = {}
+        solve_ms = (time.perf_counter() - started) * 1000
+        universe = len(columns)
+
+    with _lock:
+        _cache.update({"key": key, "targets": targets, "solve_ms": round(solve_ms, 3), "universe": universe})
+    return targets
+
+
+def portfolio_volatility(weights):
+    """Daily volatility of a {symbol: weight} portfolio, or None without enough history
+
+    Weights on symbols that lack history make the estimate unavailable
+    rather than silently treating them as cash.
+    """
+    with _lock:
+        symbols = list(_history["symbols"])
+        closes = _history["closes"].copy()
+    columns, window = _window(closes)
+    covered = {symbols[j]: k for k, j in enumerate(columns)}
+    held = {symbol: weight for symbol, weight in weights.items() if weight}
+    if not held or any(symbol not in covered for symbol in held):
+        return None
+
+    vector = np.zeros(len(columns))
+    for symbol, weight in held.items():
+        vector[covered[symbol]] = weight
+    return float(np.sqrt(vector @ _covariance(window) @ vector))
+
+
+def order_shares(action, ticker, price, equity, held_shares):
+    """Shares to trade for a BUY/SELL decision
+
+    BUY moves the position up to its target weight. SELL moves it down to
+    the target, or sells a fixed slice if it is already at or below it.
+    Without a target weight the fixed 10% slice is used.
+    """
+    target = target_weights().get(ticker)
+    fixed = int(equity * FIXED_FRACTION / price)
+    if target is None:
+        shares = fixed
+    else:
+        target_shares = int(equity * target / price)
+        if action == "BUY":
+            shares = max(0, target_shares - held_shares)
+        else:
+            shares = held_shares - target_shares if held_shares > target_shares else fixed
+
+    if action == "SELL":
+        shares = min(shares, held_shares)
+    return shares
+
+
+def snapshot():
+    """Sizing mode, history depth and current target weights for the dashboard"""
+    targets = target_weights()
+    with _lock:
+        return {
+            "mode": SIZING_MODE,
+            "history_days": len(_history["dates"]),
+            "min_observations": MIN_OBSERVATIONS,
+            "target_vol": TARGET_VOL,
+            "universe": _cache["universe"],
+            "solve_ms": _cache["solve_ms"],
+            "targets": {symbol: round(weight, 4) for symbol, weight in targets.items() if weight > 0},
+        }
+
+
+if __name__ == "__main__":
+    # Benchmark: solve time against universe size for each mode
+    rng = np.random.default_rng(0)
+    print(f"{'symbols':>8} {'vol_target':>12} {'kelly':>12} {'risk_parity':>12}")
+    for size in (10, 30, 100, 300, 1000):
+        factor = rng.normal(0, 0.01, (MAX_DAYS, 1))
+        returns = factor * rng.uniform(0.5, 1.5, size) + rng.normal(0.0003, 0.015, (MAX_DAYS, size))
+        timings = []
+        for mode in ("vol_target", "kelly", "risk_parity"):
+            runs = 20 if size <= 300 else 3
+            started = time.perf_counter()
+            for _ in range(runs):
+                solve(returns, mode)
+            timings.append((time.perf_counter() - started) / runs * 1000)
+        print(f"{size:>8} " + " ".join(f"{t:>10.2f}ms" for t in timings))
@@ -0,0 +1,200 @@
+import os
+import time
+import hashlib
+import threading
+import logging
+from datetime import date, datetime
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+
+from market_calendar import nyse_holidays
+
+logger = logging.getLogger(__name__)
+
+TARGET_VALUE = 100000.0
+# Simulated trading days ahead (3 years) and number of paths
+HORIZON_DAYS = int(os.environ.get("PROJECTION_HORIZON_DAYS", 756))
+PATHS = int(os.environ.get("PROJECTION_PATHS", 20000))
+# Paths simulated per chunk; bounds memory to CHUNK_PATHS x HORIZON_DAYS floats
+CHUNK_PATHS = 2500
+# Runs with more path-days than this are spread across a process pool
+PARALLEL_PATH_DAYS = int(os.environ.get("PROJECTION_PARALLEL_PATH_DAYS", 50_000_000))
+# Recorded daily returns needed to bootstrap instead of using the position volatility model
+MIN_BOOTSTRAP_DAYS = 20
+# Days between reported checkpoints (about one month)
+CHECKPOINT_DAYS = 21
+PERCENTILES = (5, 25, 50, 75, 95)
+
+_lock = threading.Lock()
+# Simulated growth multiples for the current return sample, reused until the returns change
+_cache = {"key": None, "result": None}
+
+
+def daily_log_returns(daily_returns):
+    """Turn recorded portfolio values into one log return per trading day
+
+    ``daily_returns`` may hold several entries per date (one per trade) and
+    skip days without trades; the last value of each date is used and a gap
+    of n trading days contributes n equal daily returns.
+    """
+    closes = {}
+    for entry in daily_returns:
+        value = entry.get("value")
+        if entry.get("date") and isinstance(value, (int, float)) and value > 0:
+            closes[entry["date"]] = value
+    if len(closes) < 2:
+        return np.zeros(0)
+
+    dates = np.array(sorted(closes), dtype="datetime64[D]")
+    values = np.array([closes[d] for d in sorted(closes)])
+    gaps = np.maximum(np.busday_count(dates[:-1], dates[1:]), 1)
+    per_day = np.log(values[1:] / values[:-1]) / gaps
+    return np.repeat(per_day, np.minimum(gaps, 10))
+
+
+def _simulate_chunk(args):
+    """Simulate one chunk of paths; top-level so it can run in a worker process
+
+    Only the growth multiple and its running maximum at each checkpoint are
+    kept, plus each path's maximum drawdown. Whether a path has reached the
+    target by a checkpoint is read off the running maximum, so one run
+    serves any starting value.
+    """
+    sample, model, paths, horizon, seed = args
+    rng = np.random.default_rng(seed)
+    if model == "bootstrap":
+        steps = rng.choice(sample, size=(paths, horizon))
+    else:
+        mean, volatility = sample
+        steps = rng.normal(mean, volatility, size=(paths, horizon))
+
+    multiples = np.exp(np.cumsum(steps, axis=1))
+    running_max = np.maximum.accumulate(np.maximum(multiples, 1.0), axis=1)
+    drawdown = (1 - multiples / running_max).max(axis=1)
+
+    checkpoints = _checkpoints(horizon)
+    return multiples[:, checkpoints], running_max[:, checkpoints], drawdown
+
+
+def _checkpoints(horizon):
+    days = np.arange(CHECKPOINT_DAYS, horizon + 1, CHECKPOINT_DAYS)
+    if not len(days) or days[-1] != horizon:
+        days = np.append(days, horizon)
+    return days - 1
+
+
+def simulate(sample, model="bootstrap", paths=PATHS, horizon=HORIZON_DAYS, seed=0):
+    """Run the Monte Carlo simulation in chunks, in a process pool for large runs
+
+    ``sample`` is an array of daily log returns to bootstrap from, or
+    ``(mean, volatility)`` of daily log returns for the normal model.
+    Returns growth multiples and running maxima at the checkpoints plus the
+    maximum drawdown of every path.
+    """
+    sizes = [CHUNK_PATHS] * (paths // CHUNK_PATHS) + ([paths % CHUNK_PATHS] if paths % CHUNK_PATHS else [])
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    tasks = [(sample, model, size, horizon, chunk_seed) for size, chunk_seed in zip(sizes, seeds)]
+
+    if paths * horizon > PARALLEL_PATH_DAYS and len(tasks) > 1:
+        with ProcessPoolExecutor(max_workers=min(len(tasks), os.cpu_count() or 1)) as pool:
+            chunks = list(pool.map(_simulate_chunk, tasks))
+    else:
+        chunks = [_simulate_chunk(task) for task in tasks]
+
+    return {
+        "multiples": np.concatenate([chunk[0] for chunk in chunks]),
+        "running_max": np.concatenate([chunk[1] for chunk in chunks]),
+        "drawdown": np.concatenate([chunk[2] for chunk in chunks]),
+        "checkpoints": _checkpoints(horizon) + 1,
+    }
+
+
+def _trading_dates(days):
+    """Calendar dates that are ``days`` NYSE sessions from today"""
+    today = np.datetime64(date.today(), "D")
+    years = range(date.today().year, date.today().year + HORIZON_DAYS // 252 + 2)
+    holidays = [day for year in years for day in nyse_holidays(year)]
+    return np.busday_offset(today, days, roll="forward", holidays=holidays)
+
+
+def _summarize(result, current_value, target_value):
+    checkpoints = result["checkpoints"]
+    needed = target_value / current_value
+    probability = (result["running_max"] >= needed).mean(axis=0)
+    bands = np.percentile(result["multiples"], PERCENTILES, axis=0) * current_value
+    dates = _trading_dates(checkpoints)
+
+    # First checkpoint at which at least half the paths have reached the target
+    reached = np.nonzero(probability >= 0.5)[0]
+    median_days = int(checkpoints[reached[0]]) if len(reached) else None
+
+    return {
+        "paths": int(len(result["drawdown"])),
+        "horizon_days": int(checkpoints[-1]),
+        "median_days_to_target": median_days,
+        "probability_by_date": [
+            {"date": str(day), "trading_days": int(days), "probability": round(float(p), 4)}
+            for day, days, p in zip(dates, checkpoints, probability)
+        ],
+        "percentile_bands": {
+            f"p{pct}": [round(float(value), 2) for value in band] for pct, band in zip(PERCENTILES, bands)
+        },
+        "band_dates": [str(day) for day in dates],
+        "expected_max_drawdown": round(float(result["drawdown"].mean()), 4),
+        "p95_max_drawdown": round(float(np.percentile(result["drawdown"], 95)), 4),
+    }
+
+
+def project(daily_returns, current_value, target_value=TARGET_VALUE, position_volatility=None):
+    """Monte Carlo projection of the portfolio toward ``target_value``
+
+    Bootstraps from the recorded daily returns once there are enough of
+    them; before that, simulates normal daily returns with the volatility of
+    the current positions. Returns None when neither is available. The
+    simulated paths are cached until the inputs change, so repeated calls
+    only re-summarize them against the current value.
+    """
+    returns = daily_log_returns(daily_returns)
+    if len(returns) >= MIN_BOOTSTRAP_DAYS:
+        model, sample = "bootstrap", returns
+    elif position_volatility:
+        # Rounded so small day-to-day drift in the estimate reuses the cached paths
+        mean = round(float(returns.mean()), 5) if len(returns) else 0.0
+        model, sample = "position_volatility", (mean, round(float(position_volatility), 4))
+    else:
+        return None
+
+    key = hashlib.sha1(np.asarray(sample, dtype=float).tobytes() + model.encode()).hexdigest()
+    with _lock:
+        cached = _cache["result"] if _cache["key"] == key else None
+
+    if cached is None:
+        started = time.perf_counter()
+        cached = simulate(sample, model)
+        cached["model"] = model
+        cached["sample_days"] = int(len(returns))
+        cached["simulated_at"] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        cached["elapsed_ms"] = round((time.perf_counter() - started) * 1000, 1)
+        logger.info("Simulated %s portfolio paths (%s) in %.0fms", PATHS, model, cached['elapsed_ms'])
+        with _lock:
+            _cache.update({"key": key, "result": cached})
+
+    summary = _summarize(cached, current_value, target_value)
+    summary.update({key: cached[key] for key in ("model", "sample_days", "simulated_at", "elapsed_ms")})
+    summary["avg_daily_return_pct"] = (
+        round(float(np.expm1(np.mean(returns))) * 100, 4) if len(returns) else 0.0
+    )
+    return summary
+
+
+if __name__ == "__main__":
+    # Benchmark: serial vs process pool at increasing path counts
+    rng = np.random.default_rng(0)
+    sample = rng.normal(0.0008, 0.015, 120)
+    for paths in (10000, 50000, 100000):
+        for parallel in (False, True):
+            PARALLEL_PATH_DAYS = 0 if parallel else float("inf")
+            started = time.perf_counter()
+            result = simulate(sample, paths=paths)
+            elapsed = time.perf_counter() - started
+            print(f"{paths:>7} paths {'pool' if parallel else 'serial':>6}: {elapsed * 1000:8.0f}ms")
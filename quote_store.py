@@ -0,0 +1,102 @@
+import threading
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Fields sent by the compact endpoint when the client does not ask for a projection
+DEFAULT_FIELDS = ["c", "d", "dp"]
+
+# All Finnhub quote fields a client may project on
+QUOTE_FIELDS = ["c", "d", "dp", "h", "l", "o", "pc", "t"]
+
+_lock = threading.Lock()
+
+# Monotonic version counter, bumped once per snapshot that changed at least one symbol
+current_version = 0
+
+# symbol -> latest quote dict, and symbol -> version at which that quote last changed
+quotes = {}
+symbol_versions = {}
+
+
+def update(signals):
+    """Merge a fresh signals snapshot and return the resulting version
+
+    Only symbols whose quote actually changed get a new version, so clients
+    polling with ``since`` receive nothing for unchanged tickers. Only
+    QUOTE_FIELDS are compared and kept; metadata such as ``fetched_at`` or
+    a stale marker's error text does not count as a change.
+    """
+    global current_version
+
+    fresh = {
+        ticker: {field: quote[field] for field in QUOTE_FIELDS if field in quote}
+        for ticker, quote in signals.items() if isinstance(quote, dict)
+    }
+    with _lock:
+        changed = [ticker for ticker, quote in fresh.items() if quotes.get(ticker) != quote]
+        if not changed:
+            return current_version
+
+        current_version += 1
+        for ticker in changed:
+            quotes[ticker] = fresh[ticker]
+            symbol_versions[ticker] = current_version
+
+        logger.debug("Quote store v%d: %d symbols changed", current_version, len(changed))
+        return current_version
+
+
+def parse_fields(fields_param):
+    """Turn a ``fields=c,dp`` query value into a validated field list"""
+    if not fields_param:
+        return list(DEFAULT_FIELDS)
+
+    fields = []
+    for field in fields_param.split(","):
+        field = field.strip()
+        if field not in QUOTE_FIELDS:
+            raise ValueError(f"Unknown field: {field}")
+        if field not in fields:
+            fields.append(field)
+    return fields
+
+
+def parse_version(since_param):
+    """Turn a ``since=<version>`` query value into a version number (0 when absent)"""
+    if since_param is None or since_param == "":
+        return 0
+    try:
+        since = int(since_param)
+    except ValueError:
+        raise ValueError(f"Invalid since: {since_param!r} is not a version number")
+    if since < 0:
+        raise ValueError(f"Invalid since: {since} is negative")
+    return since
+
+
+def changes_since(since=0, fields=None):
+    """Return quotes changed after ``since`` in columnar form
+
+    The payload has a ``symbols`` list and one parallel array per requested
+    field. A ``since`` ahead of the current version (e.g. after a server
+    restart) is treated as a fresh client and gets the full table.
+    """
+    fields = fields or list(DEFAULT_FIELDS)
+
+    with _lock:
+        full = since <= 0 or since > current_version
+        if full:
+            symbols = list(quotes.keys())
+        else:
+            symbols = [ticker for ticker, version in symbol_versions.items() if version > since]
+
+        payload = {
+            "version": current_version,
+            "full": full,
+            "symbols": symbols,
+        }
+        for field in fields:
+            payload[field] = [quotes[ticker].get(field) for ticker in symbols]
+
+    return payload
@@ -0,0 +1,192 @@
+import os
+import threading
+import logging
+import numpy as np
+
+import symbol_registry
+
+logger = logging.getLogger(__name__)
+
+# Risk limits, as fractions of portfolio equity
+MAX_POSITION_PCT = float(os.environ.get("RISK_MAX_POSITION_PCT", 0.25))
+MAX_SECTOR_PCT = float(os.environ.get("RISK_MAX_SECTOR_PCT", 0.40))
+MAX_GROSS_EXPOSURE = float(os.environ.get("RISK_MAX_GROSS_EXPOSURE", 1.5))
+MAX_NET_EXPOSURE = float(os.environ.get("RISK_MAX_NET_EXPOSURE", 1.0))
+MAX_LEVERAGED_PCT = float(os.environ.get("RISK_MAX_LEVERAGED_PCT", 0.15))
+# Drawdown from peak equity that halts all new buying
+MAX_DRAWDOWN_PCT = float(os.environ.get("RISK_MAX_DRAWDOWN_PCT", 0.15))
+
+_lock = threading.Lock()
+
+# Position arrays, one slot per symbol; rebuilt by sync() and updated in place afterwards
+_state = {
+    "symbols": [],
+    "index": {},
+    "shares": np.zeros(0),
+    "prices": np.zeros(0),
+    "leverage": np.zeros(0),
+    "is_leveraged": np.zeros(0, dtype=bool),
+    "sector_matrix": np.zeros((0, 0)),
+    "sector_names": [],
+    "cash": 0.0,
+    "peak_equity": 0.0,
+    "snapshot": {},
+}
+
+
+def sync(portfolio, signals=None):
+    """Rebuild the position arrays from the portfolio (startup, reload)"""
+    symbols = list(portfolio["positions"].keys())
+    sector_names = [name for name in symbol_registry.sector_names() if name != "other"] + ["other"]
+    sector_ids = np.array([sector_names.index(symbol_registry.sector_of(s)) for s in symbols], dtype=int)
+
+    prices = np.array([
+        float(position.get("avg_price") or 0.0) for position in portfolio["positions"].values()
+    ])
+
+    with _lock:
+        _state["symbols"] = symbols
+        _state["index"] = {symbol: i for i, symbol in enumerate(symbols)}
+        _state["shares"] = np.array([float(p["shares"]) for p in portfolio["positions"].values()])
+        _state["prices"] = prices
+        _state["leverage"] = np.array([symbol_registry.leverage_of(s) for s in symbols])
+        _state["is_leveraged"] = np.array([symbol_registry.is_leveraged(s) for s in symbols], dtype=bool)
+        _state["sector_matrix"] = np.eye(len(sector_names))[sector_ids] if symbols else np.zeros((0, len(sector_names)))
+        _state["sector_names"] = sector_names
+        _state["cash"] = float(portfolio["cash"])
+
+        recorded_values = [entry.get("value", 0.0) for entry in portfolio["performance_metrics"].get("daily_returns", [])]
+        _state["peak_equity"] = max(
+            [portfolio["performance_metrics"].get("start_value", 0.0), portfolio.get("portfolio_value", 0.0)] + recorded_values
+        )
+
+    if signals:
+        on_quote(signals)
+    else:
+        _refresh_snapshot()
+
+
+def on_quote(signals):
+    """Update prices from a quote snapshot and refresh the exposure snapshot"""
+    with _lock:
+        index = _state["index"]
+        for symbol, quote in signals.items():
+            price = quote.get("c") if isinstance(quote, dict) else None
+            i = index.get(symbol)
+            if i is not None and isinstance(price, (int, float)) and price > 0:
+                _state["prices"][i] = price
+    _refresh_snapshot()
+
+
+def on_fill(ticker, shares, cash):
+    """Apply a fill incrementally: new share count for one symbol and new cash balance"""
+    with _lock:
+        i = _state["index"].get(ticker)
+        if i is not None:
+            _state["shares"][i] = shares
+        _state["cash"] = float(cash)
+    _refresh_snapshot()
+
+
+def _exposures(shares, prices, cash):
+    """Vectorized exposure metrics for a share vector"""
+    values = shares * prices
+    equity = cash + values.sum()
+    if equity <= 0:
+        return None
+
+    weights = values / equity
+    effective = weights * _state["leverage"]
+    return {
+        "equity": equity,
+        "weights": weights,
+        "sector_weights": weights @ _state["sector_matrix"],
+        "gross": np.abs(effective).sum(),
+        "net": effective.sum(),
+        "leveraged": weights[_state["is_leveraged"]].sum(),
+    }
+
+
+def _refresh_snapshot():
+    with _lock:
+        metrics = _exposures(_state["shares"], _state["prices"], _state["cash"])
+        if metrics is None:
+            return
+        _state["peak_equity"] = max(_state["peak_equity"], metrics["equity"])
+        drawdown = 1 - metrics["equity"] / _state["peak_equity"] if _state["peak_equity"] > 0 else 0.0
+
+        held = np.nonzero(metrics["weights"])[0]
+        _state["snapshot"] = {
+            "equity": float(metrics["equity"]),
+            "cash": _state["cash"],
+            "gross_exposure": float(metrics["gross"]),
+            "net_exposure": float(metrics["net"]),
+            "leveraged_exposure": float(metrics["leveraged"]),
+            "drawdown": float(drawdown),
+            "peak_equity": float(_state["peak_equity"]),
+            "circuit_breaker": bool(drawdown >= MAX_DRAWDOWN_PCT),
+            "position_weights": {_state["symbols"][i]: float(metrics["weights"][i]) for i in held},
+            "sector_weights": {
+                name: float(weight) for name, weight in zip(_state["sector_names"], metrics["sector_weights"]) if weight
+            },
+            "limits": {
+                "max_position_pct": MAX_POSITION_PCT,
+                "max_sector_pct": MAX_SECTOR_PCT,
+                "max_gross_exposure": MAX_GROSS_EXPOSURE,
+                "max_net_exposure": MAX_NET_EXPOSURE,
+                "max_leveraged_pct": MAX_LEVERAGED_PCT,
+                "max_drawdown_pct": MAX_DRAWDOWN_PCT,
+            },
+        }
+
+
+def check_order(ticker, side, shares, price):
+    """Evaluate a proposed order against all risk limits
+
+    Returns ``(allowed, reasons)``. Sells only ever reduce risk and always
+    pass. Buys are checked on the post-trade position vector, and a tripped
+    drawdown breaker blocks all of them.
+    """
+    if side != "BUY":
+        return True, []
+
+    with _lock:
+        i = _state["index"].get(ticker)
+        if i is None:
+            return False, [f"{ticker.upper()} is not in the risk universe"]
+
+        prices = _state["prices"].copy()
+        prices[i] = price
+        after = _state["shares"].copy()
+        after[i] += shares
+        metrics = _exposures(after, prices, _state["cash"] - shares * price)
+        sector_names = _state["sector_names"]
+        sector_row = _state["sector_matrix"][i]
+        circuit_breaker = _state["snapshot"].get("circuit_breaker", False)
+
+    if metrics is None:
+        return False, ["Portfolio equity is not positive"]
+
+    reasons = []
+    if circuit_breaker:
+        reasons.append(f"Drawdown circuit breaker tripped (limit {MAX_DRAWDOWN_PCT:.0%})")
+    if metrics["weights"][i] > MAX_POSITION_PCT:
+        reasons.append(f"{ticker.upper()} would be {metrics['weights'][i]:.1%} of equity (limit {MAX_POSITION_PCT:.0%})")
+    sector_weight = float(metrics["sector_weights"] @ sector_row)
+    if sector_weight > MAX_SECTOR_PCT:
+        sector = sector_names[int(np.argmax(sector_row))]
+        reasons.append(f"Sector {sector} would be {sector_weight:.1%} of equity (limit {MAX_SECTOR_PCT:.0%})")
+    if metrics["gross"] > MAX_GROSS_EXPOSURE:
+        reasons.append(f"Gross exposure would be {metrics['gross']:.2f}x (limit {MAX_GROSS_EXPOSURE:.2f}x)")
+    if abs(metrics["net"]) > MAX_NET_EXPOSURE:
+        reasons.append(f"Net exposure would be {metrics['net']:.2f}x (limit {MAX_NET_EXPOSURE:.2f}x)")
+    if metrics["leveraged"] > MAX_LEVERAGED_PCT and symbol_registry.is_leveraged(ticker):
+        reasons.append(f"Leveraged ETFs would be {metrics['leveraged']:.1%} of equity (limit {MAX_LEVERAGED_PCT:.0%})")
+
+    return not reasons, reasons
+
+
+def snapshot():
+    """Return the live exposure snapshot for the dashboard"""
+    with _lock:
+        return dict(_state["snapshot"])
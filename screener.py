@@ -0,0 +1,135 @@
+import os
+import time
+import threading
+import logging
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Candidates passed on to news and the decision prompt each cycle
+TOP_K = int(os.environ.get("SCREEN_TOP_K", 20))
+
+# Feature weights for the activity score; each feature is z-scored across the universe first.
+# Moves are ranked by size, not direction: the model decides whether to buy or sell.
+WEIGHTS = {
+    "momentum": 1.0,   # |percent change| since the previous close
+    "gap": 0.5,        # |open / previous close - 1|
+    "range": 0.75,     # (high - low) / previous close
+    "volume": 0.5,     # log volume, where the quote carries one
+}
+
+_lock = threading.Lock()
+last_screen = {"universe": 0, "scored": 0, "candidates": [], "scores": {}, "elapsed_ms": 0.0, "screened_at": None}
+
+
+def _features(signals):
+    """Quote fields as one (symbols, columns) array; non-numeric values become NaN"""
+    symbols = list(signals.keys())
+    rows = [
+        [
+            quote.get(field) if isinstance(quote.get(field), (int, float)) else np.nan
+            for field in ("c", "dp", "h", "l", "o", "pc", "v")
+        ] if isinstance(quote, dict) and not quote.get("stale") else [np.nan] * 7
+        for quote in signals.values()
+    ]
+    return symbols, np.array(rows, dtype=float).reshape(len(symbols), 7)
+
+
+def _zscore(values):
+    """Z-score over the finite entries; missing entries contribute 0"""
+    finite = np.isfinite(values)
+    if finite.sum() < 2:
+        return np.zeros_like(values)
+    mean = values[finite].mean()
+    std = values[finite].std()
+    z = (values - mean) / std if std > 0 else np.zeros_like(values)
+    return np.where(finite, z, 0.0)
+
+
+def scores(signals):
+    """Activity score per symbol; symbols without a usable fresh quote get -inf"""
+    symbols, data = _features(signals)
+    price, percent_change, high, low, open_price, previous_close, volume = data.T
+    with np.errstate(divide="ignore", invalid="ignore"):
+        valid_close = previous_close > 0
+        # Fall back to c/pc when the quote has no percent change
+        momentum = np.where(
+            np.isfinite(percent_change), np.abs(percent_change) / 100,
+            np.abs(price / np.where(valid_close, previous_close, np.nan) - 1)
+        )
+        gap = np.abs(open_price / np.where(valid_close, previous_close, np.nan) - 1)
+        day_range = (high - low) / np.where(valid_close, previous_close, np.nan)
+        log_volume = np.log1p(np.where(volume > 0, volume, np.nan))
+
+    score = (
+        WEIGHTS["momentum"] * _zscore(momentum)
+        + WEIGHTS["gap"] * _zscore(gap)
+        + WEIGHTS["range"] * _zscore(day_range)
+        + WEIGHTS["volume"] * _zscore(log_volume)
+    )
+    score[~(np.isfinite(price) & (price > 0))] = -np.inf
+    return symbols, score
+
+
+def screen(signals, k=TOP_K, always=()):
+    """Narrow a quote snapshot to the top ``k`` symbols by activity score
+
+    Symbols in ``always`` (held positions, open orders) are appended after
+    the ranked candidates if the screen did not pick them. Returns the
+    candidate symbols, best first.
+    """
+    started = time.perf_counter()
+    symbols, score = scores(signals)
+
+    scored = np.isfinite(score)
+    k = min(k, int(scored.sum()))
+    if k > 0:
+        top = np.argpartition(-score, k - 1)[:k]
+        top = top[np.argsort(-score[top], kind="stable")]
+    else:
+        top = np.zeros(0, dtype=int)
+
+    candidates = [symbols[i] for i in top]
+    picked = set(candidates)
+    candidates += [symbol for symbol in always if symbol not in picked]
+
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    with _lock:
+        last_screen.update({
+            "universe": len(symbols),
+            "scored": int(scored.sum()),
+            "candidates": candidates,
+            "scores": {symbols[i]: round(float(score[i]), 3) for i in top},
+            "elapsed_ms": round(elapsed_ms, 3),
+            "screened_at": time.strftime("%Y-%m-%d %H:%M:%S"),
+        })
+    logger.info("Screened %s symbols to %s candidates in %.1fms", len(symbols), len(candidates), elapsed_ms)
+    return candidates
+
+
+def snapshot():
+    with _lock:
+        return dict(last_screen, candidates=list(last_screen["candidates"]), scores=dict(last_screen["scores"]))
+
+
+if __name__ == "__main__":
+    # Benchmark: screening cost at increasing universe sizes
+    logging.getLogger().setLevel(logging.WARNING)
+    rng = np.random.default_rng(0)
+    for size in (100, 1000, 10000):
+        previous_close = rng.uniform(5, 500, size)
+        price = previous_close * (1 + rng.normal(0, 0.02, size))
+        signals = {
+            f"s{i}": {
+                "c": float(price[i]), "dp": float((price[i] / previous_close[i] - 1) * 100),
+                "h": float(max(price[i], previous_close[i]) * 1.01), "l": float(min(price[i], previous_close[i]) * 0.99),
+                "o": float(previous_close[i] * (1 + rng.normal(0, 0.005))), "pc": float(previous_close[i]),
+                "v": float(rng.lognormal(13, 1)),
+            }
+            for i in range(size)
+        }
+        started = time.perf_counter()
+        for _ in range(20):
+            screen(signals)
+        elapsed = (time.perf_counter() - started) / 20
+        print(f"{size:>6} symbols: {elapsed * 1000:8.2f}ms per screen")
@@ -0,0 +1,173 @@
+// Ticker grids by section id ({tickers, descriptions}), sent by /api/bootstrap from symbols.json
+let tickerCategories = {};
+
+// Auto-refresh market data every 30 seconds
+setInterval(refreshMarketData, 30000);
+
+// Initial load: status, portfolio and market data in one request
+document.addEventListener('DOMContentLoaded', loadBootstrap);
+
+async function loadBootstrap() {
+    try {
+        const response = await fetch('/api/bootstrap');
+        const data = await response.json();
+        
+        if (data.error) {
+            console.error('Bootstrap error:', data.error);
+            refreshPortfolio();
+            // The ticker grids come from bootstrap, so market data waits for a retry
+            setTimeout(loadBootstrap, 5000);
+            return;
+        }
+        
+        tickerCategories = data.categories;
+        renderStatus(data.status);
+        renderMarketData(data.market_data);
+        renderPortfolio(data.portfolio);
+    } catch (error) {
+        console.error('Error loading dashboard:', error);
+    }
+}
+
+function renderStatus(status) {
+    const running = Boolean(status.running);
+    const indicator = document.getElementById('status-indicator');
+    indicator.classList.toggle('status-running', running);
+    indicator.classList.toggle('status-stopped', !running);
+    document.getElementById('status-text').textContent = running ? 'RUNNING' : 'STOPPED';
+    document.getElementById('start-button').disabled = running;
+    document.getElementById('stop-button').disabled = !running;
+    document.getElementById('last-run').textContent = status.last_run || 'Never';
+}
+
+function createTickerCard(ticker, data, description) {
+    const price = data.c || 100;
+    const change = data.d || 0;
+    const changePercent = data.dp || 0;
+    const isPositive = changePercent >= 0;
+    const changeClass = isPositive ? 'positive' : 'negative';
+    const changeSign = isPositive ? '+' : '';
+    
+    return `
+        <div class="ticker-card" data-ticker="${ticker}">
+            <div class="ticker-symbol">${ticker.toUpperCase()}${changeSign}${changePercent.toFixed(2)}%</div>
+            <div class="ticker-change ${changeClass}">${changeSign}${changePercent.toFixed(2)}%</div>
+            <div class="ticker-price">${price.toFixed(2)}</div>
+            <div class="ticker-index">${Math.round(price)}</div>
+            <div class="ticker-description">${description}</div>
+        </div>
+    `;
+}
+
+async function refreshMarketData() {
+    try {
+        const response = await fetch('/api/market-data');
+        const data = await response.json();
+        
+        if (data.error) {
+            console.error('Market data error:', data.error);
+            return;
+        }
+        
+        renderMarketData(data);
+    } catch (error) {
+        console.error('Error refreshing market data:', error);
+    }
+}
+
+function renderMarketData(data) {
+    // Populate each category section
+    Object.entries(tickerCategories).forEach(([categoryId, category]) => {
+        const gridElement = document.getElementById(`${categoryId}-grid`);
+        if (gridElement) {
+            gridElement.innerHTML = '';
+            
+            category.tickers.forEach(ticker => {
+                const tickerData = data[ticker] || { c: 100, d: 0, dp: 0 };
+                const description = category.descriptions[ticker] || ticker.toUpperCase();
+                const cardHTML = createTickerCard(ticker, tickerData, description);
+                gridElement.innerHTML += cardHTML;
+            });
+        }
+    });
+}
+
+async function refreshPortfolio() {
+    try {
+        const response = await fetch('/api/portfolio');
+        const data = await response.json();
+        
+        if (data.error) {
+            console.error('Portfolio error:', data.error);
+            return;
+        }
+        
+        renderPortfolio(data);
+    } catch (error) {
+        console.error('Error refreshing portfolio:', error);
+    }
+}
+
+function renderPortfolio(data) {
+    document.getElementById('cash-amount').textContent = `$${data.cash.toFixed(2)}`;
+    document.getElementById('total-value').textContent = `$${data.total_value.toFixed(2)}`;
+    const positionCount = document.getElementById('position-count');
+    if (positionCount) {
+        positionCount.textContent = data.active_positions;
+    }
+}
+
+async function startBot() {
+    try {
+        const response = await fetch('/api/start-bot', { method: 'POST' });
+        const data = await response.json();
+        
+        if (data.success) {
+            location.reload();
+        } else {
+            alert('Failed to start bot: ' + (data.error || 'Unknown error'));
+        }
+    } catch (error) {
+        alert('Error starting bot: ' + error.message);
+    }
+}
+
+async function stopBot() {
+    try {
+        const response = await fetch('/api/stop-bot', { method: 'POST' });
+        const data = await response.json();
+        
+        if (data.success) {
+            location.reload();
+        } else {
+            alert('Failed to stop bot: ' + (data.error || 'Unknown error'));
+        }
+    } catch (error) {
+        alert('Error stopping bot: ' + error.message);
+    }
+}
+
+async function runNow() {
+    try {
+        const button = event.target.closest('button');
+        const originalText = button.innerHTML;
+        button.innerHTML = '<i class="fas fa-spinner fa-spin"></i> Running...';
+        button.disabled = true;
+        
+        const response = await fetch('/api/run-now', { method: 'POST' });
+        const data = await response.json();
+        
+        if (data.success) {
+            setTimeout(() => location.reload(), 2000);
+        } else {
+            alert('Failed to run trading cycle: ' + (data.error || 'Unknown error'));
+        }
+        
+        button.innerHTML = originalText;
+        button.disabled = false;
+    } catch (error) {
+        alert('Error running trading cycle: ' + error.message);
+        button.innerHTML = originalText;
+        button.disabled = false;
+    }
+}
@@ -0,0 +1,134 @@
+import os
+import gzip
+import hashlib
+import mimetypes
+import threading
+import logging
+
+try:
+    import brotli
+except ImportError:
+    # Optional: without it assets are served gzip-compressed only
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+STATIC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "static")
+# Hashed asset URLs never change content, so browsers may keep them for a year
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+# Bodies smaller than this are not worth compressing
+MIN_COMPRESS_BYTES = 256
+
+_lock = threading.Lock()
+# Source path (e.g. "js/dashboard.js") -> built asset; hashed filename -> the same asset
+_assets = {}
+_by_hashed_name = {}
+
+
+def encode(body):
+    """Compressed variants of a response body, keyed by content-encoding ("identity" always present)"""
+    variants = {"identity": body}
+    if len(body) >= MIN_COMPRESS_BYTES:
+        variants["gzip"] = gzip.compress(body, compresslevel=9, mtime=0)
+        if brotli is not None:
+            variants["br"] = brotli.compress(body, quality=11)
+    return variants
+
+
+def _quality(accept_encoding):
+    """{coding: q} from an Accept-Encoding header; a malformed q counts as 0"""
+    weights = {}
+    for part in (accept_encoding or "").lower().split(","):
+        coding, _, params = part.partition(";")
+        coding = coding.strip()
+        if not coding:
+            continue
+        q = 1.0
+        for param in params.split(";"):
+            key, _, value = param.partition("=")
+            if key.strip() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        weights[coding] = q
+    return weights
+
+
+def choose(variants, accept_encoding):
+    """Pick the variant the client prefers (highest q, then smallest); returns (encoding, body)
+
+    Codings with q=0 are never sent. ``*`` covers codings not listed, and
+    identity stays acceptable unless refused explicitly (RFC 9110 12.5.3).
+    """
+    weights = _quality(accept_encoding)
+    wildcard = weights.get("*")
+
+    def quality(encoding):
+        if encoding in weights:
+            return weights[encoding]
+        if encoding == "identity":
+            return 1.0 if wildcard is None else wildcard
+        return wildcard or 0.0
+
+    acceptable = [(quality(encoding), -len(body), encoding) for encoding, body in variants.items() if quality(encoding) > 0]
+    if not acceptable:
+        # Nothing acceptable; sending identity is allowed rather than a 406
+        return "identity", variants["identity"]
+    _, _, encoding = max(acceptable)
+    return encoding, variants[encoding]
+
+
+def build(static_dir=STATIC_DIR):
+    """Hash and precompress every file under ``static_dir`` (once, at startup)"""
+    assets, by_hashed_name = {}, {}
+    for root, _, files in os.walk(static_dir):
+        for filename in sorted(files):
+            path = os.path.join(root, filename)
+            name = os.path.relpath(path, static_dir).replace(os.sep, "/")
+            with open(path, "rb") as f:
+                body = f.read()
+
+            digest = hashlib.sha256(body).hexdigest()[:12]
+            stem, extension = os.path.splitext(name)
+            asset = {
+                "name": name,
+                "hashed_name": f"{stem}.{digest}{extension}",
+                "etag": digest,
+                "mimetype": mimetypes.guess_type(filename)[0] or "application/octet-stream",
+                "variants": encode(body),
+            }
+            assets[name] = asset
+            by_hashed_name[asset["hashed_name"]] = asset
+
+    with _lock:
+        _assets.clear()
+        _assets.update(assets)
+        _by_hashed_name.clear()
+        _by_hashed_name.update(by_hashed_name)
+
+    raw = sum(len(asset["variants"]["identity"]) for asset in assets.values())
+    gzipped = sum(len(asset["variants"].get("gzip", asset["variants"]["identity"])) for asset in assets.values())
+    logger.info("Built %s static assets (%s bytes, %s gzipped)", len(assets), raw, gzipped)
+    return assets
+
+
+def url(name):
+    """Content-hashed URL of a static asset, for templates"""
+    if not _assets:
+        build()
+    asset = _assets.get(name)
+    if asset is None:
+        logger.warning("Unknown static asset: %s", name)
+        return f"/static/{name}"
+    return f"/assets/{asset['hashed_name']}"
+
+
+def get(hashed_name):
+    """The built asset for a hashed filename, or None"""
+    return _by_hashed_name.get(hashed_name)
+
+
+def version():
+    """Digest over every asset hash; changes whenever any asset does"""
+    return hashlib.sha256("".join(sorted(asset["etag"] for asset in _assets.values())).encode()).hexdigest()[:12]
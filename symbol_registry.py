@@ -0,0 +1,76 @@
+import os
+import json
+import threading
+import logging
+
+logger = logging.getLogger(__name__)
+
+# JSON file listing the tradable universe: {"symbols": [{"symbol", "name"?, "sector", "leverage"?}, ...]}
+SYMBOLS_FILE = os.environ.get("SYMBOLS_FILE", os.path.join(os.path.dirname(os.path.abspath(__file__)), "symbols.json"))
+
+_lock = threading.Lock()
+_registry = None
+
+
+def _load():
+    with open(SYMBOLS_FILE) as f:
+        entries = json.load(f)["symbols"]
+
+    symbols, names, sectors, leverage = [], {}, {}, {}
+    for entry in entries:
+        symbol = entry["symbol"].strip().lower()
+        if symbol in sectors:
+            logger.warning("Duplicate symbol %s in %s, keeping the first entry", symbol.upper(), SYMBOLS_FILE)
+            continue
+        symbols.append(symbol)
+        names[symbol] = entry.get("name") or symbol.upper()
+        sectors[symbol] = entry.get("sector") or "other"
+        # Daily leverage of leveraged/inverse ETFs; negative means short exposure
+        if entry.get("leverage") is not None:
+            leverage[symbol] = float(entry["leverage"])
+
+    logger.info("Loaded %s symbols from %s", len(symbols), SYMBOLS_FILE)
+    return {"symbols": symbols, "names": names, "sectors": sectors, "leverage": leverage}
+
+
+def _get():
+    global _registry
+    if _registry is None:
+        with _lock:
+            if _registry is None:
+                _registry = _load()
+    return _registry
+
+
+def reload():
+    """Re-read the symbols file (e.g. after editing it)"""
+    global _registry
+    with _lock:
+        _registry = _load()
+
+
+def symbols():
+    """All symbols in the universe, lowercase, in file order"""
+    return list(_get()["symbols"])
+
+
+def name_of(symbol):
+    """Display name, e.g. "S&P 500" for spy"""
+    return _get().get("names", {}).get(symbol, symbol.upper())
+
+
+def sector_of(symbol):
+    return _get()["sectors"].get(symbol, "other")
+
+
+def sector_names():
+    """Distinct sectors in file order"""
+    return list(dict.fromkeys(_get()["sectors"].values()))
+
+
+def leverage_of(symbol):
+    return _get()["leverage"].get(symbol, 1.0)
+
+
+def is_leveraged(symbol):
+    return symbol in _get()["leverage"]
@@ -0,0 +1,74 @@
+"""In-process stand-in for the OpenAI client's streaming chat completions, with injectable latency"""
+import threading
+import time
+from types import SimpleNamespace
+
+
+def _chunk(content):
+    return SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=content))])
+
+
+class FakeStream:
+    """Yields ``pieces`` after ``first_token`` seconds, then one every ``interval`` seconds"""
+
+    def __init__(self, model, pieces, first_token, interval):
+        self.model = model
+        self.pieces = pieces
+        self.first_token = first_token
+        self.interval = interval
+        self.delivered = 0
+        self.closed = False
+        self.finished = threading.Event()
+
+    def __iter__(self):
+        try:
+            time.sleep(self.first_token)
+            for index, piece in enumerate(self.pieces):
+                if self.closed:
+                    return
+                if index:
+                    time.sleep(self.interval)
+                self.delivered += 1
+                yield _chunk(piece)
+        finally:
+            self.finished.set()
+
+    def close(self):
+        self.closed = True
+        self.finished.set()
+
+    @property
+    def complete(self):
+        return self.delivered == len(self.pieces)
+
+
+class FakeChatClient:
+    """Mimics ``client.with_options(...).chat.completions.create(..., stream=True)``
+
+    ``latency(model, call_index)`` returns ``(first_token, interval)`` in
+    seconds for each call, and ``response(model)`` the completion text, which
+    is streamed in ``chunks`` pieces. Every stream handed out is kept in
+    ``streams``.
+    """
+
+    def __init__(self, response, latency, chunks=8):
+        self.response = response
+        self.latency = latency
+        self.chunks = chunks
+        self.streams = []
+        self._lock = threading.Lock()
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._create))
+
+    def with_options(self, **options):
+        return self
+
+    def _create(self, model, messages, stream=False, **kwargs):
+        assert stream, "the bot always streams completions"
+        text = self.response(model)
+        size = -(-len(text) // self.chunks)
+        pieces = [text[i:i + size] for i in range(0, len(text), size)]
+        with self._lock:
+            first_token, interval = self.latency(model, sum(1 for s in self.streams if s.model == model))
+            stream_ = FakeStream(model, pieces, first_token, interval)
+            self.streams.append(stream_)
+        return stream_
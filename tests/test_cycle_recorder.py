@@ -0,0 +1,17 @@
+import time
+
+import cycle_recorder
+import trading_bot
+
+
+def test_offline_replay_skips_the_growth_projection(monkeypatch):
+    def simulate(signals=None):
+        raise AssertionError("the replay ran the Monte Carlo projection")
+
+    monkeypatch.setattr(trading_bot, "get_portfolio_growth_projection", simulate)
+    monkeypatch.setattr(trading_bot, "latest_growth_projection", {"cached": True})
+    record = {"started": time.time(), "responses": [], "outcome": {}}
+
+    with cycle_recorder.offline(record):
+        assert trading_bot.refresh_growth_projection() == {"cached": True}
+    assert trading_bot.refresh_growth_projection.__name__ == "refresh_growth_projection"
@@ -0,0 +1,48 @@
+import os
+import re
+
+import app as dashboard
+import load_test
+import symbol_registry
+import trading_bot
+
+TEMPLATE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "templates", "index.html")
+
+
+def test_bootstrap_sends_the_ticker_grids_from_the_symbol_registry(monkeypatch):
+    signals = load_test.synthetic_signals()
+    monkeypatch.setattr(dashboard, "get_cached_signals", lambda: (signals, False, 0.0))
+    monkeypatch.setattr(trading_bot, "portfolio", {"cash": 1000.0, "positions": {}})
+    dashboard.invalidate_bootstrap()
+
+    data = dashboard.app.test_client().get("/api/bootstrap").get_json()
+    dashboard.invalidate_bootstrap()
+
+    categories = data["categories"]
+    assert categories["core-volatility"]["tickers"][:2] == ["spy", "qqq"]
+    assert categories["core-volatility"]["descriptions"]["spy"] == "S&P 500"
+    for grid, category in categories.items():
+        assert category["tickers"]
+        assert {symbol_registry.sector_of(ticker) for ticker in category["tickers"]} == {
+            sector for sector, section in dashboard.DASHBOARD_SECTORS.items() if section == grid
+        }
+    assert set(data["market_data"]) == set(dashboard.dashboard_tickers())
+    # Tickers outside the rendered sectors stay behind the market data endpoints
+    assert "tqqq" not in data["market_data"]
+
+
+def test_every_grid_has_a_section_in_the_template():
+    with open(TEMPLATE) as f:
+        grids = set(re.findall(r'id="([\w-]+)-grid"', f.read()))
+    assert grids == set(dashboard.DASHBOARD_SECTORS.values())
+
+
+def test_malformed_since_is_rejected(monkeypatch):
+    monkeypatch.setattr(dashboard, "get_cached_signals", lambda: ({}, True, 0.0))
+    client = dashboard.app.test_client()
+    for since in ("abc", "1.5", "-1", "12x"):
+        response = client.get(f"/api/v1/market-data?since={since}")
+        assert response.status_code == 400, since
+        assert "since" in response.get_json()["error"]
+    assert client.get("/api/v1/market-data?since=0").status_code == 200
+    assert client.get("/api/v1/market-data").status_code == 200
@@ -0,0 +1,128 @@
+import json
+
+import pytest
+
+import circuit_breaker
+import decision_parser
+import trading_bot
+from decision_parser import DecisionSchemaError, StreamingDecisionParser
+from fake_openai import FakeChatClient
+
+TICKERS = {"spy": {}, "qqq": {}, "aapl": {}}
+
+
+def feed_in_pieces(text, size=3):
+    parser = StreamingDecisionParser()
+    for i in range(0, len(text), size):
+        parser.feed(text[i:i + size])
+    return parser
+
+
+def test_escaped_quotes_and_braces_inside_strings():
+    text = json.dumps({
+        "action": "BUY",
+        "ticker": "SPY",
+        "rationale": 'Said "buy {now}" \\ then [closed] }',
+    })
+    parser = feed_in_pieces(text + " trailing words {")
+    assert parser.complete
+    assert parser.fields["rationale"] == 'Said "buy {now}" \\ then [closed] }'
+    assert json.loads(parser.payload())["ticker"] == "SPY"
+
+
+def test_code_fenced_output():
+    text = '```json\n{"action": "SELL", "ticker": "qqq", "rationale": "Trim"}\n```'
+    decision = decision_parser.parse_decision_text(text, TICKERS)
+    assert decision["action"] == "SELL" and decision["ticker"] == "qqq"
+    assert decision["orders"] == [{"action": "SELL", "ticker": "qqq", "order_type": "market"}]
+
+
+def test_fields_are_available_before_the_payload_completes():
+    parser = feed_in_pieces('{"action": "BUY", "ticker": "SPY", "order_type": "limit", "limit_price": 41')
+    assert parser.fields == {"action": "BUY", "ticker": "SPY", "order_type": "limit"}
+    assert decision_parser.early_decision(parser) is None
+    parser.feed('2.5, "rationale": "')
+    assert decision_parser.early_decision(parser)["limit_price"] == 412.5
+    assert not parser.complete
+
+
+def test_multi_order_payload():
+    text = json.dumps({
+        "orders": [
+            {"action": "BUY", "ticker": "SPY", "order_type": "stop", "stop_price": 500},
+            {"action": "HOLD", "ticker": "QQQ"},
+            {"action": "SELL", "ticker": "AAPL", "order_type": "limit", "limit_price": 190.5},
+        ],
+        "rationale": "Rotate",
+    })
+    parser = feed_in_pieces(text)
+    assert [order["ticker"] for order in parser.orders] == ["SPY", "QQQ", "AAPL"]
+    # A multi-order stream is never acted on early
+    assert decision_parser.early_decision(parser) is None
+
+    decision = decision_parser.parse_decision_text(text, TICKERS, max_orders=3)
+    assert (decision["action"], decision["ticker"]) == ("BUY", "spy")
+    assert decision["orders"] == [
+        {"action": "BUY", "ticker": "spy", "order_type": "stop", "stop_price": 500.0},
+        {"action": "SELL", "ticker": "aapl", "order_type": "limit", "limit_price": 190.5},
+    ]
+    with pytest.raises(DecisionSchemaError):
+        decision_parser.parse_decision_text(text, TICKERS, max_orders=2)
+
+
+def test_duplicate_tickers_are_rejected():
+    text = json.dumps({
+        "orders": [{"action": "BUY", "ticker": "SPY"}, {"action": "BUY", "ticker": "spy"}],
+        "rationale": "Double down",
+    })
+    with pytest.raises(DecisionSchemaError, match="different ticker"):
+        decision_parser.parse_decision_text(text, TICKERS)
+    with pytest.raises(DecisionSchemaError, match="More than one order"):
+        decision_parser.check_early(feed_in_pieces(text), TICKERS)
+
+
+def test_unknown_ticker_aborts_the_stream_early():
+    parser = feed_in_pieces('{"action": "BUY", "ticker": "XYZ", "rationale": "')
+    with pytest.raises(DecisionSchemaError, match="Unknown ticker"):
+        decision_parser.check_early(parser, TICKERS)
+    parser = feed_in_pieces('{"orders": [{"action": "BUY", "ticker": "SPY"}, {"action": "SELL", "ticker": "XYZ"')
+    with pytest.raises(DecisionSchemaError, match="Unknown ticker"):
+        decision_parser.check_early(parser, TICKERS)
+
+
+@pytest.fixture
+def streaming(monkeypatch):
+    monkeypatch.setattr(trading_bot, "portfolio", {"cash": 10000.0, "positions": dict(TICKERS)})
+    monkeypatch.setitem(circuit_breaker.breakers, "openai", circuit_breaker.CircuitBreaker("openai", min_calls=3))
+
+
+def completion(client):
+    return trading_bot.request_completion(client, "model", "system", "prompt", 5)
+
+
+def test_unknown_ticker_closes_the_completion_stream(streaming):
+    text = json.dumps({"action": "BUY", "ticker": "XYZ", "rationale": "A long explanation " * 20})
+    client = FakeChatClient(lambda model: text, lambda model, index: (0.0, 0.0), chunks=40)
+    with pytest.raises(DecisionSchemaError):
+        completion(client)
+    assert client.streams[0].closed and not client.streams[0].complete
+
+
+def test_early_act_returns_before_the_rationale(streaming, monkeypatch):
+    monkeypatch.setattr(trading_bot, "DECISION_EARLY_ACT", True)
+    text = json.dumps({
+        "action": "SELL", "ticker": "AAPL", "order_type": "limit", "limit_price": 190.5,
+        "rationale": "A long explanation " * 20,
+    })
+    client = FakeChatClient(lambda model: text, lambda model, index: (0.0, 0.0), chunks=40)
+
+    decision = json.loads(completion(client))
+    assert decision["action"] == "SELL" and decision["limit_price"] == 190.5
+    assert not client.streams[0].complete
+    assert trading_bot.parse_decision(json.dumps(decision))["orders"][0]["order_type"] == "limit"
+
+    # Without early act the whole payload is read
+    monkeypatch.setattr(trading_bot, "DECISION_EARLY_ACT", False)
+    client = FakeChatClient(lambda model: text, lambda model, index: (0.0, 0.0), chunks=40)
+    assert json.loads(completion(client))["rationale"].startswith("A long explanation")
+    assert client.streams[0].complete
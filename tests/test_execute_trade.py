@@ -0,0 +1,21 @@
+import order_book
+import position_sizer
+import trading_bot
+
+
+def test_order_sized_to_zero_is_annotated_not_silently_dropped(monkeypatch):
+    monkeypatch.setattr(trading_bot, "portfolio", {
+        "cash": 5000.0, "portfolio_value": 10000.0, "orders": [],
+        "positions": {"spy": {"shares": 10, "avg_price": 500.0}},
+        "performance_metrics": {"daily_returns": []},
+    })
+    monkeypatch.setattr(trading_bot, "save_portfolio", lambda: None)
+    # SPY is already at its 50% target
+    monkeypatch.setattr(position_sizer, "target_weights", lambda: {"spy": 0.5})
+    order_book.reset()
+
+    decision = {"action": "BUY", "ticker": "spy", "rationale": "test"}
+    trading_bot.execute_trade(decision, {"spy": {"c": 500.0}}, market_open=True)
+
+    assert decision["risk_rejected"] == ["Position already at its target weight"]
+    assert order_book.open_orders() == [] and not order_book.recent_fills
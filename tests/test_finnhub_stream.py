@@ -0,0 +1,159 @@
+import gzip
+import json
+import os
+import time
+
+import pytest
+
+import finnhub_stream
+import trading_bot
+from ws_standin import StandInServer
+
+DAY = 86400
+# Two sessions of SPY, QQQ and AAPL trade frames with the stream's pings, one raw frame per line
+TICK_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "finnhub-ticks.jsonl.gz")
+# A session-day start well away from the 05:00 UTC boundary
+SESSION = 1_700_000_000 - 1_700_000_000 % DAY + 14 * 3600
+
+
+def wait_for(predicate, timeout=5.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+def subscriptions(connection, count):
+    return {json.loads(connection.received.get(timeout=5))["symbol"] for _ in range(count)}
+
+
+def trade(symbol, price, ts):
+    return {"type": "trade", "data": [{"s": symbol, "p": price, "t": ts * 1000, "v": 100}]}
+
+
+@pytest.fixture
+def stream(monkeypatch):
+    """Fresh stream state pointed at a local stand-in server"""
+    server = StandInServer()
+    monkeypatch.setattr(finnhub_stream, "FINNHUB_WS_URL", server.url)
+    monkeypatch.setattr(finnhub_stream, "MAX_BACKOFF", 0.05)
+    monkeypatch.setattr(finnhub_stream, "quotes", {})
+    monkeypatch.setattr(finnhub_stream, "stream_status", dict(
+        finnhub_stream.stream_status, seeded=False, connected=False, last_message=None,
+        messages=0, trades=0, reconnects=0, last_error=None
+    ))
+    yield server
+    finnhub_stream.stop()
+    if finnhub_stream._thread is not None:
+        finnhub_stream._thread.join(5)
+    server.close()
+
+
+def test_recorded_frames_roll_the_session_over():
+    finnhub_stream.quotes["spy"] = {"c": 101.0, "o": 100.0, "h": 102.0, "l": 99.0, "pc": 100.0, "t": SESSION}
+    try:
+        for frame in (trade("SPY", 103.0, SESSION + 60), trade("SPY", 104.0, SESSION + DAY), "not json"):
+            finnhub_stream.handle_message(frame if isinstance(frame, str) else json.dumps(frame))
+        quote = finnhub_stream.quotes["spy"]
+        # The first trade of the next session makes the last price the previous close
+        assert quote["pc"] == 103.0 and quote["o"] == 104.0 and quote["c"] == 104.0
+        assert quote["dp"] == pytest.approx(1 / 103 * 100)
+    finally:
+        del finnhub_stream.quotes["spy"]
+
+
+def test_stream_seeds_reconnects_and_falls_back_to_rest(stream, monkeypatch):
+    finnhub_stream.start(["spy", "qqq"], "test-token")
+    first = stream.connections.get(timeout=5)
+    assert subscriptions(first, 2) == {"SPY", "QQQ"}
+
+    # Connected but not seeded: the cycle polls REST and seeds the stream from it
+    assert finnhub_stream.snapshot() is None
+    rest_calls = []
+
+    def fetch_rest_quotes(tickers):
+        rest_calls.append(tickers)
+        return {t.lower(): {"c": 100.0, "o": 100.0, "h": 100.0, "l": 100.0, "pc": 99.0, "t": SESSION} for t in tickers}
+
+    monkeypatch.setattr(trading_bot, "fetch_rest_quotes", fetch_rest_quotes)
+    signals = trading_bot.get_market_signals()
+    assert rest_calls and signals["spy"]["c"] == 100.0
+    assert finnhub_stream.stream_status["seeded"]
+
+    first.send_json(trade("SPY", 101.0, SESSION + 60))
+    assert wait_for(lambda: (finnhub_stream.snapshot() or {}).get("spy", {}).get("c") == 101.0)
+    snapshot = finnhub_stream.snapshot()
+    assert snapshot["spy"]["dp"] == pytest.approx(2 / 99 * 100)
+    # The snapshot is a copy, unaffected by later ticks
+    snapshot["spy"]["c"] = 0
+    assert finnhub_stream.quotes["spy"]["c"] == 101.0
+
+    # Served from the stream while it is healthy, without touching REST
+    rest_calls.clear()
+    assert trading_bot.get_market_signals()["spy"]["c"] == 101.0
+    assert not rest_calls
+
+    # Upstream drops the connection: the client reconnects and resubscribes
+    first.close()
+    second = stream.connections.get(timeout=5)
+    assert subscriptions(second, 2) == {"SPY", "QQQ"}
+    assert finnhub_stream.stream_status["reconnects"] == 1
+
+    second.send_json(trade("QQQ", 98.0, SESSION + 120))
+    assert wait_for(lambda: (finnhub_stream.snapshot() or {}).get("qqq", {}).get("c") == 98.0)
+    assert finnhub_stream.quotes["spy"]["c"] == 101.0
+
+
+def test_stale_stream_falls_back_to_rest(stream, monkeypatch):
+    finnhub_stream.start(["spy"], "test-token")
+    connection = stream.connections.get(timeout=5)
+    subscriptions(connection, 1)
+    finnhub_stream.seed({"spy": {"c": 100.0, "pc": 99.0, "t": SESSION}})
+    assert finnhub_stream.snapshot() is not None
+
+    # Nothing received for longer than STALE_AFTER
+    finnhub_stream.stream_status["last_message"] = time.time() - finnhub_stream.STALE_AFTER - 1
+    assert finnhub_stream.snapshot() is None
+    monkeypatch.setattr(trading_bot, "fetch_rest_quotes", lambda tickers: {t.lower(): {"c": 50.0} for t in tickers})
+    assert trading_bot.get_market_signals()["spy"]["c"] == 50.0
+
+
+def expected_quotes(frames):
+    """The quote table the frames should leave, folded per session rather than per tick"""
+    sessions = {}
+    for frame in map(json.loads, frames):
+        for tick in frame.get("data") or []:
+            day = (tick["t"] // 1000 - 5 * 3600) // DAY
+            sessions.setdefault(tick["s"].lower(), {}).setdefault(day, []).append(tick["p"])
+    expected = {}
+    for symbol, days in sessions.items():
+        (_, previous), (_, last) = sorted(days.items())
+        close = last[-1]
+        expected[symbol] = {
+            "o": last[0], "h": max(last), "l": min(last), "c": close, "pc": previous[-1],
+            "d": pytest.approx(close - previous[-1]), "dp": pytest.approx((close / previous[-1] - 1) * 100),
+        }
+    return expected
+
+
+def test_replay_of_a_recorded_tick_file(stream):
+    with gzip.open(TICK_FILE, "rt") as f:
+        frames = f.read().splitlines()
+    trades = sum(len(json.loads(frame).get("data") or []) for frame in frames)
+    assert len(frames) >= 4000 and trades > len(frames)
+
+    finnhub_stream.start(["spy", "qqq", "aapl"], "test-token")
+    connection = stream.connections.get(timeout=5)
+    subscriptions(connection, 3)
+    # Back to back, as fast as the socket takes them
+    for frame in frames:
+        connection.send_text(frame)
+
+    assert wait_for(lambda: finnhub_stream.stream_status["messages"] == len(frames), timeout=30)
+    assert finnhub_stream.stream_status["trades"] == trades
+    assert finnhub_stream.stream_status["reconnects"] == 0
+    final = {symbol: {field: quote[field] for field in ("o", "h", "l", "c", "pc", "d", "dp")}
+             for symbol, quote in finnhub_stream.quotes.items()}
+    assert final == expected_quotes(frames)
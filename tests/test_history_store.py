@@ -0,0 +1,67 @@
+import json
+import sqlite3
+import threading
+
+import pytest
+
+import app as dashboard
+import history_store
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    """A history database whose ids do not follow ts, as when two processes write"""
+    path = str(tmp_path / "history.db")
+    monkeypatch.setattr(history_store, "HISTORY_DB", path)
+    monkeypatch.setattr(history_store, "_readers", threading.local())
+    connection = sqlite3.connect(path)
+    connection.executescript(history_store.SCHEMA)
+    # The daemon commits a batch of older events after the web app wrote newer ones
+    rows = [(ts, "valuation", None, json.dumps({"n": ts})) for ts in (105.0, 106.0, 101.0, 102.0, 103.0, 104.0, 104.0)]
+    with connection:
+        connection.executemany("INSERT INTO events (ts, kind, ticker, payload) VALUES (?, ?, ?, ?)", rows)
+    connection.close()
+    return path
+
+
+def test_pages_follow_timestamps_not_ids(store):
+    seen, cursor = [], None
+    while True:
+        page = history_store.query(limit=2, cursor=cursor)
+        seen += [(item["timestamp"], item["id"]) for item in page["items"]]
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+
+    assert seen == sorted(seen, reverse=True)
+    assert [ts for ts, _ in seen] == [106.0, 105.0, 104.0, 104.0, 103.0, 102.0, 101.0]
+
+    page = history_store.query(since=104.0)
+    assert [item["timestamp"] for item in page["items"]] == [106.0, 105.0, 104.0, 104.0]
+
+
+def test_malformed_cursor_is_rejected(store):
+    with pytest.raises(ValueError):
+        history_store.query(cursor="17")
+
+    client = dashboard.app.test_client()
+    assert client.get("/api/history?cursor=abc:1").status_code == 400
+    assert client.get("/api/history?cursor=105.0:x").status_code == 400
+    page = client.get("/api/history?limit=3").get_json()
+    assert client.get(f"/api/history?cursor={page['next_cursor']}").status_code == 200
+
+
+@pytest.mark.parametrize("where, params", [
+    ("ticker = ?", ["spy"]),
+    ("kind = ?", ["fill"]),
+    ("ticker = ? AND (ts, id) < (?, ?)", ["spy", 100.0, 5]),
+    ("kind = ? AND ts >= ?", ["fill", 100.0]),
+])
+def test_filtered_pages_are_read_in_index_order(store, where, params):
+    connection = sqlite3.connect(store)
+    plan = connection.execute(
+        f"EXPLAIN QUERY PLAN SELECT id, ts, kind, ticker, payload FROM events WHERE {where} ORDER BY ts DESC, id DESC LIMIT 10",
+        params,
+    ).fetchall()
+    connection.close()
+    assert not any("TEMP B-TREE" in row[-1] for row in plan), plan
@@ -0,0 +1,41 @@
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# SDKs only needed once a cycle talks to the model or the sheet
+DEFERRED = ("openai", "gspread", "oauth2client")
+
+# Cumulative import budgets in seconds, a few times what a cold start measures here
+# (main ~0.5 s, trading_bot ~0.25 s) so only a real regression trips them
+BUDGETS = {"main": 2.0, "trading_bot": 1.0}
+
+
+def import_times(statement, cwd):
+    """Cumulative import time in seconds of every module ``statement`` loads in a fresh interpreter, via -X importtime"""
+    env = dict(os.environ, PYTHONPATH=ROOT, LOG_LEVEL="WARNING")
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        cwd=cwd, env=env, capture_output=True, text=True, timeout=60
+    )
+    assert result.returncode == 0, result.stderr
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split(":", 1)[1].split("|")
+        if cumulative.strip().isdigit():
+            times[name.strip()] = int(cumulative) / 1e6
+    return times
+
+
+def test_worker_boot_does_not_import_deferred_sdks(tmp_path):
+    # main builds the gunicorn app, so this covers module load and the app factory
+    times = import_times("import main", tmp_path)
+    packages = {name.split(".")[0] for name in times}
+    assert "trading_bot" in packages
+    assert not packages & set(DEFERRED)
+
+    over = {name: round(times[name], 3) for name, budget in BUDGETS.items() if times[name] > budget}
+    assert not over, f"import time over budget {BUDGETS}: {over}"
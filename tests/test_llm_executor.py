@@ -0,0 +1,84 @@
+import json
+import time
+from collections import deque
+
+import pytest
+
+import circuit_breaker
+import llm_executor
+import trading_bot
+from fake_openai import FakeChatClient
+
+DECISION = json.dumps({"action": "BUY", "ticker": "SPY", "rationale": "Momentum is improving"})
+FAST = (0.01, 0.001)
+
+
+@pytest.fixture(autouse=True)
+def executor(monkeypatch):
+    """Scaled-down hedge timings, empty latency history and a known portfolio"""
+    monkeypatch.setattr(llm_executor, "HEDGE_DEFAULT_DELAY", 0.1)
+    monkeypatch.setattr(llm_executor, "HEDGE_MIN_DELAY", 0.05)
+    monkeypatch.setattr(llm_executor, "_latencies", deque(maxlen=200))
+    monkeypatch.setattr(llm_executor, "executor_stats", dict.fromkeys(llm_executor.executor_stats, 0))
+    monkeypatch.setattr(trading_bot, "portfolio", {"cash": 10000.0, "positions": {"spy": {"shares": 0, "avg_price": 0}}})
+    monkeypatch.setitem(circuit_breaker.breakers, "openai", circuit_breaker.CircuitBreaker("openai", min_calls=3))
+
+
+def request_fn(client):
+    return lambda model, timeout, cancelled: trading_bot.request_completion(client, model, "system", "prompt", timeout, cancelled)
+
+
+def decide(client, **kwargs):
+    started = time.monotonic()
+    decision = llm_executor.run_hedged(request_fn(client), trading_bot.parse_decision, deadline=5, **kwargs)
+    return decision, time.monotonic() - started
+
+
+def test_hedging_cuts_tail_latency():
+    def latency(model, index):
+        # Every fourth primary request stalls before its first token
+        if model == llm_executor.PRIMARY_MODEL and index % 4 == 3:
+            return 0.6, 0.001
+        return FAST
+
+    client = FakeChatClient(lambda model: DECISION, latency)
+    plain = [decide(client, hedge_model=None)[1] for _ in range(12)]
+    # Start from the default hedge delay rather than a p90 learned from the stalls above
+    llm_executor._latencies.clear()
+    client = FakeChatClient(lambda model: DECISION, latency)
+    hedged = [decide(client)[1] for _ in range(12)]
+
+    assert max(plain) >= 0.6
+    assert max(hedged) < 0.35
+    assert llm_executor.executor_stats["hedge_wins"] == 3
+
+
+def test_losing_request_is_cancelled():
+    # The primary streams slowly; the hedge fired after 0.1s finishes first
+    client = FakeChatClient(
+        lambda model: DECISION,
+        lambda model, index: (0.01, 0.1) if model == llm_executor.PRIMARY_MODEL else FAST
+    )
+    decision, elapsed = decide(client)
+    assert decision["source"] == "hedge" and decision["ticker"] == "spy"
+    assert elapsed < 0.3
+
+    primary = next(s for s in client.streams if s.model == llm_executor.PRIMARY_MODEL)
+    # Closed at its next chunk rather than read to the end
+    assert primary.finished.wait(0.3)
+    assert primary.closed and not primary.complete
+    assert llm_executor.executor_stats["cancelled"] == 1
+    # Abandoning a healthy stream is not an upstream failure
+    assert circuit_breaker.get("openai").stats["failures"] == 0
+
+
+def test_deadline_cancels_every_request():
+    client = FakeChatClient(lambda model: DECISION, lambda model, index: (0.01, 0.2))
+    with pytest.raises(llm_executor.DecisionTimeout):
+        llm_executor.run_hedged(request_fn(client), trading_bot.parse_decision, deadline=0.3)
+
+    assert len(client.streams) == 2
+    for stream in client.streams:
+        assert stream.finished.wait(0.5)
+        assert stream.closed and not stream.complete
+    assert llm_executor.executor_stats["cancelled"] == 2
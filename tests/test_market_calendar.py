@@ -0,0 +1,72 @@
+from datetime import date, datetime
+
+import pytest
+
+import market_calendar
+from market_calendar import EASTERN
+
+# Published NYSE holiday and early-close calendars
+NYSE_HOLIDAYS = {
+    2025: [
+        date(2025, 1, 1), date(2025, 1, 9), date(2025, 1, 20), date(2025, 2, 17), date(2025, 4, 18),
+        date(2025, 5, 26), date(2025, 6, 19), date(2025, 7, 4), date(2025, 9, 1), date(2025, 11, 27),
+        date(2025, 12, 25),
+    ],
+    2026: [
+        date(2026, 1, 1), date(2026, 1, 19), date(2026, 2, 16), date(2026, 4, 3), date(2026, 5, 25),
+        date(2026, 6, 19), date(2026, 7, 3), date(2026, 9, 7), date(2026, 11, 26), date(2026, 12, 25),
+    ],
+    2027: [
+        date(2027, 1, 1), date(2027, 1, 18), date(2027, 2, 15), date(2027, 3, 26), date(2027, 5, 31),
+        date(2027, 6, 18), date(2027, 7, 5), date(2027, 9, 6), date(2027, 11, 25), date(2027, 12, 24),
+    ],
+}
+NYSE_EARLY_CLOSES = {
+    2025: {date(2025, 7, 3), date(2025, 11, 28), date(2025, 12, 24)},
+    # July 3 is the observed Independence Day, so there is no July half-day
+    2026: {date(2026, 11, 27), date(2026, 12, 24)},
+    # July 3 is a Saturday and December 24 the observed Christmas Day
+    2027: {date(2027, 11, 26)},
+}
+
+
+def eastern(*args):
+    return EASTERN.localize(datetime(*args))
+
+
+@pytest.mark.parametrize("year", sorted(NYSE_HOLIDAYS))
+def test_holidays_match_the_published_calendar(year):
+    assert sorted(market_calendar.nyse_holidays(year)) == NYSE_HOLIDAYS[year]
+
+
+@pytest.mark.parametrize("year", sorted(NYSE_EARLY_CLOSES))
+def test_early_closes_match_the_published_calendar(year):
+    assert market_calendar.nyse_early_closes(year) == NYSE_EARLY_CLOSES[year]
+    for day in NYSE_EARLY_CLOSES[year]:
+        assert market_calendar.session_bounds(day)["close"] == eastern(day.year, day.month, day.day, 13, 0)
+
+
+def test_saturday_new_years_day_is_not_observed_in_the_prior_year():
+    # January 1, 2028 is a Saturday: the market stays open on Friday, December 31, 2027
+    assert date(2027, 12, 31) not in market_calendar.nyse_holidays(2027)
+    assert not any(day.month == 1 and day.day <= 3 for day in market_calendar.nyse_holidays(2028))
+    assert market_calendar.is_trading_day(date(2027, 12, 31))
+
+
+@pytest.mark.parametrize("ts, expected", [
+    # After the last close of 2026; January 1, 2027 is a holiday and then a weekend
+    (eastern(2026, 12, 31, 17, 0), eastern(2027, 1, 4, 9, 30)),
+    (eastern(2026, 12, 31, 9, 29), eastern(2026, 12, 31, 9, 30)),
+    (eastern(2027, 12, 30, 20, 0), eastern(2027, 12, 31, 9, 30)),
+])
+def test_next_open_across_the_year_boundary(ts, expected):
+    assert market_calendar.next_open(ts) == expected
+
+
+@pytest.mark.parametrize("ts, expected", [
+    (eastern(2026, 12, 31, 12, 0), eastern(2026, 12, 31, 16, 0)),
+    (eastern(2026, 12, 31, 16, 0), eastern(2027, 1, 4, 16, 0)),
+    (eastern(2026, 12, 24, 10, 0), eastern(2026, 12, 24, 13, 0)),
+])
+def test_next_close_across_the_year_boundary(ts, expected):
+    assert market_calendar.next_close(ts) == expected
@@ -0,0 +1,125 @@
+import json
+
+import pytest
+
+import order_book
+
+
+@pytest.fixture(autouse=True)
+def book(monkeypatch):
+    """An empty order book with no slippage and a 1,000 notional fill budget"""
+    monkeypatch.setattr(order_book, "SLIPPAGE_BPS", 0)
+    monkeypatch.setattr(order_book, "MAX_FILL_NOTIONAL", 1000)
+    order_book.reset()
+    yield
+    order_book.reset()
+
+
+def accept_all(order, shares, price, fee):
+    return shares
+
+
+def quote(price, ticker="spy"):
+    return {ticker: {"c": price}}
+
+
+def test_market_order_fills_partially_within_the_liquidity_budget():
+    order = order_book.submit_order("spy", "BUY", 25, market_open=True)
+
+    fills = order_book.match(quote(100.0), accept_all)
+    assert [fill["shares"] for fill in fills] == [10]
+    assert order["status"] == "partial"
+
+    order_book.match(quote(100.0), accept_all)
+    fills = order_book.match(quote(100.0), accept_all)
+    assert [fill["shares"] for fill in fills] == [5]
+    assert order["status"] == "filled" and order["filled"] == 25
+    assert order_book.open_orders() == []
+
+
+def test_partial_fill_cancels_the_rest_when_cash_runs_out():
+    order = order_book.submit_order("spy", "BUY", 5, market_open=True)
+    order_book.match(quote(100.0), lambda order, shares, price, fee: 2)
+    assert order["filled"] == 2
+    assert order["status"] == "cancelled" and order["cancel_reason"] == "insufficient cash"
+
+
+def test_symbol_priced_above_the_budget_still_fills_a_share_per_snapshot():
+    order = order_book.submit_order("brk.a", "BUY", 2, market_open=True)
+    fills = order_book.match(quote(5000.0, "brk.a"), accept_all)
+    assert [fill["shares"] for fill in fills] == [1]
+    order_book.match(quote(5000.0, "brk.a"), accept_all)
+    assert order["status"] == "filled"
+
+
+def test_stops_trigger_only_once_the_price_crosses():
+    buy_stop = order_book.submit_order("spy", "BUY", 1, "stop", stop_price=105.0)
+    sell_stop = order_book.submit_order("spy", "SELL", 1, "stop", stop_price=95.0)
+
+    assert order_book.match(quote(100.0), accept_all) == []
+    fills = order_book.match(quote(106.0), accept_all)
+    assert [fill["order_id"] for fill in fills] == [buy_stop["id"]]
+    # Triggered stops fill as market orders at the quote
+    assert fills[0]["price"] == 106.0
+
+    fills = order_book.match(quote(94.0), accept_all)
+    assert [fill["order_id"] for fill in fills] == [sell_stop["id"]]
+
+
+def test_limit_orders_never_fill_through_the_limit(monkeypatch):
+    monkeypatch.setattr(order_book, "SLIPPAGE_BPS", 100)
+    buy = order_book.submit_order("spy", "BUY", 1, "limit", limit_price=100.5)
+    sell = order_book.submit_order("qqq", "SELL", 1, "limit", limit_price=199.5)
+
+    assert order_book.match({"spy": {"c": 101.0}, "qqq": {"c": 199.0}}, accept_all) == []
+    fills = {fill["order_id"]: fill for fill in order_book.match({"spy": {"c": 100.0}, "qqq": {"c": 200.0}}, accept_all)}
+    # 1% slippage would be 101.0 and 198.0; the limits cap it
+    assert fills[buy["id"]]["price"] == 100.5
+    assert fills[sell["id"]]["price"] == 199.5
+
+
+def test_best_priced_limit_fills_first():
+    low = order_book.submit_order("spy", "BUY", 5, "limit", limit_price=99.0)
+    high = order_book.submit_order("spy", "BUY", 5, "limit", limit_price=101.0)
+    fills = order_book.match(quote(98.0), accept_all)
+    assert [fill["order_id"] for fill in fills] == [high["id"], low["id"]]
+
+
+def test_after_hours_orders_wait_for_the_open():
+    order = order_book.submit_order("spy", "BUY", 1, market_open=False)
+    assert order["status"] == "queued"
+    assert order_book.match(quote(100.0), accept_all) == []
+
+    assert order_book.release_after_hours_orders() == 1
+    assert order["status"] == "pending"
+    assert [fill["order_id"] for fill in order_book.match(quote(100.0), accept_all)] == [order["id"]]
+
+
+def test_orders_expire_at_their_time_in_force():
+    order = order_book.submit_order("spy", "BUY", 1, "limit", limit_price=50.0)
+    queued = order_book.submit_order("qqq", "BUY", 1, market_open=False)
+    assert order["expires_at"] is not None
+
+    assert order_book.expire_orders(order["expires_at"] - 1) == 0
+    assert order_book.expire_orders(max(order["expires_at"], queued["expires_at"])) == 2
+    assert order["status"] == "cancelled" and order["cancel_reason"] == "expired"
+    assert order_book.open_orders() == []
+    assert order_book.release_after_hours_orders() == 0
+
+
+def test_restore_from_saved_json():
+    order_book.submit_order("spy", "BUY", 1, "limit", limit_price=90.0)
+    order_book.submit_order("qqq", "SELL", 2, market_open=False)
+    saved = json.loads(json.dumps(order_book.open_orders()))
+    # Orders saved before time in force existed
+    del saved[0]["expires_at"]
+
+    order_book.reset()
+    order_book.restore(saved)
+    assert [(o["ticker"], o["status"]) for o in order_book.open_orders()] == [("spy", "pending"), ("qqq", "queued")]
+    assert all(o["expires_at"] for o in order_book.open_orders())
+
+    assert order_book.match(quote(89.0), accept_all)[0]["ticker"] == "spy"
+    assert order_book.release_after_hours_orders() == 1
+    # New ids continue after the restored ones
+    assert order_book.submit_order("spy", "BUY", 1)["id"] == 3
@@ -0,0 +1,81 @@
+import pytest
+
+import risk
+import symbol_registry
+
+
+@pytest.fixture(autouse=True)
+def universe(monkeypatch):
+    """Two tech stocks, an energy stock and a 3x leveraged ETF, all priced at 100"""
+    monkeypatch.setattr(symbol_registry, "_registry", {
+        "symbols": ["aaa", "bbb", "ccc", "lev"],
+        "sectors": {"aaa": "tech", "bbb": "tech", "ccc": "energy", "lev": "leveraged"},
+        "leverage": {"lev": 3.0},
+    })
+    monkeypatch.setattr(risk, "_state", dict(risk._state))
+
+
+def portfolio(held=None, start_value=10000.0):
+    """A 10,000 equity portfolio holding ``held`` ({symbol: shares}) bought at 100"""
+    held = held or {}
+    positions = {symbol: {"shares": held.get(symbol, 0), "avg_price": 100.0} for symbol in ("aaa", "bbb", "ccc", "lev")}
+    return {
+        "cash": 10000.0 - 100.0 * sum(held.values()),
+        "portfolio_value": 10000.0,
+        "positions": positions,
+        "performance_metrics": {"start_value": start_value, "daily_returns": []},
+    }
+
+
+def test_position_limit():
+    risk.sync(portfolio())
+    assert risk.check_order("aaa", "BUY", 20, 100.0) == (True, [])
+
+    allowed, reasons = risk.check_order("aaa", "BUY", 30, 100.0)
+    assert not allowed
+    assert reasons == ["AAA would be 30.0% of equity (limit 25%)"]
+
+
+def test_sector_limit_counts_every_position_in_the_sector():
+    risk.sync(portfolio({"aaa": 20, "bbb": 15}))
+    assert risk.check_order("ccc", "BUY", 20, 100.0)[0]
+
+    allowed, reasons = risk.check_order("bbb", "BUY", 10, 100.0)
+    assert not allowed
+    assert reasons == ["Sector tech would be 45.0% of equity (limit 40%)"]
+
+
+def test_leveraged_etf_limit():
+    risk.sync(portfolio())
+    assert risk.check_order("lev", "BUY", 10, 100.0)[0]
+
+    allowed, reasons = risk.check_order("lev", "BUY", 20, 100.0)
+    assert not allowed
+    assert reasons == ["Leveraged ETFs would be 20.0% of equity (limit 15%)"]
+    assert risk.snapshot()["leveraged_exposure"] == 0.0
+
+
+def test_drawdown_breaker_blocks_buys_but_not_sells():
+    # Peak equity 12,000, now 10,000: a 16.7% drawdown
+    risk.sync(portfolio({"aaa": 10}, start_value=12000.0))
+    assert risk.snapshot()["circuit_breaker"]
+
+    allowed, reasons = risk.check_order("ccc", "BUY", 1, 100.0)
+    assert not allowed and reasons[0].startswith("Drawdown circuit breaker tripped")
+    assert risk.check_order("aaa", "SELL", 10, 100.0) == (True, [])
+
+
+def test_prices_and_fills_move_the_exposure():
+    risk.sync(portfolio({"aaa": 20}))
+    # AAA doubles: 4,000 of 12,000 equity
+    risk.on_quote({"aaa": {"c": 200.0}})
+    assert risk.snapshot()["position_weights"]["aaa"] == pytest.approx(1 / 3)
+    assert not risk.check_order("aaa", "BUY", 1, 200.0)[0]
+
+    risk.on_fill("aaa", 10, 10000.0)
+    assert risk.snapshot()["position_weights"]["aaa"] == pytest.approx(2000 / 12000)
+
+
+def test_unknown_ticker_is_rejected():
+    risk.sync(portfolio())
+    assert risk.check_order("zzz", "BUY", 1, 100.0) == (False, ["ZZZ is not in the risk universe"])
@@ -0,0 +1,71 @@
+import time
+
+import cycle_scheduler
+import finnhub_stream
+import quote_store
+import screener
+import symbol_registry
+import trading_bot
+
+SYMBOLS = ["aaa", "bbb", "ccc", "ddd"]
+
+
+def test_quotes_not_refreshed_within_a_cycle_are_stale(monkeypatch):
+    monkeypatch.setattr(symbol_registry, "symbols", lambda: list(SYMBOLS))
+    monkeypatch.setattr(finnhub_stream, "snapshot", lambda: None)
+    monkeypatch.setattr(trading_bot, "portfolio", {"cash": 10000.0, "positions": {}})
+    monkeypatch.setattr(trading_bot, "latest_candidates", [])
+    monkeypatch.setattr(trading_bot, "_universe_quotes", {})
+    monkeypatch.setattr(trading_bot, "_rest_cursor", 0)
+    monkeypatch.setattr(trading_bot, "REST_QUOTES_PER_CYCLE", 2)
+    monkeypatch.setattr(trading_bot, "QUOTE_MAX_AGE", 60)
+
+    def fetch_rest_quotes(tickers):
+        return {
+            t.lower(): {"c": 101.0 + i, "dp": 1.0 + i, "h": 103.0, "l": 99.0, "o": 100.0, "pc": 100.0, "fetched_at": time.time()}
+            for i, t in enumerate(tickers)
+        }
+
+    monkeypatch.setattr(trading_bot, "fetch_rest_quotes", fetch_rest_quotes)
+
+    # Two cycles walk the whole universe
+    trading_bot.get_market_signals()
+    signals = trading_bot.get_market_signals()
+    assert set(signals) == set(SYMBOLS)
+    assert not any(quote.get("stale") for quote in signals.values())
+
+    # The first batch was fetched more than QUOTE_MAX_AGE ago
+    for ticker in ("aaa", "bbb"):
+        trading_bot._universe_quotes[ticker]["fetched_at"] -= 120
+    monkeypatch.setattr(trading_bot, "fetch_rest_quotes", lambda tickers: {})
+    signals = trading_bot.get_market_signals()
+    assert signals["aaa"]["stale"] and signals["bbb"]["stale"]
+    assert not signals["ccc"].get("stale") and not signals["ddd"].get("stale")
+    # Marked in the returned copy only, and left out of screening
+    assert "stale" not in trading_bot._universe_quotes["aaa"]
+    assert set(screener.screen(signals, k=4)) == {"ccc", "ddd"}
+
+
+def test_refetching_unchanged_prices_is_not_a_change(monkeypatch):
+    monkeypatch.setattr(quote_store, "quotes", {})
+    monkeypatch.setattr(quote_store, "symbol_versions", {})
+    monkeypatch.setattr(quote_store, "current_version", 0)
+    quote = {"c": 101.0, "d": 1.0, "dp": 1.0, "pc": 100.0}
+
+    first = quote_store.update({"aaa": dict(quote, fetched_at=1.0), "bbb": dict(quote, stale=True, error="not refreshed for 400s")})
+    second = quote_store.update({"aaa": dict(quote, fetched_at=2.0), "bbb": dict(quote, stale=True, error="not refreshed for 700s")})
+    assert second == first
+    assert quote_store.changes_since(first)["symbols"] == []
+    assert "fetched_at" not in quote_store.quotes["aaa"]
+
+
+def test_throttle_is_measured_against_the_fetched_batch():
+    universe = {f"s{i}": {"c": 100.0} for i in range(100)}
+    batch = {f"s{i}": {"c": "N/A", "error": 429} for i in range(10)}
+    universe.update(batch)
+
+    # 10 of 100 is under THROTTLE_FRACTION, but the whole batch was rate limited
+    assert not cycle_scheduler.is_throttled(universe)
+    scheduler = cycle_scheduler.CycleScheduler()
+    scheduler.plan_next(1000.0, 1001.0, universe, fetched=batch)
+    assert scheduler.mode == "throttled"
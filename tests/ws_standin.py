@@ -0,0 +1,130 @@
+"""Minimal in-process WebSocket server standing in for the Finnhub stream
+
+Implements just enough of RFC 6455 for websocket-client: the opening
+handshake, unfragmented text frames, ping/pong and close.
+"""
+import base64
+import hashlib
+import json
+import queue
+import socket
+import struct
+import threading
+
+_GUID = "258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+
+
+class Connection:
+    """One accepted client; ``received`` collects the text messages it sent"""
+
+    def __init__(self, sock):
+        self.sock = sock
+        self.received = queue.Queue()
+        self.closed = threading.Event()
+        self._send_lock = threading.Lock()
+        self._handshake()
+        threading.Thread(target=self._read_loop, daemon=True).start()
+
+    def _handshake(self):
+        request = b""
+        while b"\r\n\r\n" not in request:
+            chunk = self.sock.recv(4096)
+            if not chunk:
+                raise ConnectionError("client closed during handshake")
+            request += chunk
+        headers = dict(
+            line.split(": ", 1) for line in request.decode().split("\r\n")[1:] if ": " in line
+        )
+        accept = base64.b64encode(hashlib.sha1((headers["Sec-WebSocket-Key"] + _GUID).encode()).digest()).decode()
+        self.sock.sendall((
+            "HTTP/1.1 101 Switching Protocols\r\n"
+            "Upgrade: websocket\r\nConnection: Upgrade\r\n"
+            f"Sec-WebSocket-Accept: {accept}\r\n\r\n"
+        ).encode())
+
+    def _recv_exact(self, count):
+        data = b""
+        while len(data) < count:
+            chunk = self.sock.recv(count - len(data))
+            if not chunk:
+                raise ConnectionError("client closed")
+            data += chunk
+        return data
+
+    def _read_loop(self):
+        try:
+            while True:
+                first, second = self._recv_exact(2)
+                opcode, length = first & 0x0F, second & 0x7F
+                if length == 126:
+                    length = struct.unpack("!H", self._recv_exact(2))[0]
+                elif length == 127:
+                    length = struct.unpack("!Q", self._recv_exact(8))[0]
+                mask = self._recv_exact(4) if second & 0x80 else b"\0\0\0\0"
+                payload = bytes(b ^ mask[i % 4] for i, b in enumerate(self._recv_exact(length)))
+                if opcode == 0x1:
+                    self.received.put(payload.decode())
+                elif opcode == 0x9:
+                    self._send_frame(0xA, payload)
+                elif opcode == 0x8:
+                    # Echo the close frame, completing the closing handshake
+                    self._send_frame(0x8, payload[:2])
+                    self.sock.close()
+                    break
+        except (ConnectionError, OSError):
+            pass
+        finally:
+            self.closed.set()
+
+    def _send_frame(self, opcode, payload):
+        header = bytes([0x80 | opcode])
+        if len(payload) < 126:
+            header += bytes([len(payload)])
+        elif len(payload) < 65536:
+            header += bytes([126]) + struct.pack("!H", len(payload))
+        else:
+            header += bytes([127]) + struct.pack("!Q", len(payload))
+        with self._send_lock:
+            self.sock.sendall(header + payload)
+
+    def send_text(self, text):
+        self._send_frame(0x1, text.encode())
+
+    def send_json(self, message):
+        self.send_text(json.dumps(message))
+
+    def close(self):
+        """Server-initiated close, as when the upstream drops the connection"""
+        try:
+            self._send_frame(0x8, struct.pack("!H", 1000))
+            self.sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        self.sock.close()
+        self.closed.set()
+
+
+class StandInServer:
+    """Accepts WebSocket clients on a free local port; ``connections`` yields each one"""
+
+    def __init__(self):
+        self._listener = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self._listener.bind(("127.0.0.1", 0))
+        self._listener.listen()
+        self.url = f"ws://127.0.0.1:{self._listener.getsockname()[1]}"
+        self.connections = queue.Queue()
+        threading.Thread(target=self._accept_loop, daemon=True).start()
+
+    def _accept_loop(self):
+        while True:
+            try:
+                sock, _ = self._listener.accept()
+            except OSError:
+                return
+            try:
+                self.connections.put(Connection(sock))
+            except (ConnectionError, OSError):
+                sock.close()
+
+    def close(self):
+        self._listener.close()
@@ -1,22 +1,28 @@
 import time
-import schedule
 import requests
 import logging
 import os
 import threading
 from datetime import datetime, timedelta
 import json
-from openai import OpenAI
+import log_setup
 from utilt import isMarketOpen
-import gspread
-from oauth2client.service_account import ServiceAccountCredentials
-from daily_portfolio_logger import log_daily_portfolio_value, init_daily_logging_sheet
-
-# Configure logging  
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
+import cycle_scheduler
+import order_book
+import risk
+import position_sizer
+import projection
+import cycle_recorder
+import circuit_breaker
+import finnhub_stream
+import symbol_registry
+import screener
+import history_store
+import llm_executor
+import decision_parser
+
+# Configure logging (queue-based, written by a background thread)
+log_setup.configure_logging()
 logger = logging.getLogger(__name__)
 
 # Load API keys and configuration from environment variables
@@ -28,26 +34,62 @@ Seb_API_key = os.environ.get("sebs_finnhub_api_key", "")
 OPENAI_API_KEY = os.environ.get("OPENAI_API_KEY", "")
 CREDENTIALS_FILE = "nexusGateFund.json"
 
-# Initialize OpenAI client
-client = OpenAI(api_key=OPENAI_API_KEY) if OPENAI_API_KEY else None
+# OpenAI client, created on first use by get_openai_client()
+client = None
+_client_lock = threading.Lock()
 
 # Global variables to store trading data for display
 latest_signals = {}
 latest_news = []
 latest_decision = {"action": "N/A", "rationale": "N/A"}
+# Growth projection computed after the latest cycle; the web app only ever serves this
+latest_growth_projection = None
+# Inputs and outcome of the most recent cycle, as captured by cycle_recorder
+last_cycle_record = None
 trading_history = []
-bot_status = {"running": False, "last_run": None, "next_run": None}
+bot_status = {"running": False, "last_run": None, "next_run": None, "schedule": None, "degraded": []}
+
+# System prompts for the decision request; with OPENAI_VOTE_VARIANTS > 1 the first N run in parallel and vote
+DECISION_SYSTEM_PROMPTS = [
+    "You are a professional hedge fund manager. Always respond with valid JSON only.",
+    "You are a risk-focused portfolio manager who prioritises capital preservation. Always respond with valid JSON only.",
+    "You are a momentum trader who follows short-term trends and news flow. Always respond with valid JSON only.",
+]
+
+# Orders the model may place per decision; above 1 the prompt asks for an "orders" list
+MAX_ORDERS_PER_DECISION = int(os.environ.get("MAX_ORDERS_PER_DECISION", 1))
+# Act on a streamed decision as soon as action and ticker arrive, without waiting for the rationale
+DECISION_EARLY_ACT = os.environ.get("DECISION_EARLY_ACT", "0") == "1"
+
+# Held for the duration of a trading cycle so the bot thread and /api/run-now never overlap
+cycle_lock = threading.Lock()
 
 # Declare a json file that I will use to store the portfolio
 PORTFOLIO_FILE = "portfolio.json"
 
+def get_openai_client():
+    """Return the shared OpenAI client, importing the SDK on first use
+
+    Returns None if no API key is configured.
+    """
+    global client
+
+    if client is None and OPENAI_API_KEY:
+        with _client_lock:
+            if client is None:
+                from openai import OpenAI
+                client = OpenAI(api_key=OPENAI_API_KEY)
+    return client
+
 def save_portfolio():
     try:
+        # Persist open orders so after-hours orders survive a restart
+        portfolio["orders"] = order_book.open_orders()
         with open(PORTFOLIO_FILE, 'w') as file:
             json.dump(portfolio, file, indent=2)
         logger.info("Portfolio saved successfully")
     except Exception as exception:
-        logger.error(f"Error saving portfolio: {exception}")
+        logger.error("Error saving portfolio: %s", exception)
 
 def load_portfolio():
     global portfolio
@@ -55,9 +97,10 @@ def load_portfolio():
         try:
             with open(PORTFOLIO_FILE, 'r') as file:
                 portfolio = json.load(file)
+            order_book.restore(portfolio.get("orders", []))
             logger.info("Successfully loaded portfolio")
         except Exception as exception:
-            logger.error(f"Failed to load portfolio: {exception}")
+            logger.error("Failed to load portfolio: %s", exception)
     else:
         logger.info("Portfolio file does not exist, using default portfolio")
 
@@ -127,97 +170,69 @@ def update_performance_metrics(trade_data):
     if len(portfolio["performance_metrics"]["daily_returns"]) > 365:
         portfolio["performance_metrics"]["daily_returns"] = portfolio["performance_metrics"]["daily_returns"][-365:]
 
-def get_portfolio_growth_projection():
-    """Calculate projected portfolio growth to reach $100k target"""
+def get_portfolio_growth_projection(signals=None):
+    """Project portfolio growth toward the $100k target with a Monte Carlo simulation"""
     current_value = portfolio["portfolio_value"]
-    start_value = portfolio["performance_metrics"]["start_value"]
-    target_value = 100000.0
-
-    if len(portfolio["performance_metrics"]["daily_returns"]) < 2:
-        return {
-            "current_value": current_value,
-            "target_value": target_value,
-            "progress_percentage": (current_value / target_value) * 100,
-            "days_active": 0,
-            "projected_days_to_target": "Insufficient data",
-            "required_daily_return": "Calculating..."
-        }
-
-    # Calculate average daily return
+    target_value = projection.TARGET_VALUE
     daily_returns = portfolio["performance_metrics"]["daily_returns"]
-    days_active = len(daily_returns)
-
-    if days_active > 1:
-        total_return_pct = portfolio["performance_metrics"]["total_return_percentage"]
-        avg_daily_return_pct = total_return_pct / days_active if days_active > 0 else 0
-
-        # Calculate days needed to reach target
-        remaining_return_needed = ((target_value - current_value) / current_value) * 100
-
-        if avg_daily_return_pct > 0:
-            projected_days_to_target = int(remaining_return_needed / avg_daily_return_pct)
-        else:
-            projected_days_to_target = "N/A (negative returns)"
-    else:
-        avg_daily_return_pct = 0
-        projected_days_to_target = "Calculating..."
-
-    return {
+    
+    # Position weights for the volatility model used until enough daily returns are recorded
+    weights = {}
+    if current_value > 0:
+        for ticker, position in portfolio["positions"].items():
+            if position["shares"] > 0:
+                price = (signals or latest_signals).get(ticker, {}).get("c")
+                if not isinstance(price, (int, float)) or price <= 0:
+                    price = position["avg_price"]
+                weights[ticker] = position["shares"] * price / current_value
+    
+    growth = {
         "current_value": current_value,
         "target_value": target_value,
-        "progress_percentage": (current_value / target_value) * 100,
-        "days_active": days_active,
-        "avg_daily_return_pct": avg_daily_return_pct,
-        "projected_days_to_target": projected_days_to_target,
-        "remaining_amount": target_value - current_value
+        "progress_percentage": round((current_value / target_value) * 100, 2),
+        "days_active": len({entry.get("date") for entry in daily_returns}),
+        "remaining_amount": max(0.0, target_value - current_value),
+        "avg_daily_return_pct": 0.0,
+        "projected_days_to_target": "Insufficient data",
+        "simulation": None
     }
+    
+    try:
+        simulation = projection.project(
+            daily_returns,
+            current_value,
+            target_value,
+            position_volatility=position_sizer.portfolio_volatility(weights)
+        )
+    except Exception as e:
+        logger.error("Error running portfolio projection: %s", e)
+        return growth
+    
+    if simulation:
+        growth["simulation"] = simulation
+        growth["avg_daily_return_pct"] = simulation["avg_daily_return_pct"]
+        final_probability = simulation["probability_by_date"][-1]["probability"]
+        if simulation["median_days_to_target"] is not None:
+            growth["projected_days_to_target"] = simulation["median_days_to_target"]
+        else:
+            growth["projected_days_to_target"] = (
+                f"Beyond {simulation['horizon_days']} trading days ({final_probability:.0%} chance within)"
+            )
+    
+    return growth
+
+def refresh_growth_projection():
+    """Recompute the growth projection off the request path and keep it in latest_growth_projection"""
+    global latest_growth_projection
+
+    latest_growth_projection = get_portfolio_growth_projection(latest_signals)
+    return latest_growth_projection
 
 # Portfolio tracking
 portfolio = {
     "cash": 10000.0,  # Starting with $10,000 in cash
-    "positions": {
-        # Core Index & Volatility
-        "spy": {"shares": 0, "avg_price": 0},
-        "qqq": {"shares": 0, "avg_price": 0},
-        "dia": {"shares": 0, "avg_price": 0},
-        "iwm": {"shares": 0, "avg_price": 0},
-        "vixy": {"shares": 0, "avg_price": 0},
-        "uvxy": {"shares": 0, "avg_price": 0},
-
-        # Big Tech
-        "aapl": {"shares": 0, "avg_price": 0},
-        "msft": {"shares": 0, "avg_price": 0},
-        "nvda": {"shares": 0, "avg_price": 0},
-        "amzn": {"shares": 0, "avg_price": 0},
-        "googl": {"shares": 0, "avg_price": 0},
-        "tsla": {"shares": 0, "avg_price": 0},
-        "meta": {"shares": 0, "avg_price": 0},
-
-        # Financials & ETFs
-        "xlf": {"shares": 0, "avg_price": 0},
-        "jpm": {"shares": 0, "avg_price": 0},
-        "bac": {"shares": 0, "avg_price": 0},
-        "v": {"shares": 0, "avg_price": 0},
-        "ma": {"shares": 0, "avg_price": 0},
-
-        # Energy & Commodities
-        "gld": {"shares": 0, "avg_price": 0},
-        "slv": {"shares": 0, "avg_price": 0},
-        "uso": {"shares": 0, "avg_price": 0},
-        "xle": {"shares": 0, "avg_price": 0},
-
-        # Leverage ETFs
-        "tqqq": {"shares": 0, "avg_price": 0},
-        "sqqq": {"shares": 0, "avg_price": 0},
-        "soxl": {"shares": 0, "avg_price": 0},
-        "soxs": {"shares": 0, "avg_price": 0},
-
-        # Healthcare & Defensive
-        "unh": {"shares": 0, "avg_price": 0},
-        "jnj": {"shares": 0, "avg_price": 0},
-        "pfe": {"shares": 0, "avg_price": 0},
-        "xlu": {"shares": 0, "avg_price": 0},
-    },
+    # Filled with every symbol in the registry by init_bot()
+    "positions": {},
     "history": [],
     "portfolio_value": 10000.0,
     "performance_metrics": {
@@ -234,16 +249,51 @@ portfolio = {
     },
 }
 
-# Load portfolio on startup
-load_portfolio()
+_init_lock = threading.Lock()
+_initialized = False
+
+def init_bot():
+    """Load persisted state (portfolio, open orders, risk arrays, price history)
+
+    Called once by the app factory or daemon rather than at import time, so
+    importing this module stays cheap. Safe to call more than once.
+    """
+    global _initialized
+
+    with _init_lock:
+        if _initialized:
+            return
+        load_portfolio()
+        for symbol in symbol_registry.symbols():
+            portfolio["positions"].setdefault(symbol, {"shares": 0, "avg_price": 0})
+        risk.sync(portfolio)
+        position_sizer.load(portfolio["positions"].keys())
+        history_store.start()
+        start_quote_stream()
+        # Warm the projection in the background so boot does not wait for the simulation
+        threading.Thread(target=refresh_growth_projection, name="projection-warmup", daemon=True).start()
+        _initialized = True
 
 # Initialize threading event to control the bot
 stop_event = threading.Event()
 bot_thread = None
 
 # Setup Google Sheets
+# Worksheet handle reused across cycles; dropped when a write fails so the next cycle reconnects
+_worksheet = None
+
 def init_sheet():
-    """Initialize and return Google Sheet connection"""
+    """Return the Google Sheet connection, connecting on first use
+
+    The connection is cached across cycles. While the sheets circuit is
+    open no connection is attempted and None is returned.
+    """
+    global _worksheet
+    
+    if _worksheet is not None:
+        return _worksheet
+    
+    breaker = circuit_breaker.get("sheets")
     try:
         credentials_file = CREDENTIALS_FILE
         if not os.path.exists(credentials_file):
@@ -267,32 +317,39 @@ def init_sheet():
         # Set up authentication with service account
         scopes = ["https://spreadsheets.google.com/feeds", "https://www.googleapis.com/auth/drive"]
 
-        logger.info(f"Using credentials file: {credentials_file}")
+        if not breaker.allow():
+            logger.warning("Google Sheets circuit is open, skipping sheet logging")
+            return None
+
+        # Imported here: the Google client stack is slow to import and only needed when logging
+        import gspread
+        from oauth2client.service_account import ServiceAccountCredentials
+
+        logger.info("Using credentials file: %s", credentials_file)
         creds = ServiceAccountCredentials.from_json_keyfile_name(credentials_file, scopes)
         client_gs = gspread.authorize(creds)
 
         try:
             # Try opening by ID first (most reliable)
-            logger.info(f"Attempting to open spreadsheet by ID: {spreadsheet_id}")
+            logger.info("Attempting to open spreadsheet by ID: %s", spreadsheet_id)
             spreadsheet = client_gs.open_by_key(spreadsheet_id)
-            logger.info(f"Successfully opened spreadsheet by ID")
+            logger.info("Successfully opened spreadsheet by ID")
         except Exception as e:
             # If ID fails, try opening by name
-            logger.warning(f"Failed to open by ID: {str(e)}, trying by name: {GSHEET_NAME}")
+            logger.warning("Failed to open by ID: %s, trying by name: %s", e, GSHEET_NAME)
             spreadsheet = client_gs.open(GSHEET_NAME)
-            logger.info(f"Successfully opened spreadsheet by name: {GSHEET_NAME}")
+            logger.info("Successfully opened spreadsheet by name: %s", GSHEET_NAME)
 
         # Try to access the Logs worksheet
         try:
             worksheet = spreadsheet.worksheet(WORKSHEET_NAME)
-            logger.info(f"Successfully accessed worksheet: {WORKSHEET_NAME}")
-            return worksheet
+            logger.info("Successfully accessed worksheet: %s", WORKSHEET_NAME)
 
         except gspread.exceptions.WorksheetNotFound:
             # Create the worksheet if it doesn't exist
-            logger.info(f"Worksheet {WORKSHEET_NAME} not found, creating...")
+            logger.info("Worksheet %s not found, creating...", WORKSHEET_NAME)
             worksheet = spreadsheet.add_worksheet(title=WORKSHEET_NAME, rows=1000, cols=20)
-            logger.info(f"Created new worksheet: {WORKSHEET_NAME}")
+            logger.info("Created new worksheet: %s", WORKSHEET_NAME)
 
             # Set up headers
             header = [
@@ -302,37 +359,130 @@ def init_sheet():
             ]
             worksheet.append_row(header)
             logger.info("Added headers to new worksheet")
-            return worksheet
+
+        breaker.record_success()
+        _worksheet = worksheet
+        return worksheet
 
     except Exception as e:
-        logger.error(f"Failed to initialize Google Sheet: {str(e)}")
+        logger.error("Failed to initialize Google Sheet: %s", e)
+        breaker.record_failure(e)
         return None
 
-# Fetch market data from Finnhub for all tickers
+# REST quotes fetched per cycle while the stream is down; the rest of the universe keeps its last quote
+REST_QUOTES_PER_CYCLE = int(os.environ.get("REST_QUOTES_PER_CYCLE", 60))
+# Candidates whose company news is fetched each cycle
+NEWS_TICKERS = int(os.environ.get("NEWS_TICKERS", 5))
+# Universe quotes not refreshed within this many seconds (default: one regular cycle) are served stale
+QUOTE_MAX_AGE = float(os.environ.get("QUOTE_MAX_AGE", cycle_scheduler.BASE_INTERVAL))
+
+# Latest quote for every symbol in the universe, refreshed a batch at a time over REST
+_universe_quotes = {}
+_rest_cursor = 0
+# Guards the two above, which the bot cycle and (while it is stopped) web requests both update
+_universe_lock = threading.Lock()
+# Quotes requested over REST by the latest poll ({} when the stream served it), for the throttle check
+last_rest_batch = {}
+# Candidates picked by the screener in the latest cycle, best first
+latest_candidates = []
+
+def universe():
+    """Tradable symbols (lowercase): the symbol registry plus anything still held"""
+    symbols = symbol_registry.symbols()
+    known = set(symbols)
+    return symbols + [
+        ticker for ticker, position in portfolio["positions"].items() if position["shares"] and ticker not in known
+    ]
+
+def start_quote_stream():
+    """Start the Finnhub WebSocket stream if enabled with FINNHUB_STREAM=1"""
+    if FINNHUB_API_KEY and os.environ.get("FINNHUB_STREAM", "0") == "1":
+        finnhub_stream.start(universe(), FINNHUB_API_KEY)
+
+def _pinned_tickers():
+    """Held positions and open-order tickers, which are always quoted and screened in"""
+    held = [ticker for ticker, position in portfolio["positions"].items() if position["shares"]]
+    ordered = [order["ticker"] for order in order_book.open_orders()]
+    return list(dict.fromkeys(held + ordered))
+
+def _rest_batch():
+    """Symbols to refresh over REST this cycle, at most REST_QUOTES_PER_CYCLE
+
+    Held positions, open-order tickers and the last candidates come first;
+    the remaining budget walks the rest of the universe round-robin.
+    """
+    global _rest_cursor
+
+    symbols = universe()
+    if len(symbols) <= REST_QUOTES_PER_CYCLE:
+        return symbols
+
+    batch = list(dict.fromkeys(_pinned_tickers() + latest_candidates))[:REST_QUOTES_PER_CYCLE]
+    chosen = set(batch)
+    for _ in range(len(symbols)):
+        if len(batch) >= REST_QUOTES_PER_CYCLE:
+            break
+        symbol = symbols[_rest_cursor % len(symbols)]
+        _rest_cursor = (_rest_cursor + 1) % len(symbols)
+        if symbol not in chosen:
+            batch.append(symbol)
+            chosen.add(symbol)
+    return batch
+
+# Fetch market data from Finnhub for the symbol universe
 def get_market_signals():
-    """Fetch real-time market data for all tracked tickers"""
+    """Fetch real-time market data for the symbol universe
+
+    Takes a copy of the live WebSocket quote table when the stream is up,
+    so the cycle (and its recording) sees one consistent snapshot. Otherwise
+    polls the REST quote endpoint for one budgeted batch (see _rest_batch)
+    and returns it merged into the last known quotes of the universe. Quotes
+    fetched more than QUOTE_MAX_AGE seconds ago are marked ``"stale": True``,
+    so they are neither screened nor traded on.
+    """
+    global last_rest_batch
+
+    live_quotes = finnhub_stream.snapshot()
+    if live_quotes is not None:
+        last_rest_batch = {}
+        return live_quotes
+
+    with _universe_lock:
+        signals = fetch_rest_quotes([ticker.upper() for ticker in _rest_batch()])
+        _universe_quotes.update(signals)
+        last_rest_batch = signals
+        finnhub_stream.seed(signals)
+
+        now = time.time()
+        merged = {}
+        for ticker, quote in _universe_quotes.items():
+            age = now - quote.get("fetched_at", now)
+            if age > QUOTE_MAX_AGE and not quote.get("stale"):
+                quote = dict(quote, stale=True, error=f"not refreshed for {age:.0f}s")
+            merged[ticker] = quote
+    return merged
+
+# Last successful REST quote per ticker, served (marked stale) while Finnhub is failing
+_last_good_quotes = {}
+_last_good_news = []
+
+def stale_quote(symbol, error):
+    """Last known good quote for a symbol, marked stale, or an N/A placeholder"""
+    quote = _last_good_quotes.get(symbol)
+    if quote is None:
+        return {"c": "N/A", "error": error}
+    return dict(quote, stale=True, error=error)
+
+def fetch_rest_quotes(tickers):
+    """Poll the Finnhub REST quote endpoint for each ticker
+
+    Calls go through the finnhub circuit breaker. Tickers that fail, or
+    that are skipped while the circuit is open, get their last known good
+    quote marked ``"stale": True``. Every quote carries ``fetched_at``, the
+    time it was fetched.
+    """
     signals = {}
-
-    # All tracked tickers organized by category
-    tickers = [
-        # Core Index & Volatility
-        "SPY", "QQQ", "DIA", "IWM", "VIXY", "UVXY",
-
-        # Big Tech
-        "AAPL", "MSFT", "NVDA", "AMZN", "GOOGL", "TSLA", "META",
-
-        # Financials & ETFs
-        "XLF", "JPM", "BAC", "V", "MA",
-
-        # Energy & Commodities
-        "GLD", "SLV", "USO", "XLE",
-
-        # Leverage ETFs
-        "TQQQ", "SQQQ", "SOXL", "SOXS",
-
-        # Healthcare & Defensive
-        "UNH", "JNJ", "PFE", "XLU"
-    ]
+    breaker = circuit_breaker.get("finnhub")
 
     if not FINNHUB_API_KEY:
         logger.warning("FINNHUB_API_KEY not set, using mock data")
@@ -346,13 +496,17 @@ def get_market_signals():
                 "l": 100.0,  # low
                 "o": 100.0,  # open
                 "pc": 100.0, # previous close
-                "t": int(time.time())  # timestamp
+                "t": int(time.time()),  # timestamp
+                "fetched_at": time.time()
             }
         return signals
 
-    logger.info(f"Fetching market data for {len(tickers)} tickers...")
+    logger.info("Fetching market data for %d tickers...", len(tickers))
 
     for i, ticker in enumerate(tickers):
+        if not breaker.allow():
+            signals[ticker.lower()] = stale_quote(ticker.lower(), "circuit open")
+            continue
         try:
             # Add minimal delay between API calls to prevent worker timeout
             if i > 0:
@@ -364,28 +518,44 @@ def get_market_signals():
             )
 
             if response.status_code == 200:
-                signals[ticker.lower()] = response.json()
-                logger.debug(f"✓ {ticker}: {signals[ticker.lower()].get('c', 'N/A')}")
+                breaker.record_success()
+                signals[ticker.lower()] = dict(response.json(), fetched_at=time.time())
+                _last_good_quotes[ticker.lower()] = signals[ticker.lower()]
+                logger.debug("✓ %s: %s", ticker, signals[ticker.lower()].get('c', 'N/A'))
             elif response.status_code == 429:
-                logger.warning(f"Rate limit exceeded for {ticker}. Skipping to prevent timeout...")
-                signals[ticker.lower()] = {"c": "N/A", "error": 429}
+                logger.warning("Rate limit exceeded for %s. Skipping to prevent timeout...", ticker)
+                breaker.record_failure("HTTP 429")
+                signals[ticker.lower()] = stale_quote(ticker.lower(), 429)
             else:
-                logger.error(f"Failed to fetch data for {ticker}: {response.status_code}")
-                signals[ticker.lower()] = {"c": "N/A", "error": response.status_code}
+                logger.error("Failed to fetch data for %s: %s", ticker, response.status_code)
+                breaker.record_failure(f"HTTP {response.status_code}")
+                signals[ticker.lower()] = stale_quote(ticker.lower(), response.status_code)
         except requests.RequestException as e:
-            logger.error(f"Request error for {ticker}: {str(e)}")
-            signals[ticker.lower()] = {"c": "N/A", "error": str(e)}
+            logger.error("Request error for %s: %s", ticker, e)
+            breaker.record_failure(e)
+            signals[ticker.lower()] = stale_quote(ticker.lower(), str(e))
 
     # Log a summary of successful fetches
     successful_fetches = sum(1 for ticker in signals if isinstance(signals[ticker].get("c"), (int, float)) and signals[ticker].get("c") != "N/A")
-    logger.info(f"Successfully fetched {successful_fetches} out of {len(tickers)} ticker prices")
+    logger.info("Successfully fetched %d out of %d ticker prices", successful_fetches, len(tickers))
 
     return signals
 
-# Fetch news headlines from Finnhub for all tracked tickers
-def get_news_headlines():
-    """Fetch the latest news headlines for tracked tickers"""
+# Fetch news headlines from Finnhub for the screened candidates
+def get_news_headlines(tickers=None):
+    """Fetch the latest news headlines for the top candidates
+
+    ``tickers`` defaults to the first NEWS_TICKERS candidates of the latest
+    screen (or of the registry before the first screen).
+
+    While the finnhub circuit is open, or if every request fails, the last
+    headlines fetched successfully are returned marked ``"stale": True``.
+    """
+    global _last_good_news
+    
     headlines = []
+    breaker = circuit_breaker.get("finnhub")
+    fetched = False
     today = datetime.now().strftime('%Y-%m-%d')
 
     # Check if we have a valid API key first
@@ -401,17 +571,25 @@ def get_news_headlines():
             }
         ]
 
-    # Sample a few tickers for news to avoid rate limits
-    sample_tickers = ["SPY", "QQQ", "AAPL", "TSLA", "NVDA"]
+    # Only a few tickers get news, to stay within rate limits
+    if tickers is None:
+        tickers = latest_candidates or symbol_registry.symbols()
+    sample_tickers = [ticker.upper() for ticker in tickers[:NEWS_TICKERS]]
 
     for ticker in sample_tickers:
+        if not breaker.allow():
+            break
         try:
             response = requests.get(
                 f"https://finnhub.io/api/v1/company-news?symbol={ticker}&from={today}&to={today}&token={Seb_API_key}",
                 timeout=15
             )
 
-            if response.status_code == 200:
+            if response.status_code != 200:
+                breaker.record_failure(f"HTTP {response.status_code}")
+            else:
+                breaker.record_success()
+                fetched = True
                 news_items = response.json()
 
                 if news_items:
@@ -425,9 +603,15 @@ def get_news_headlines():
                         })
 
         except Exception as e:
-            logger.error(f"Error fetching news for {ticker}: {str(e)}")
+            logger.error("Error fetching news for %s: %s", ticker, e)
+            breaker.record_failure(e)
 
-    return headlines
+    if fetched:
+        _last_good_news = headlines
+        return headlines
+    
+    logger.warning("News unavailable, serving %d stale headlines", len(_last_good_news))
+    return [dict(headline, stale=True) for headline in _last_good_news]
 
 def calculate_portfolio_value(signals):
     """Calculate the current value of the portfolio"""
@@ -442,8 +626,87 @@ def calculate_portfolio_value(signals):
     portfolio["portfolio_value"] = total_value
     return total_value
 
-def execute_trade(decision, signals):
-    """Execute a trade decision and update the portfolio"""
+def apply_fill(order, shares, price, fee):
+    """Book an order fill against the portfolio
+
+    Called by the order book for every (partial) fill. Returns the number of
+    shares actually booked, which is less than requested when cash or the
+    held position runs out.
+    """
+    global portfolio
+
+    ticker = order["ticker"]
+    position = portfolio["positions"][ticker]
+
+    if order["side"] == "BUY":
+        affordable = int((portfolio["cash"] - fee) // price) if portfolio["cash"] > fee else 0
+        shares = min(shares, affordable)
+        if shares <= 0:
+            return 0
+
+        cost = shares * price
+        total_shares = position["shares"] + shares
+        position["avg_price"] = ((position["shares"] * position["avg_price"]) + cost) / total_shares
+        position["shares"] = total_shares
+        portfolio["cash"] -= cost + order_book.commission(shares)
+
+        update_performance_metrics({
+            "action": "buy",
+            "ticker": ticker,
+            "price": price,
+            "shares": shares
+        })
+    else:
+        shares = min(shares, position["shares"])
+        if shares <= 0:
+            return 0
+
+        # Record the trade return before the position is reduced
+        update_performance_metrics({
+            "action": "sell",
+            "ticker": ticker,
+            "price": price,
+            "shares": shares
+        })
+
+        position["shares"] -= shares
+        portfolio["cash"] += shares * price - order_book.commission(shares)
+
+        # Reset average price if position is closed
+        if position["shares"] == 0:
+            position["avg_price"] = 0
+
+    risk.on_fill(ticker, position["shares"], portfolio["cash"])
+    history_store.record("fill", {
+        "order_id": order["id"],
+        "side": order["side"],
+        "shares": shares,
+        "price": price,
+        "cash": portfolio["cash"]
+    }, ticker=ticker)
+
+    logger.info("Filled %s: %d shares of %s at $%.2f (order %s)", order['side'], shares, ticker.upper(), price, order['id'])
+    return shares
+
+def match_open_orders(signals):
+    """Match pending orders against a quote snapshot and save any fills
+
+    Stale (last known good) quotes are never filled against.
+    """
+    fresh = {ticker: quote for ticker, quote in signals.items() if not quote.get("stale")}
+    fills = order_book.match(fresh, apply_fill)
+    if fills:
+        calculate_portfolio_value(signals)
+        save_portfolio()
+    return fills
+
+def execute_trade(decision, signals, market_open=True):
+    """Turn a trade decision into an order and execute it against the order book
+
+    Orders placed while the market is closed are queued and executed at the
+    next open. The decision may carry ``order_type`` (market/limit/stop) with
+    ``limit_price`` or ``stop_price``.
+    """
     global portfolio
     
     action = decision.get("action", "HOLD")
@@ -454,74 +717,64 @@ def execute_trade(decision, signals):
     
     current_price = signals.get(ticker, {}).get("c", 0)
     if not isinstance(current_price, (int, float)) or current_price <= 0:
-        logger.warning(f"Invalid price for {ticker}: {current_price}")
+        logger.warning("Invalid price for %s: %s", ticker, current_price)
+        return
+    if signals[ticker].get("stale"):
+        logger.warning("Not trading %s on a stale quote", ticker.upper())
+        decision["risk_rejected"] = ["Quote is stale (market data degraded)"]
         return
     
-    # Calculate trade size (10% of portfolio for simplicity)
+    # Size toward the target weight from the position sizer (10% of portfolio until it has history)
     portfolio_value = calculate_portfolio_value(signals)
-    trade_value = portfolio_value * 0.1
-    shares_to_trade = int(trade_value / current_price)
-    
-    if action == "BUY" and shares_to_trade > 0:
-        cost = shares_to_trade * current_price
-        if portfolio["cash"] >= cost:
-            # Update position
-            current_shares = portfolio["positions"][ticker]["shares"]
-            current_avg_price = portfolio["positions"][ticker]["avg_price"]
-            
-            # Calculate new average price
-            if current_shares > 0:
-                total_value = (current_shares * current_avg_price) + cost
-                total_shares = current_shares + shares_to_trade
-                new_avg_price = total_value / total_shares
-            else:
-                new_avg_price = current_price
-                total_shares = shares_to_trade
-            
-            portfolio["positions"][ticker]["shares"] = total_shares
-            portfolio["positions"][ticker]["avg_price"] = new_avg_price
-            portfolio["cash"] -= cost
-            
-            # Update performance metrics
-            trade_data = {
-                "action": "buy",
-                "ticker": ticker,
-                "price": current_price,
-                "shares": shares_to_trade
-            }
-            update_performance_metrics(trade_data)
-            
-            logger.info(f"Executed BUY: {shares_to_trade} shares of {ticker.upper()} at ${current_price:.2f}")
+    shares_to_trade = position_sizer.order_shares(
+        action, ticker, current_price, portfolio_value, portfolio["positions"][ticker]["shares"]
+    )
     
-    elif action == "SELL" and portfolio["positions"][ticker]["shares"] > 0:
-        shares_to_sell = min(shares_to_trade, portfolio["positions"][ticker]["shares"])
-        proceeds = shares_to_sell * current_price
-        
-        portfolio["positions"][ticker]["shares"] -= shares_to_sell
-        portfolio["cash"] += proceeds
-        
-        # Reset average price if position is closed
-        if portfolio["positions"][ticker]["shares"] == 0:
-            portfolio["positions"][ticker]["avg_price"] = 0
-        
-        # Update performance metrics
-        trade_data = {
-            "action": "sell",
-            "ticker": ticker,
-            "price": current_price,
-            "shares": shares_to_sell
-        }
-        update_performance_metrics(trade_data)
-        
-        logger.info(f"Executed SELL: {shares_to_sell} shares of {ticker.upper()} at ${current_price:.2f}")
+    if shares_to_trade <= 0:
+        reason = "Position already at its target weight" if action == "BUY" else "No shares held to sell"
+        logger.info("Not trading %s %s: %s", action, ticker.upper(), reason.lower())
+        decision["risk_rejected"] = [reason]
+        return
+    
+    # Pre-trade risk gate
+    allowed, reasons = risk.check_order(ticker, action, shares_to_trade, current_price)
+    if not allowed:
+        logger.warning("Risk check rejected %s %s %s: %s", action, shares_to_trade, ticker.upper(), '; '.join(reasons))
+        decision["risk_rejected"] = reasons
+        return
+    
+    try:
+        order_book.submit_order(
+            ticker,
+            action,
+            shares_to_trade,
+            order_type=decision.get("order_type", "market"),
+            limit_price=decision.get("limit_price"),
+            stop_price=decision.get("stop_price"),
+            market_open=market_open
+        )
+    except ValueError as e:
+        logger.warning("Rejected order for %s: %s", ticker.upper(), e)
+        return
+    
+    if market_open:
+        match_open_orders(signals)
     
     # Save portfolio after trade
     save_portfolio()
 
-def generate_trade_decision(signals, news_headlines):
-    """Generate trading decision using OpenAI GPT model"""
+def generate_trade_decision(signals, news_headlines, market_open=None, candidates=None):
+    """Generate trading decision using OpenAI GPT model
+
+    Only ``candidates`` (the screened symbols; default all of ``signals``)
+    are shown to the model as market data and available tickers.
+    """
     global latest_decision
+
+    if market_open is None:
+        market_open = isMarketOpen()
     
+    client = get_openai_client()
     if not client:
         latest_decision = {
             "action": "HOLD",
@@ -530,14 +783,27 @@ def generate_trade_decision(signals, news_headlines):
         }
         return latest_decision
     
+    if circuit_breaker.get("openai").is_open():
+        latest_decision = {
+            "action": "HOLD",
+            "ticker": "",
+            "rationale": "OpenAI unavailable (circuit open), holding until it recovers",
+            "degraded": True
+        }
+        return latest_decision
+    
     try:
         # Prepare market data summary
+        if candidates is None:
+            candidates = list(signals.keys())
         market_summary = "CURRENT MARKET DATA:\n"
-        for ticker, data in signals.items():
+        for ticker in candidates:
+            data = signals.get(ticker, {})
             if isinstance(data.get('c'), (int, float)):
                 change = data.get('d', 0)
                 percent_change = data.get('dp', 0)
-                market_summary += f"{ticker.upper()}: ${data['c']:.2f} ({percent_change:+.2f}%)\n"
+                stale_note = " [stale]" if data.get("stale") else ""
+                market_summary += f"{ticker.upper()}: ${data['c']:.2f} ({percent_change:+.2f}%){stale_note}\n"
         
         # Prepare news summary
         news_summary = "\nRELEVANT NEWS:\n"
@@ -554,7 +820,26 @@ def generate_trade_decision(signals, news_headlines):
                     position_value = position["shares"] * current_price
                     portfolio_summary += f"{ticker.upper()}: {position['shares']} shares @ ${position['avg_price']:.2f} avg (Current: ${current_price:.2f}, Value: ${position_value:.2f})\n"
         
-        available_tickers = [t for t in portfolio["positions"].keys()]
+        available_tickers = [t for t in candidates if t in portfolio["positions"]]
+        
+        if MAX_ORDERS_PER_DECISION > 1:
+            trade_count_rule = f"Place at most {MAX_ORDERS_PER_DECISION} orders per decision, each on a different ticker"
+            response_format = '''{
+    "orders": [
+        {"action": "BUY/SELL/HOLD", "ticker": "TICKER_SYMBOL", "order_type": "market/limit/stop", "limit_price": 0.0, "stop_price": 0.0}
+    ],
+    "rationale": "Brief explanation of your reasoning"
+}'''
+        else:
+            trade_count_rule = "Only trade ONE ticker per decision"
+            response_format = '''{
+    "action": "BUY/SELL/HOLD",
+    "ticker": "TICKER_SYMBOL",
+    "order_type": "market/limit/stop",
+    "limit_price": 0.0,
+    "stop_price": 0.0,
+    "rationale": "Brief explanation of your reasoning"
+}'''
         
         prompt = f'''You are an expert hedge fund manager for Nexus Gate Fund. Analyze the current market data and make a single trading decision.
 
@@ -563,73 +848,53 @@ def generate_trade_decision(signals, news_headlines):
 {portfolio_summary}
 
 TRADING RULES:
-1. Only trade ONE ticker per decision
+1. {trade_count_rule}
 2. Actions: BUY, SELL, or HOLD
 3. Consider market trends, volatility, and news sentiment
 4. Focus on risk management and portfolio diversification
-5. Each trade should be approximately 10% of portfolio value
+5. You choose what to trade, not how much: BUY moves a position up to the target weight set by the risk model, SELL moves it down (or trims it)
 6. Consider current positions when making decisions
 7. Only use market hours for trading (check if market is open)
+8. order_type is "market" unless you want a price condition: "limit" with limit_price (the highest price to buy at or lowest to sell at), or "stop" with stop_price (becomes a market order once the price reaches it). Leave the price fields out of market orders. Unfilled orders expire at the close of {order_book.EXPIRY_SESSIONS} trading session(s)
 
 AVAILABLE TICKERS: {', '.join([t.upper() for t in available_tickers])}
 
-Market Status: {"OPEN" if isMarketOpen() else "CLOSED"}
+Market Status: {"OPEN" if market_open else "CLOSED"}
 
 Provide your decision in this exact JSON format:
-{{
-    "action": "BUY/SELL/HOLD",
-    "ticker": "TICKER_SYMBOL",
-    "rationale": "Brief explanation of your reasoning"
-}}'''
+{response_format}'''
 
-        response = client.chat.completions.create(
-            model="gpt-4o",
-            messages=[
-                {"role": "system", "content": "You are a professional hedge fund manager. Always respond with valid JSON only."},
-                {"role": "user", "content": prompt}
-            ],
-            temperature=0.1,
-            max_tokens=500
-        )
+        cycle_recorder.note("prompt", prompt)
         
-        # Parse the response
-        decision_text = response.choices[0].message.content
-        if decision_text:
-            decision_text = decision_text.strip()
-        else:
-            decision_text = ""
+        def validate(text):
+            # Runs in this thread for every completed response, so the recording keeps their order
+            try:
+                decision = parse_decision(text)
+            except ValueError as e:
+                cycle_recorder.note_response(text, error=str(e))
+                raise
+            cycle_recorder.note_response(text)
+            return decision
         
-        # Try to extract JSON from response
-        try:
-            start_idx = decision_text.find('{')
-            end_idx = decision_text.rfind('}') + 1
-            if start_idx != -1 and end_idx != 0:
-                json_str = decision_text[start_idx:end_idx]
-                decision = json.loads(json_str)
-            else:
-                decision = json.loads(decision_text)
-            
-            # Validate decision format
-            if "action" not in decision or "ticker" not in decision or "rationale" not in decision:
-                raise ValueError("Invalid decision format")
-            
-            # Ensure ticker is lowercase for internal use
-            if decision["ticker"]:
-                decision["ticker"] = decision["ticker"].lower()
-            
-            latest_decision = decision
-            logger.info(f"Generated decision: {decision}")
-            
-        except json.JSONDecodeError as e:
-            logger.error(f"Failed to parse decision JSON: {decision_text}")
-            latest_decision = {
-                "action": "HOLD",
-                "ticker": "",
-                "rationale": f"Failed to parse AI response: {str(e)}"
-            }
+        request_fns = [
+            lambda model, timeout, cancelled, system_prompt=system_prompt: request_completion(client, model, system_prompt, prompt, timeout, cancelled)
+            for system_prompt in DECISION_SYSTEM_PROMPTS[:max(1, llm_executor.VOTE_VARIANTS)]
+        ]
+        decision = llm_executor.decide(request_fns, validate)
+        
+        latest_decision = decision
+        logger.info("Generated decision: %s", decision)
+        
+    except llm_executor.DecisionTimeout as e:
+        logger.error("Decision deadline exceeded: %s", e)
+        latest_decision = {
+            "action": "HOLD",
+            "ticker": "",
+            "rationale": f"No AI response before deadline: {str(e)}"
+        }
         
     except Exception as e:
-        logger.error(f"Error generating trade decision: {str(e)}")
+        logger.error("Error generating trade decision: %s", e)
         latest_decision = {
             "action": "HOLD",
             "ticker": "",
@@ -638,8 +903,74 @@ Provide your decision in this exact JSON format:
     
     return latest_decision
 
+def request_completion(client, model, system_prompt, prompt, timeout, cancelled=None):
+    """Stream one chat completion and return the decision JSON text
+
+    The response is parsed incrementally: the stream is abandoned as soon as
+    the decision object closes, or as soon as an invalid action or unknown
+    ticker shows up (raising DecisionSchemaError so the executor can hedge).
+    With DECISION_EARLY_ACT=1 a single-order decision is returned the moment
+    its action, ticker and order type (with its price) are known. Once ``cancelled`` (a threading.Event)
+    is set the stream is closed at the next chunk and RequestCancelled raised.
+    """
+    breaker = circuit_breaker.get("openai")
+    if not breaker.allow():
+        raise circuit_breaker.CircuitOpenError("OpenAI circuit is open")
+    
+    parser = decision_parser.StreamingDecisionParser()
+    try:
+        stream = client.with_options(timeout=timeout, max_retries=0).chat.completions.create(
+            model=model,
+            messages=[
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": prompt}
+            ],
+            temperature=0.1,
+            max_tokens=500,
+            stream=True
+        )
+    except Exception as e:
+        breaker.record_failure(e)
+        raise
+    try:
+        for chunk in stream:
+            if cancelled is not None and cancelled.is_set():
+                raise llm_executor.RequestCancelled(f"{model} request cancelled")
+            delta = chunk.choices[0].delta.content if chunk.choices else None
+            if not delta:
+                continue
+            parser.feed(delta)
+            decision_parser.check_early(parser, portfolio["positions"])
+            if parser.complete:
+                break
+            early = decision_parser.early_decision(parser) if DECISION_EARLY_ACT else None
+            if early is not None:
+                logger.info("Acting on streamed decision before the rationale completed")
+                breaker.record_success()
+                return json.dumps(early)
+    except (decision_parser.DecisionSchemaError, llm_executor.RequestCancelled):
+        # The upstream answered; a bad or abandoned answer is not an outage
+        breaker.record_success()
+        raise
+    except Exception as e:
+        breaker.record_failure(e)
+        raise
+    finally:
+        stream.close()
+    breaker.record_success()
+    return parser.payload()
+
+def parse_decision(decision_text):
+    """Parse the JSON decision and validate it against the decision schema
+
+    Raises decision_parser.DecisionSchemaError (a ValueError) if invalid.
+    """
+    return decision_parser.parse_decision_text(decision_text, portfolio["positions"], MAX_ORDERS_PER_DECISION)
+
 def log_to_sheet(sheet, timestamp, signals, action, rationale):
     """Log trading data to Google Sheets"""
+    global _worksheet
+    
     if not sheet:
         logger.warning("No sheet connection available for logging")
         return
@@ -661,75 +992,161 @@ def log_to_sheet(sheet, timestamp, signals, action, rationale):
         ]
         
         sheet.append_row(row_data)
-        logger.info(f"Successfully logged to sheet: {action} decision")
+        circuit_breaker.get("sheets").record_success()
+        logger.info("Successfully logged to sheet: %s decision", action)
         
     except Exception as e:
-        logger.error(f"Failed to log to sheet: {str(e)}")
+        logger.error("Failed to log to sheet: %s", e)
+        circuit_breaker.get("sheets").record_failure(e)
+        _worksheet = None
 
 def run_trading_cycle_api():
-    """Execute trading cycle and return data for API use"""
-    global latest_signals, latest_news, latest_decision, trading_history, bot_status
-    
+    """Execute trading cycle and return data for API use
+
+    Returns ``{"error": ..., "busy": True}`` without doing anything if another
+    cycle is already running.
+    """
+    if not cycle_lock.acquire(blocking=False):
+        logger.warning("Trading cycle already in progress, skipping")
+        return {"error": "Trading cycle already in progress", "busy": True}
+
     try:
-        logger.info("Starting trading cycle...")
-        
-        # Update status
-        bot_status["last_run"] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        
-        # Get market signals
-        latest_signals = get_market_signals()
-        logger.info(f"Fetched signals for {len(latest_signals)} tickers")
-        
-        # Get news headlines
-        latest_news = get_news_headlines()
-        logger.info(f"Fetched {len(latest_news)} news headlines")
-        
-        # Generate trading decision
-        latest_decision = generate_trade_decision(latest_signals, latest_news)
-        
-        # Execute trade if decision is not HOLD and market is open
-        if latest_decision["action"] != "HOLD" and isMarketOpen():
-            execute_trade(latest_decision, latest_signals)
-        elif latest_decision["action"] != "HOLD" and not isMarketOpen():
-            logger.info("Market is closed, trade will be executed when market opens")
-        
-        # Log to Google Sheets
-        sheet = init_sheet()
-        if sheet:
-            log_to_sheet(
-                sheet,
-                bot_status["last_run"],
-                latest_signals,
-                latest_decision["action"],
-                latest_decision["rationale"]
-            )
-        
-        # Add to trading history
-        trading_history.append({
-            "timestamp": bot_status["last_run"],
-            "action": latest_decision["action"],
-            "ticker": latest_decision.get("ticker", "").upper(),
-            "rationale": latest_decision["rationale"],
-            "portfolio_value": calculate_portfolio_value(latest_signals)
-        })
-        
-        # Keep only last 50 history entries
-        if len(trading_history) > 50:
-            trading_history = trading_history[-50:]
-        
-        logger.info("Trading cycle completed successfully")
-        
-        return {
-            "signals": latest_signals,
-            "decision": latest_decision,
-            "history": trading_history[-10:],
-            "status": bot_status,
-            "portfolio_value": calculate_portfolio_value(latest_signals)
-        }
+        return _run_trading_cycle()
+    finally:
+        cycle_lock.release()
+
+def _run_trading_cycle(replay=False):
+    """Run one trading cycle; callers must hold cycle_lock
+
+    Every external input is captured by cycle_recorder; with ``replay`` the
+    record is kept in memory only (see cycle_recorder.replay_cycle).
+    """
+    global latest_signals, latest_news, latest_decision, trading_history, bot_status, last_cycle_record, latest_candidates
+    
+    cycle_started = time.time()
+    with log_setup.cycle_context() as cycle:
+        cycle_recorder.begin(cycle["id"], portfolio, order_book.open_orders())
+        try:
+            logger.info("Starting trading cycle...")
+            
+            # Update status
+            bot_status["last_run"] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            
+            # Get market signals
+            with log_setup.stage("signals"):
+                latest_signals = get_market_signals()
+                risk.on_quote(latest_signals)
+                position_sizer.on_quote(latest_signals)
+            cycle_recorder.note("signals", latest_signals)
+            logger.info("Fetched signals for %d tickers", len(latest_signals))
+            
+            # Narrow the universe to the candidates that get news and go into the prompt
+            with log_setup.stage("screen"):
+                latest_candidates = screener.screen(latest_signals, always=_pinned_tickers())
+            cycle_recorder.note("candidates", latest_candidates)
+            
+            # Get news headlines
+            with log_setup.stage("news"):
+                latest_news = get_news_headlines(latest_candidates)
+            cycle_recorder.note("news", latest_news)
+            logger.info("Fetched %d news headlines", len(latest_news))
+            
+            # Check the market calendar once per cycle
+            market_open = isMarketOpen()
+            cycle_recorder.note("market_open", market_open)
+
+            # Drop orders past their time in force, then work the rest against the fresh quotes,
+            # releasing after-hours orders at the open
+            if order_book.expire_orders():
+                save_portfolio()
+            if market_open:
+                with log_setup.stage("orders"):
+                    order_book.release_after_hours_orders()
+                    match_open_orders(latest_signals)
+
+            # Generate trading decision
+            with log_setup.stage("decision"):
+                latest_decision = generate_trade_decision(latest_signals, latest_news, market_open, latest_candidates)
+            
+            # Execute trade if decision is not HOLD; while the market is closed the order is queued for the open
+            if latest_decision["action"] != "HOLD":
+                if not market_open:
+                    logger.info("Market is closed, trade will be executed when market opens")
+                cycle_recorder.note("sizing_targets", position_sizer.target_weights())
+                with log_setup.stage("execution"):
+                    for order in latest_decision.get("orders") or [latest_decision]:
+                        execute_trade(order, latest_signals, market_open)
+            
+            # Log to Google Sheets
+            with log_setup.stage("sheets"):
+                sheet = init_sheet()
+                if sheet:
+                    log_to_sheet(
+                        sheet,
+                        bot_status["last_run"],
+                        latest_signals,
+                        latest_decision["action"],
+                        latest_decision["rationale"]
+                    )
+            
+            # Add to trading history
+            trading_history.append({
+                "timestamp": bot_status["last_run"],
+                "action": latest_decision["action"],
+                "ticker": latest_decision.get("ticker", "").upper(),
+                "rationale": latest_decision["rationale"],
+                "portfolio_value": calculate_portfolio_value(latest_signals),
+                # Set when the order was not placed (sized to zero, stale quote or a risk limit)
+                "rejected": [
+                    reason for order in latest_decision.get("orders") or [latest_decision]
+                    for reason in order.get("risk_rejected", [])
+                ] or None
+            })
+            
+            # Keep only last 50 history entries in memory; the full history goes to the history store
+            if len(trading_history) > 50:
+                trading_history = trading_history[-50:]
+            
+            portfolio_value = trading_history[-1]["portfolio_value"]
+            
+            # Re-simulate here, off the request path, when the recorded returns have changed
+            with log_setup.stage("projection"):
+                refresh_growth_projection()
+            
+            timings = log_setup.stage_timings()
+            history_store.record("decision", latest_decision, ticker=latest_decision.get("ticker") or None)
+            history_store.record("valuation", {"portfolio_value": portfolio_value, "cash": portfolio["cash"]})
+            history_store.record("cycle", {
+                "cycle_id": cycle["id"],
+                "started": bot_status["last_run"],
+                "duration_seconds": time.time() - cycle_started,
+                "stage_timings_ms": timings,
+                "market_open": market_open,
+                "tickers": len(latest_signals),
+                "candidates": len(latest_candidates),
+                "headlines": len(latest_news),
+                "action": latest_decision["action"]
+            })
+            
+            bot_status["degraded"] = circuit_breaker.degraded()
+            logger.info("Trading cycle completed successfully", extra={"stage_timings_ms": timings})
+            
+            return {
+                "signals": latest_signals,
+                "decision": latest_decision,
+                "history": trading_history[-10:],
+                "status": bot_status,
+                "portfolio_value": portfolio_value,
+                "degraded": bot_status["degraded"]
+            }
+            
+        except Exception as e:
+            logger.error("Error in trading cycle: %s", e, exc_info=True)
+            return {"error": str(e)}
         
-    except Exception as e:
-        logger.error(f"Error in trading cycle: {str(e)}")
-        return {"error": str(e)}
+        finally:
+            outcome = cycle_recorder.outcome_of(latest_decision, portfolio, order_book.open_orders())
+            last_cycle_record = cycle_recorder.finish(outcome, write=not replay)
 
 def run_bot_thread(stop_event, update_callback=None):
     """Run the trading bot in a thread with a stop event"""
@@ -737,8 +1154,11 @@ def run_bot_thread(stop_event, update_callback=None):
     
     logger.info("Bot thread started")
     bot_status["running"] = True
+    scheduler = cycle_scheduler.CycleScheduler()
     
     while not stop_event.is_set():
+        started = time.time()
+        result = {}
         try:
             # Run trading cycle
             result = run_trading_cycle_api()
@@ -752,22 +1172,24 @@ def run_bot_thread(stop_event, update_callback=None):
                     action=decision_data.get("action") if isinstance(decision_data, dict) else None,
                     rationale=decision_data.get("rationale") if isinstance(decision_data, dict) else None
                 )
-            
-            # Calculate next run time (5 minutes from now)
-            next_run = datetime.now() + timedelta(minutes=5)
-            bot_status["next_run"] = next_run.strftime("%Y-%m-%d %H:%M:%S")
-            
-            # Wait for 5 minutes or until stop event is set
-            if stop_event.wait(300):  # 300 seconds = 5 minutes
-                break
                 
         except Exception as e:
-            logger.error(f"Error in bot thread: {str(e)}")
-            if stop_event.wait(60):  # Wait 1 minute before retrying
-                break
+            logger.error("Error in bot thread: %s", e)
+            result = {"error": str(e)}
+
+        # A manual run holding the lock is not a failure, just reschedule normally
+        failed = "error" in result and not result.get("busy")
+        next_run = scheduler.plan_next(started, time.time(), result.get("signals"), error=failed, fetched=last_rest_batch)
+        bot_status["next_run"] = datetime.fromtimestamp(next_run).strftime("%Y-%m-%d %H:%M:%S")
+        bot_status["schedule"] = scheduler.snapshot()
+        
+        # Wait until the next run or until stop event is set
+        if stop_event.wait(max(0.0, next_run - time.time())):
+            break
     
     bot_status["running"] = False
     bot_status["next_run"] = None
+    bot_status["schedule"] = None
     logger.info("Bot thread stopped")
 
 def update_status(signals=None, decision=None, action=None, rationale=None):
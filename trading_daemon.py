@@ -0,0 +1,189 @@
+"""Headless trading daemon
+
+Runs the trading cycle loop in its own process, independent of the web
+workers, and publishes a JSON snapshot of its state to SNAPSHOT_FILE. Run
+the web app with BOT_MODE=daemon to serve that snapshot instead of running
+cycles in-process.
+
+    python trading_daemon.py
+
+SIGTERM/SIGINT stop the loop after the current cycle (a second signal
+exits immediately); SIGUSR1 triggers a cycle right away.
+"""
+import os
+import sys
+import json
+import time
+import signal
+import threading
+import logging
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_FILE = os.environ.get("DAEMON_SNAPSHOT_FILE", "daemon_snapshot.json")
+# Seconds between heartbeat snapshots; a snapshot is also published after every cycle
+SNAPSHOT_INTERVAL = float(os.environ.get("DAEMON_SNAPSHOT_INTERVAL", 2))
+# The daemon counts as down once its snapshot is this many intervals old
+STALE_INTERVALS = 5
+# How long shutdown waits for a running cycle to finish
+SHUTDOWN_TIMEOUT = 120
+
+_publish_lock = threading.Lock()
+_started_at = time.time()
+
+# Reader-side cache: (mtime_ns, size) of the file -> parsed snapshot
+_read_cache = {"key": None, "snapshot": None}
+
+
+def build_snapshot():
+    """Collect the state the web app serves, as JSON-ready data"""
+    import trading_bot
+    import risk
+    import order_book
+    import position_sizer
+    import circuit_breaker
+    import llm_executor
+    import finnhub_stream
+    import screener
+
+    portfolio = trading_bot.portfolio
+    return {
+        "pid": os.getpid(),
+        "started_at": _started_at,
+        "published_at": time.time(),
+        "status": dict(trading_bot.bot_status),
+        "signals": dict(trading_bot.latest_signals),
+        "news": list(trading_bot.latest_news),
+        "decision": dict(trading_bot.latest_decision),
+        "history": list(trading_bot.trading_history),
+        "portfolio": {
+            "cash": portfolio["cash"],
+            "portfolio_value": portfolio["portfolio_value"],
+            "positions": {ticker: dict(position) for ticker, position in portfolio["positions"].items()},
+            "performance_metrics": dict(portfolio["performance_metrics"]),
+        },
+        "risk": risk.snapshot(),
+        "orders": {"open_orders": order_book.open_orders(), "recent_fills": list(order_book.recent_fills)},
+        "sizing": position_sizer.snapshot(),
+        "growth_projection": trading_bot.latest_growth_projection,
+        "breakers": circuit_breaker.status(),
+        "degraded": circuit_breaker.degraded(),
+        "llm": dict(llm_executor.executor_stats, hedge_delay_seconds=llm_executor.hedge_delay()),
+        "quote_stream": dict(finnhub_stream.stream_status),
+        "screen": screener.snapshot(),
+    }
+
+
+def publish():
+    """Atomically replace the snapshot file (write to a temp file, then rename)"""
+    with _publish_lock:
+        try:
+            body = json.dumps(build_snapshot(), default=str, separators=(",", ":"))
+        except RuntimeError as e:
+            # A cycle mutated state mid-serialization; the next heartbeat will catch up
+            logger.debug("Skipped snapshot: %s", e)
+            return False
+
+        temp_file = f"{SNAPSHOT_FILE}.{os.getpid()}.tmp"
+        try:
+            with open(temp_file, "w") as f:
+                f.write(body)
+            os.replace(temp_file, SNAPSHOT_FILE)
+        except OSError as e:
+            logger.error("Error publishing daemon snapshot: %s", e)
+            return False
+    return True
+
+
+def read_snapshot():
+    """Return the daemon's latest snapshot, or None if it has never published
+
+    Parsed once per file change. ``daemon_alive`` and ``snapshot_age`` are
+    added on every call so readers can tell a dead daemon from a quiet one.
+    """
+    try:
+        stat = os.stat(SNAPSHOT_FILE)
+    except OSError:
+        return None
+
+    key = (stat.st_mtime_ns, stat.st_size)
+    if _read_cache["key"] != key:
+        try:
+            with open(SNAPSHOT_FILE) as f:
+                _read_cache["snapshot"] = json.load(f)
+            _read_cache["key"] = key
+        except (OSError, ValueError) as e:
+            logger.warning("Could not read daemon snapshot: %s", e)
+            if _read_cache["snapshot"] is None:
+                return None
+
+    snapshot = _read_cache["snapshot"]
+    age = time.time() - snapshot["published_at"]
+    return dict(snapshot, snapshot_age=age, daemon_alive=age < SNAPSHOT_INTERVAL * STALE_INTERVALS)
+
+
+def request_cycle(snapshot):
+    """Ask the running daemon for an immediate cycle (SIGUSR1); returns False if it cannot be reached"""
+    if not snapshot or not snapshot.get("daemon_alive") or not hasattr(signal, "SIGUSR1"):
+        return False
+    try:
+        os.kill(snapshot["pid"], signal.SIGUSR1)
+    except OSError:
+        return False
+    return True
+
+
+def main():
+    import trading_bot
+    import history_store
+    import finnhub_stream
+
+    trading_bot.init_bot()
+    stop_event = threading.Event()
+
+    def on_cycle(**kwargs):
+        # The cycle has refreshed the growth projection; publish it with the rest
+        trading_bot.update_status(**kwargs)
+        publish()
+
+    def run_cycle_now():
+        # Cycles never overlap: this returns "busy" if the loop is mid-cycle
+        if "error" not in trading_bot.run_trading_cycle_api():
+            publish()
+
+    def shutdown(signum, frame):
+        if stop_event.is_set():
+            logger.warning("Second shutdown signal, exiting immediately")
+            os._exit(1)
+        logger.info("Received %s, stopping after the current cycle", signal.Signals(signum).name)
+        stop_event.set()
+
+    def run_now(signum, frame):
+        threading.Thread(target=run_cycle_now, name="run-now", daemon=True).start()
+
+    signal.signal(signal.SIGTERM, shutdown)
+    signal.signal(signal.SIGINT, shutdown)
+    if hasattr(signal, "SIGUSR1"):
+        signal.signal(signal.SIGUSR1, run_now)
+
+    loop = threading.Thread(target=trading_bot.run_bot_thread, args=(stop_event, on_cycle), name="trading-loop")
+    loop.start()
+    logger.info("Trading daemon started (pid %s), publishing to %s", os.getpid(), SNAPSHOT_FILE)
+
+    # Signal handlers run on this thread, between heartbeats
+    while not stop_event.wait(SNAPSHOT_INTERVAL):
+        publish()
+
+    loop.join(SHUTDOWN_TIMEOUT)
+    if loop.is_alive():
+        logger.warning("Trading cycle still running at shutdown, exiting without waiting further")
+    trading_bot.save_portfolio()
+    finnhub_stream.stop()
+    history_store.flush()
+    publish()
+    logger.info("Trading daemon stopped")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())